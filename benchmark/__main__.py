@@ -0,0 +1,57 @@
+"""
+Runs the benchmarks from the root of the repository:
+
+    python -m benchmark --output results.json
+
+and fails if throughput regressed compared to an earlier run:
+
+    python -m benchmark --output results.json --compare baseline.json --tolerance 0.2
+"""
+import sys
+import argparse
+
+from .benchmarks import BENCHMARKS
+from .harness import save_results, load_results, compare_results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmark', description='Benchmarks the Ledger SDK.')
+    parser.add_argument('benchmarks', nargs='*',
+                        help=f'The benchmarks to run, all by default. One of: {", ".join(BENCHMARKS)}.')
+    parser.add_argument('--sizes', nargs='+', type=int, default=[1, 100, 10000],
+                        help='The number of transactions to sign and serialize.')
+    parser.add_argument('--output', help='Path of a JSON file to save the results in.')
+    parser.add_argument('--compare', help='Path of a JSON file with results to compare with.')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='The fraction throughput may drop before it is a regression.')
+    args = parser.parse_args(argv)
+
+    for name in args.benchmarks:
+        if name not in BENCHMARKS:
+            parser.error(f'Unknown benchmark {name}')
+
+    results = []
+
+    print(f'{"benchmark":<45} {"ops/sec":>12} {"p50 ms":>10} {"p99 ms":>10} {"peak KiB":>10}')
+
+    for name in args.benchmarks or BENCHMARKS:
+        for result in BENCHMARKS[name](args.sizes):
+            results.append(result)
+            print(f'{result.name:<45} {result.ops_per_sec:>12,.0f} {result.p50_ms:>10.3f} '
+                  f'{result.p99_ms:>10.3f} {result.peak_memory_bytes / 1024:>10,.0f}')
+
+    if args.output:
+        save_results(args.output, results)
+
+    if args.compare:
+        regressions = compare_results(load_results(args.compare), results, args.tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}', file=sys.stderr)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,311 @@
+import os
+import tempfile
+
+from typing import List, Iterator, Callable
+from datetime import datetime, timedelta, timezone
+from sawtooth_sdk.protobuf.batch_pb2 import BatchList
+
+from src.origin_ledger_sdk import (
+    Ledger,
+    Batch,
+    BatchListEncoder,
+    BatchSpool,
+    PublishMeasurementRequest,
+    MeasurementBatch,
+    IssueGGORequest,
+    TransferGGORequest,
+    SplitGGORequest,
+    SplitGGOPart,
+    RetireGGORequest,
+    RetireGGOPart,
+    MeasurementType,
+    AddressPrefix,
+    generate_address,
+)
+from src.origin_ledger_sdk.requests.helpers import get_signer, signer_pool
+from src.origin_ledger_sdk.keys import KeyDeriver, ExtendedKey
+from src.origin_ledger_sdk.requests.publish_measurement_request import measurement_schema
+from src.origin_ledger_sdk.requests.serializers import to_bytes
+from src.origin_ledger_sdk.ledger_connector import measurement_deserializer, batch_status_deserializer
+from src.origin_ledger_sdk.ledger_dto.requests import PublishMeasurementRequest as LedgerPublishMeasurementRequest
+
+from test.stub_ledger import StubLedger
+
+from .harness import BenchmarkResult, measure
+
+
+MEASUREMENT_BODY = b'{"amount": 100, "type": "PRODUCTION", "begin": "2020-04-01T12:00:00+00:00", "end": "2020-04-01T13:00:00+00:00", "sector": "DK1"}'
+
+# Keys are reused between requests, as deriving them is not what is measured
+KEYS = [os.urandom(32) for _ in range(16)]
+
+
+def get_address(prefix: AddressPrefix, i: int) -> str:
+    public_key = get_signer(KEYS[i % len(KEYS)]).get_public_key().as_bytes()
+    return generate_address(prefix, public_key + i.to_bytes(8, 'big'))
+
+
+def build_publish_measurement(i):
+    begin = datetime(2020, 1, 1, tzinfo=timezone.utc) + timedelta(hours=i)
+    return PublishMeasurementRequest(
+        address=get_address(AddressPrefix.MEASUREMENT, i),
+        begin=begin,
+        end=begin + timedelta(hours=1),
+        sector='DK1',
+        type=MeasurementType.PRODUCTION,
+        amount=i,
+    )
+
+
+def build_issue_ggo(i):
+    return IssueGGORequest(
+        measurement_address=get_address(AddressPrefix.MEASUREMENT, i),
+        ggo_address=get_address(AddressPrefix.GGO, i),
+        tech_type='T010101',
+        fuel_type='F01010101',
+    )
+
+
+def build_transfer_ggo(i):
+    return TransferGGORequest(
+        source_private_key=KEYS[i % len(KEYS)],
+        source_address=get_address(AddressPrefix.GGO, i),
+        destination_address=get_address(AddressPrefix.GGO, i + 1),
+    )
+
+
+def build_split_ggo(i):
+    return SplitGGORequest(
+        source_private_key=KEYS[i % len(KEYS)],
+        source_address=get_address(AddressPrefix.GGO, i),
+        parts=[
+            SplitGGOPart(address=get_address(AddressPrefix.GGO, i + 1), amount=50),
+            SplitGGOPart(address=get_address(AddressPrefix.GGO, i + 2), amount=50),
+        ],
+    )
+
+
+def build_retire_ggo(i):
+    return RetireGGORequest(
+        settlement_address=get_address(AddressPrefix.SETTLEMENT, i),
+        measurement_address=get_address(AddressPrefix.MEASUREMENT, i),
+        measurement_private_key=KEYS[i % len(KEYS)],
+        parts=[RetireGGOPart(address=get_address(AddressPrefix.GGO, i), private_key=KEYS[(i + 1) % len(KEYS)])],
+    )
+
+
+# Request type -> (builder, transactions per request)
+REQUEST_TYPES = {
+    'publish_measurement': (build_publish_measurement, 1),
+    'issue_ggo': (build_issue_ggo, 1),
+    'transfer_ggo': (build_transfer_ggo, 1),
+    'split_ggo': (build_split_ggo, 1),
+    'retire_ggo': (build_retire_ggo, 2),
+}
+
+
+def build_batch(build: Callable, count: int) -> Batch:
+    batch = Batch(signer_private_key=KEYS[0])
+    for i in range(count):
+        batch.add_request(build(i))
+    return batch
+
+
+def bench_signing(sizes: List[int]) -> Iterator[BenchmarkResult]:
+    for name, (build, transactions_per_request) in REQUEST_TYPES.items():
+        for size in sizes:
+            count = max(1, size // transactions_per_request)
+
+            # Requests memoize their signed transactions, so every run gets new ones
+            yield measure(
+                name=f'get_signed_batch.{name}.{size}',
+                setup=lambda: build_batch(build, count),
+                run=lambda batch: batch.get_signed_batch(),
+                ops=count * transactions_per_request,
+            )
+
+
+def bench_serialization(sizes: List[int]) -> Iterator[BenchmarkResult]:
+    requests = [
+        LedgerPublishMeasurementRequest(
+            begin=datetime(2020, 1, 1, tzinfo=timezone.utc),
+            end=datetime(2020, 1, 1, 1, tzinfo=timezone.utc),
+            sector='DK1',
+            type=MeasurementType.PRODUCTION,
+            amount=i,
+        ) for i in range(1000)
+    ]
+
+    for compiled in (True, False):
+        def run(_):
+            for request in requests:
+                to_bytes(measurement_schema, request, compiled=compiled)
+
+        yield measure(
+            name=f'to_bytes.{"compiled" if compiled else "marshmallow"}',
+            run=run,
+            ops=len(requests),
+        )
+
+
+def bench_deserialization(sizes: List[int]) -> Iterator[BenchmarkResult]:
+    batch_statuses = (
+        b'{"data": ['
+        + b', '.join(b'{"id": "%d", "status": "COMMITTED", "invalid_transactions": []}' % i for i in range(100))
+        + b'], "link": "link"}'
+    )
+
+    for strict in (False, True):
+        mode = 'marshmallow' if strict else 'compiled'
+
+        def run_measurements(_):
+            for _ in range(1000):
+                measurement_deserializer.loads(MEASUREMENT_BODY, strict)
+
+        yield measure(
+            name=f'loads.Measurement.{mode}',
+            run=run_measurements,
+            ops=1000,
+        )
+        yield measure(
+            name=f'loads.BatchStatusResponseHeader.{mode}',
+            run=lambda _: batch_status_deserializer.loads(batch_statuses, strict),
+            ops=100,
+        )
+
+
+def bench_measurement_batch(sizes: List[int]) -> Iterator[BenchmarkResult]:
+    address = get_address(AddressPrefix.MEASUREMENT, 0)
+    begin = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    amounts = list(range(8784))
+
+    def build_requests(_):
+        return [
+            PublishMeasurementRequest(
+                address=address,
+                begin=begin + timedelta(hours=i),
+                end=begin + timedelta(hours=i + 1),
+                sector='DK1',
+                type=MeasurementType.PRODUCTION,
+                amount=amount,
+            ) for i, amount in enumerate(amounts)
+        ]
+
+    def build_measurement_batch(_):
+        return MeasurementBatch.hourly(address, begin, amounts, 'DK1', MeasurementType.PRODUCTION)
+
+    measurement_batch = build_measurement_batch(None)
+
+    # A year of hourly measurements, memory is the peak KiB
+    yield measure(name='PublishMeasurementRequest.year', run=build_requests, ops=len(amounts))
+    yield measure(name='MeasurementBatch.year', run=build_measurement_batch, ops=len(amounts))
+    yield measure(name='MeasurementBatch.payloads', run=lambda _: measurement_batch._build_payloads(), ops=len(amounts))
+
+    def build_signed_batch(size):
+        batch = Batch(signer_private_key=KEYS[0])
+        batch.add_request(measurement_batch.split(size)[0])
+        return batch
+
+    # Compare with get_signed_batch.PublishMeasurementRequest of the signing benchmark
+    for size in sizes:
+        yield measure(
+            name=f'get_signed_batch.MeasurementBatch.{size}',
+            setup=lambda: build_signed_batch(size),
+            run=lambda batch: batch.get_signed_batch(),
+            ops=size,
+        )
+
+
+def bench_keys(sizes: List[int]) -> Iterator[BenchmarkResult]:
+    master = ExtendedKey.from_entropy(KEYS[0])
+
+    def derive_cold(_):
+        KeyDeriver(master).derive_range([1, 42], 0, 1000)
+
+    deriver = KeyDeriver(master)
+
+    def derive_paths(_):
+        for i in range(1000):
+            deriver.derive([1, i % 10, i])
+
+    yield measure(name='KeyDeriver.derive_range', run=derive_cold, ops=1000)
+    yield measure(name='KeyDeriver.derive', run=derive_paths, ops=1000)
+
+
+def bench_get_signer(sizes: List[int]) -> Iterator[BenchmarkResult]:
+    keys = [os.urandom(32) for _ in range(100)]
+
+    def run(_):
+        for key in keys:
+            get_signer(key)
+
+    yield measure(name='get_signer.cold', setup=signer_pool.clear, run=run, ops=len(keys))
+    yield measure(name='get_signer.warm', run=run, ops=len(keys))
+
+
+def bench_batch_list(sizes: List[int]) -> Iterator[BenchmarkResult]:
+    for size in sizes:
+        batch_list = BatchList(batches=[build_batch(build_publish_measurement, size).get_signed_batch()])
+
+        yield measure(
+            name=f'BatchList.SerializeToString.{size}',
+            run=lambda _: batch_list.SerializeToString(),
+            ops=size,
+        )
+
+        # Signing included, as the encoder signs while it serializes
+        def serialize(batch):
+            BatchList(batches=[batch.get_signed_batch()]).SerializeToString()
+
+        def encode(batch):
+            for _ in BatchListEncoder().encode([batch]):
+                pass
+
+        setup = lambda: build_batch(build_publish_measurement, size)
+
+        yield measure(name=f'BatchList.sign_and_serialize.{size}', run=serialize, setup=setup, ops=size)
+        yield measure(name=f'BatchListEncoder.encode.{size}', run=encode, setup=setup, ops=size)
+
+
+def bench_ledger(sizes: List[int]) -> Iterator[BenchmarkResult]:
+    addresses = [get_address(AddressPrefix.MEASUREMENT, i) for i in range(1000)]
+    signed_batches = [build_batch(build_publish_measurement, 1).get_signed_batch() for _ in range(100)]
+
+    with StubLedger() as stub, Ledger(stub.url) as ledger, tempfile.TemporaryDirectory() as directory, \
+            BatchSpool(directory) as spool:
+        for address in addresses:
+            stub.put_state(address, MEASUREMENT_BODY)
+
+        def read(_):
+            for address in addresses[:100]:
+                ledger.get_measurement(address)
+
+        def read_bulk(_):
+            result = ledger.get_measurements(addresses)
+            assert not result.errors
+
+        def submit(_):
+            for signed_batch in signed_batches:
+                ledger._send_batches([signed_batch])
+
+        yield measure(name='Ledger.get_measurement', run=read, ops=100)
+        yield measure(name='Ledger.get_measurements', run=read_bulk, ops=len(addresses))
+        yield measure(name='Ledger.submit', run=submit, ops=len(signed_batches))
+        yield measure(
+            name='Ledger.send_spooled',
+            run=lambda _: ledger.send_spooled(spool),
+            setup=lambda: spool.add_signed(signed_batches),
+            ops=len(signed_batches),
+        )
+
+
+BENCHMARKS = {
+    'signing': bench_signing,
+    'serialization': bench_serialization,
+    'deserialization': bench_deserialization,
+    'measurement_batch': bench_measurement_batch,
+    'get_signer': bench_get_signer,
+    'keys': bench_keys,
+    'batch_list': bench_batch_list,
+    'ledger': bench_ledger,
+}
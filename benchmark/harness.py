@@ -0,0 +1,111 @@
+import json
+import math
+import time
+import platform
+import tracemalloc
+
+from typing import List, Dict, Callable, Any
+from dataclasses import dataclass, field, asdict
+
+
+@dataclass
+class BenchmarkResult:
+    name: str = field()
+    ops: int = field()
+    iterations: int = field()
+    ops_per_sec: float = field()
+    p50_ms: float = field()
+    p99_ms: float = field()
+    peak_memory_bytes: int = field()
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """
+    Returns the p'th percentile of the sorted values, using nearest rank.
+    """
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+def measure(name: str, run: Callable[[Any], Any], setup: Callable[[], Any] = lambda: None,
+            ops: int = 1, min_time=1.0, min_iterations=3, max_iterations=1000) -> BenchmarkResult:
+    """
+    Measures run(setup()) repeatedly, until it has run for at least
+    min_time seconds and min_iterations times. Only run is timed.
+
+    Peak memory is measured in a separate iteration, as tracing memory
+    allocations slows down the code being measured.
+
+    :param str name: The name of the benchmark.
+    :param run: The code to measure, called with the result of setup.
+    :param setup: Prepares the input for a single run.
+    :param int ops: The number of operations performed by a single run.
+    """
+    run(setup())  # Warm up
+
+    tracemalloc.start()
+    try:
+        run(setup())
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    timings = []
+    total = 0.0
+
+    while len(timings) < max_iterations and (len(timings) < min_iterations or total < min_time):
+        arg = setup()
+        begin = time.perf_counter()
+        run(arg)
+        elapsed = time.perf_counter() - begin
+        timings.append(elapsed)
+        total += elapsed
+
+    timings.sort()
+
+    return BenchmarkResult(
+        name=name,
+        ops=ops,
+        iterations=len(timings),
+        ops_per_sec=ops * len(timings) / total if total else float('inf'),
+        p50_ms=percentile(timings, 50) * 1000,
+        p99_ms=percentile(timings, 99) * 1000,
+        peak_memory_bytes=peak_memory,
+    )
+
+
+def save_results(path: str, results: List[BenchmarkResult]):
+    with open(path, 'w') as f:
+        json.dump({
+            'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'results': [asdict(result) for result in results],
+        }, f, indent=2)
+
+
+def load_results(path: str) -> Dict[str, BenchmarkResult]:
+    with open(path) as f:
+        return {r['name']: BenchmarkResult(**r) for r in json.load(f)['results']}
+
+
+def compare_results(baseline: Dict[str, BenchmarkResult], results: List[BenchmarkResult],
+                    tolerance: float) -> List[str]:
+    """
+    Returns a description of every benchmark whose throughput dropped
+    more than tolerance (a fraction) below the baseline.
+    """
+    regressions = []
+
+    for result in results:
+        previous = baseline.get(result.name)
+        if previous is None or not previous.ops_per_sec:
+            continue
+
+        change = result.ops_per_sec / previous.ops_per_sec - 1
+        if change < -tolerance:
+            regressions.append(
+                f'{result.name}: {result.ops_per_sec:,.0f} ops/sec, '
+                f'{-change:.0%} slower than {previous.ops_per_sec:,.0f} ops/sec'
+            )
+
+    return regressions
@@ -37,5 +37,8 @@ setup(
         'sawtooth-sdk==1.2.3',
         'marshmallow-dataclass',
         'marshmallow-enum'
-    ]
+    ],
+    extras_require={
+        'async': ['aiohttp'],
+    }
 )
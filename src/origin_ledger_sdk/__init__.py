@@ -1,27 +1,122 @@
-from .batch import Batch, BatchStatus
-
-from .requests import (
-    PublishMeasurementRequest,
-    IssueGGORequest,
-    SplitGGOPart,
-    SplitGGORequest,
-    TransferGGORequest,
-    RetireGGORequest,
-    RetireGGOPart,
-)
-
-from .ledger_connector import (
-    Ledger,
-    LedgerException,
-    LedgerConnectionError,
-)
-
-from .ledger_dto import (
-    GGO,
-    Measurement,
-    MeasurementType,
-    AddressPrefix,
-    generate_address,
-    Settlement,
-    SettlementPart,
-)
+"""
+The public names of the SDK are imported from their modules the first
+time they are used, so importing the package does not load sawtooth,
+marshmallow, requests, aiohttp and zmq up front.
+"""
+import importlib
+
+from typing import TYPE_CHECKING
+
+
+_exports = {
+    '.batch': ('Batch', 'BatchStatus'),
+    '.signing': ('ParallelSigner',),
+    '.streaming': ('BatchListEncoder',),
+    '.requests': (
+        'PublishMeasurementRequest',
+        'MeasurementBatch',
+        'IssueGGORequest',
+        'SplitGGOPart',
+        'SplitGGORequest',
+        'TransferGGORequest',
+        'RetireGGORequest',
+        'RetireGGOPart',
+        'DependencyCycleError',
+        'Conflict',
+        'ConflictError',
+    ),
+    '.ledger_connector': (
+        'Ledger',
+        'LedgerException',
+        'LedgerConnectionError',
+        'BulkReadResult',
+        'get_batch_ids',
+    ),
+    '.async_ledger_connector': ('AsyncLedger',),
+    '.zmq_ledger_connector': ('ZmqLedger',),
+    '.multi_ledger': ('MultiLedger', 'NodeStatus'),
+    '.events': ('LedgerSubscriber',),
+    '.cache': ('StateCache',),
+    '.submitter': ('BatchSubmitter', 'SubmittedBatch'),
+    '.scheduler': ('SubmissionScheduler', 'AimdController'),
+    '.ingest': ('IngestPipeline', 'IngestProgress', 'read_measurements'),
+    '.journal': ('SubmissionJournal', 'BatchState', 'JournalError'),
+    '.spool': ('BatchSpool', 'SpoolError'),
+    '.keys': ('KeyDeriver', 'ExtendedKey', 'DerivedKey'),
+    '.instrumentation': ('Collector', 'InMemoryCollector', 'register_collector', 'unregister_collector'),
+    '.ledger_dto': (
+        'GGO',
+        'Measurement',
+        'MeasurementType',
+        'AddressPrefix',
+        'generate_address',
+        'Settlement',
+        'SettlementPart',
+    ),
+}
+
+_modules = {name: module for module, names in _exports.items() for name in names}
+
+__all__ = list(_modules)
+
+
+def __getattr__(name):
+    module = _modules.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+if TYPE_CHECKING:
+    from .batch import Batch, BatchStatus
+    from .signing import ParallelSigner
+    from .streaming import BatchListEncoder
+    from .requests import (
+        PublishMeasurementRequest,
+        MeasurementBatch,
+        IssueGGORequest,
+        SplitGGOPart,
+        SplitGGORequest,
+        TransferGGORequest,
+        RetireGGORequest,
+        RetireGGOPart,
+        DependencyCycleError,
+        Conflict,
+        ConflictError,
+    )
+    from .ledger_connector import (
+        Ledger,
+        LedgerException,
+        LedgerConnectionError,
+        BulkReadResult,
+        get_batch_ids,
+    )
+    from .async_ledger_connector import AsyncLedger
+    from .zmq_ledger_connector import ZmqLedger
+    from .multi_ledger import MultiLedger, NodeStatus
+    from .events import LedgerSubscriber
+    from .cache import StateCache
+    from .submitter import BatchSubmitter, SubmittedBatch
+    from .scheduler import SubmissionScheduler, AimdController
+    from .ingest import IngestPipeline, IngestProgress, read_measurements
+    from .journal import SubmissionJournal, BatchState, JournalError
+    from .spool import BatchSpool, SpoolError
+    from .keys import KeyDeriver, ExtendedKey, DerivedKey
+    from .instrumentation import Collector, InMemoryCollector, register_collector, unregister_collector
+    from .ledger_dto import (
+        GGO,
+        Measurement,
+        MeasurementType,
+        AddressPrefix,
+        generate_address,
+        Settlement,
+        SettlementPart,
+    )
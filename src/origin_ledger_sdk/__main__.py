@@ -0,0 +1,91 @@
+"""
+Command line interface of the SDK:
+
+    python -m origin_ledger_sdk ingest measurements.jsonl --url https://url-to-ledger --key-file key.hex
+"""
+import os
+import sys
+import time
+import argparse
+
+from .ledger_connector import Ledger
+from .ingest import IngestPipeline, IngestProgress, read_measurements, FORMATS
+
+
+def read_private_key(path: str) -> bytes:
+    """
+    Reads a private key stored either as hex or as the raw 32 bytes.
+    """
+    with open(path, 'rb') as f:
+        content = f.read()
+
+    try:
+        return bytes.fromhex(content.decode().strip())
+    except (UnicodeDecodeError, ValueError):
+        return content
+
+
+def ingest(args) -> int:
+    if args.key_file:
+        private_key = read_private_key(args.key_file)
+    elif os.environ.get('LEDGER_PRIVATE_KEY'):
+        private_key = bytes.fromhex(os.environ['LEDGER_PRIVATE_KEY'])
+    else:
+        print('A private key is required, use --key-file or LEDGER_PRIVATE_KEY', file=sys.stderr)
+        return 2
+
+    format = args.format or ('csv' if args.file.endswith('.csv') else 'jsonl')
+    last_report = 0
+
+    def report(progress: IngestProgress, force=False):
+        nonlocal last_report
+        if args.quiet or (not force and time.monotonic() - last_report < args.report_interval):
+            return
+        last_report = time.monotonic()
+        print(f'{progress.transactions:,} transactions in {progress.batches:,} batches, '
+              f'{progress.bytes / 1024 / 1024:,.1f} MiB, {progress.transactions_per_second:,.0f} transactions/sec',
+              file=sys.stderr)
+
+    with Ledger(args.url, verify=not args.insecure) as ledger:
+        pipeline = IngestPipeline(
+            ledger,
+            private_key,
+            max_batch_transactions=args.batch_size,
+            max_list_batches=args.list_size,
+            max_pending=args.pending,
+            senders=args.senders,
+            progress=report,
+        )
+
+        with open(args.file, newline='') as f:
+            result = pipeline.run(read_measurements(f, format))
+
+    report(result, force=True)
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m origin_ledger_sdk')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    parser_ingest = commands.add_parser('ingest', help='Publish the measurements in a JSONL or CSV file.')
+    parser_ingest.add_argument('file', help='The file to read, with the fields address, begin, end, sector, type and amount.')
+    parser_ingest.add_argument('--url', required=True, help='The url of the ledgers REST API.')
+    parser_ingest.add_argument('--key-file', help='File with the private key to sign with, as hex or raw bytes. '
+                                                  'Defaults to the hex in the LEDGER_PRIVATE_KEY environment variable.')
+    parser_ingest.add_argument('--format', choices=FORMATS, help='The format of the file, guessed from its extension by default.')
+    parser_ingest.add_argument('--batch-size', type=int, default=100, help='The maximum number of transactions in a batch.')
+    parser_ingest.add_argument('--list-size', type=int, default=20, help='The maximum number of batches sent in one request.')
+    parser_ingest.add_argument('--pending', type=int, default=4, help='The number of requests which may wait to be sent.')
+    parser_ingest.add_argument('--senders', type=int, default=1, help='The number of requests sent concurrently.')
+    parser_ingest.add_argument('--report-interval', type=float, default=5, help='Seconds between progress reports.')
+    parser_ingest.add_argument('--insecure', action='store_true', help="Do not verify the ledgers TLS certificate.")
+    parser_ingest.add_argument('--quiet', action='store_true', help='Do not report progress.')
+    parser_ingest.set_defaults(handler=ingest)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,125 @@
+import asyncio
+
+from typing import Tuple
+
+from sawtooth_sdk.protobuf.batch_pb2 import BatchList
+
+from .batch import Batch
+from .signing import ParallelSigner
+from .ledger_dto import Measurement, GGO, Settlement
+from .ledger_connector import (
+    LedgerConnectionError,
+    BatchStatusResponse,
+    StateResponse,
+    state_response_deserializer,
+    measurement_deserializer,
+    ggo_deserializer,
+    settlement_deserializer,
+    _decode_handle,
+    _decode_batch_status,
+    _decode_state,
+)
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class AsyncLedger(object):
+    """
+    asyncio counterpart of Ledger, using non-blocking I/O through aiohttp.
+
+    Batches are signed in an executor so signing does not block the event
+    loop, and at most max_concurrency requests are in flight at a time.
+
+    :param str url: The url of the ledgers REST API.
+    :param bool verify: Whether to verify the servers TLS certificate.
+    :param int max_concurrency: The maximum number of requests in flight.
+    :param float connect_timeout: Seconds to wait for a connection to be established.
+    :param float read_timeout: Seconds to wait for the ledger to send a response.
+    :param concurrent.futures.Executor executor: Executor to sign batches in, defaults to the loops default executor.
+    :param bool strict: Whether to validate responses with marshmallow,
+        instead of decoding them straight into objects.
+    """
+
+    def __init__(self, url, verify=True, max_concurrency=100, connect_timeout=10,
+                 read_timeout=60, executor=None, strict=False):
+        if aiohttp is None:
+            raise ImportError('AsyncLedger requires aiohttp, install Origin-Ledger-SDK[async]')
+
+        self.url = url
+        self.verify = verify
+        self.max_concurrency = max_concurrency
+        self.strict = strict
+        self._timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        self._executor = executor
+        self._semaphore = None
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self) -> 'aiohttp.ClientSession':
+        if self._session is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._session = aiohttp.ClientSession(
+                timeout=self._timeout,
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency, ssl=None if self.verify else False),
+            )
+        return self._session
+
+    async def _request(self, method, url, **kwargs) -> Tuple[int, bytes]:
+        """
+        Returns the status code and body of the response.
+        """
+        session = self._get_session()
+
+        async with self._semaphore:
+            try:
+                async with session.request(method, url, **kwargs) as response:
+                    return response.status, await response.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                raise LedgerConnectionError(f'Failed to perform http {method} to ledger')
+
+    async def execute_batch(self, batch: Batch, parallel_signer: ParallelSigner = None) -> str:
+        loop = asyncio.get_running_loop()
+        signed_batch = await loop.run_in_executor(self._executor, batch.get_signed_batch, parallel_signer)
+        return await self._send_batches([signed_batch])
+
+    async def get_batch_status(self, link: str) -> BatchStatusResponse:
+        _, content = await self._request('GET', link)
+        return _decode_batch_status(content, self.strict)
+
+    async def _send_batches(self, signed_batches) -> str:
+        batch_list_bytes = BatchList(batches=signed_batches).SerializeToString()
+
+        status_code, content = await self._request(
+            'POST',
+            f'{self.url}/batches',
+            data=batch_list_bytes,
+            headers={'Content-Type': 'application/octet-stream'},
+        )
+
+        return _decode_handle(content, status_code, self.strict)
+
+    async def _get_state(self, address) -> StateResponse:
+        _, content = await self._request('GET', f'{self.url}/state/{address}')
+        return state_response_deserializer.loads(content, self.strict)
+
+    async def get_measurement(self, address: str) -> Measurement:
+        return _decode_state(await self._get_state(address), measurement_deserializer, address, self.strict)
+
+    async def get_ggo(self, address: str) -> GGO:
+        return _decode_state(await self._get_state(address), ggo_deserializer, address, self.strict)
+
+    async def get_settlement(self, address: str) -> Settlement:
+        return _decode_state(await self._get_state(address), settlement_deserializer, address, self.strict)
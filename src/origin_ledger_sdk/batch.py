@@ -1,11 +1,15 @@
 from enum import Enum
-from typing import List
+from typing import List, Iterator
 
 from sawtooth_sdk.protobuf.batch_pb2 import BatchHeader
 from sawtooth_sdk.protobuf.batch_pb2 import Batch as SignedBatch
+from sawtooth_sdk.protobuf.transaction_pb2 import Transaction
 
-from .requests import AbstractRequest
-from .requests.helpers import get_signer
+from .requests import AbstractRequest, Conflict, order_requests, find_conflicts, split_conflicts
+from .requests.dependency_graph import topological_order
+from .requests.helpers import get_signer, get_public_key_hex
+from .signing import ParallelSigner
+from .instrumentation import span, observe
 
 
 class BatchStatus(Enum):
@@ -23,20 +27,98 @@ class Batch():
     def add_request(self, request: AbstractRequest):
         self._requests.append(request)
 
-    def get_signed_batch(self) -> SignedBatch:
+    @property
+    def requests(self) -> List[AbstractRequest]:
+        return self._requests
+
+    def find_conflicts(self) -> List[Conflict]:
+        """
+        Returns the requests which access the same addresses without
+        depending on each other, and the GGOs spent more than once.
+        Either would make the ledger reject the whole batch.
+        """
+        return find_conflicts(self._requests)
+
+    def split_conflicts(self) -> List['Batch']:
+        """
+        Splits the batch into batches without conflicts, making the later
+        request of each conflict depend on the earlier. Send them with
+        Ledger.execute_batches, which keeps them in order.
+
+        Raises ConflictError if any GGO is spent more than once.
+        """
+        batches = []
+
+        for requests in split_conflicts(self._requests):
+            batch = Batch(self._signer_private_key)
+            for request in requests:
+                batch.add_request(request)
+            batches.append(batch)
+
+        return batches
+
+    def get_signed_batch(self, parallel_signer: ParallelSigner = None) -> SignedBatch:
         signer = get_signer(self._signer_private_key)
-        signed_transactions = [t for r in self._requests for t in r.get_signed_transactions(signer) ]
+        requests = order_requests(self._requests)
+
+        with span('batch_sign_transactions_seconds'):
+            if parallel_signer is not None:
+                signed_transactions = parallel_signer.sign(self._signer_private_key, requests)
+            else:
+                signed_transactions = [t for r in requests for t in r.get_signed_transactions(signer) ]
+
+        observe('batch_transactions', len(signed_transactions))
+
+        with span('batch_sign_seconds'):
+            return sign_batch(signer, signed_transactions)
+
+    def iter_signed_transactions(self, signer=None) -> Iterator[Transaction]:
+        """
+        Yields the signed transactions of the batch in the same order as
+        get_signed_batch, signing each request when it is reached.
+
+        Requests which have not been signed before are not memoized, so
+        their transactions can be dropped once written. Only the header
+        signature of each is kept, for the requests depending on it, in
+        this batch or later batches.
+        """
+        if signer is None:
+            signer = get_signer(self._signer_private_key)
+
+        for request in order_requests(self._requests):
+            if '_signed_transactions' in request.__dict__:
+                yield from request.get_signed_transactions(signer)
+            else:
+                transactions = request.build_transactions(signer)
+                request._record_signing(transactions)
+                yield from transactions
+
+
+def order_batches(batches: List[Batch]) -> List[Batch]:
+    """
+    Orders the batches so every batch comes after the batches
+    containing requests that its own requests depend on.
+    """
+    batch_of = {id(r): b for b in batches for r in b.requests}
+
+    def get_dependencies(batch):
+        return [batch_of[id(d)] for r in batch.requests for d in r.dependencies
+                if id(d) in batch_of and batch_of[id(d)] is not batch]
+
+    return topological_order(batches, get_dependencies)
+
 
-        batch_header_bytes = BatchHeader(
-            signer_public_key=signer.get_public_key().as_hex(),
-            transaction_ids=[txn.header_signature for txn in signed_transactions],
-        ).SerializeToString()
+def sign_batch(signer, signed_transactions: List[Transaction]) -> SignedBatch:
+    batch_header_bytes = BatchHeader(
+        signer_public_key=get_public_key_hex(signer),
+        transaction_ids=[txn.header_signature for txn in signed_transactions],
+    ).SerializeToString()
 
-        signature = signer.sign(batch_header_bytes)
-        batch = SignedBatch(
-            header=batch_header_bytes,
-            header_signature=signature,
-            transactions=signed_transactions
-        )
+    signature = signer.sign(batch_header_bytes)
+    batch = SignedBatch(
+        header=batch_header_bytes,
+        header_signature=signature,
+        transactions=signed_transactions
+    )
 
-        return batch
+    return batch
@@ -0,0 +1,169 @@
+import sys
+import time
+import threading
+
+from collections import OrderedDict, Counter
+from typing import Iterable
+from dataclasses import is_dataclass, fields
+
+
+def _sizeof(obj, seen=None) -> int:
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+
+    if is_dataclass(obj):
+        size += sum(_sizeof(getattr(obj, f.name), seen) for f in fields(obj))
+    elif isinstance(obj, dict):
+        size += sum(_sizeof(k, seen) + _sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(_sizeof(v, seen) for v in obj)
+
+    return size
+
+
+class StateCache(object):
+    """
+    Bounded LRU cache of objects read from the ledger, keyed by their
+    address and the head (block id) they were read at.
+
+    State at a given head never changes, so reads pinned to a head are
+    kept until evicted. Reads of the current state are also kept for
+    ttl seconds, unless the address is invalidated before then.
+
+    The current state of the outputs of a submitted batch is not cached
+    until the batch is seen to be COMMITTED or INVALID, as reads until
+    then may return the state from before the batch. At most max_entries
+    batches are tracked, the oldest being forgotten first.
+
+    The cached objects are shared between readers and must not be modified.
+
+    :param int max_entries: The maximum number of entries to keep.
+    :param float ttl: Seconds a read of the current state is served from the cache, None for no expiry.
+    """
+
+    def __init__(self, max_entries=10000, ttl=5):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._pending = OrderedDict()
+        self._pending_addresses = Counter()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get(self, address: str, head: str = None):
+        key = (address, head)
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and head is None and self.ttl is not None \
+                    and time.monotonic() - entry[1] > self.ttl:
+                del self._entries[key]
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, address: str, head: str, obj, pinned=False):
+        """
+        Stores an object read at the given head. Unless the read was
+        pinned to the head, it is also stored as the current state.
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            if head is not None:
+                self._store((address, head), obj, now)
+            if not pinned and address not in self._pending_addresses:
+                self._store((address, None), obj, now)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _store(self, key, obj, now):
+        self._entries[key] = (obj, now)
+        self._entries.move_to_end(key)
+
+    def invalidate(self, addresses: Iterable[str]):
+        """
+        Removes the current state of the addresses.
+        """
+        with self._lock:
+            for address in addresses:
+                self._entries.pop((address, None), None)
+
+    def submitted(self, batch_id: str, addresses: Iterable[str]):
+        """
+        Removes the current state of the outputs of a submitted batch, and
+        stops caching it until the batch is finalized.
+        """
+        addresses = set(addresses)
+
+        with self._lock:
+            if batch_id in self._pending:
+                return
+
+            self._pending[batch_id] = addresses
+            self._pending_addresses.update(addresses)
+
+            for address in addresses:
+                self._entries.pop((address, None), None)
+
+            while len(self._pending) > self.max_entries:
+                self._release(self._pending.popitem(last=False)[1])
+
+    def finalized(self, batch_id: str):
+        """
+        Removes the current state of the outputs of a batch which is
+        COMMITTED or INVALID, as it may have been read before the batch
+        was committed, and caches it again from then on.
+        """
+        with self._lock:
+            addresses = self._pending.pop(batch_id, None)
+
+            if addresses is not None:
+                self._release(addresses)
+
+                for address in addresses:
+                    self._entries.pop((address, None), None)
+
+    def _release(self, addresses):
+        self._pending_addresses.subtract(addresses)
+        for address in addresses:
+            if self._pending_addresses[address] <= 0:
+                del self._pending_addresses[address]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._pending.clear()
+            self._pending_addresses.clear()
+
+    def memory_usage(self) -> int:
+        """
+        Returns an estimate of the number of bytes used by the cached objects.
+        """
+        with self._lock:
+            entries = list(self._entries.items())
+
+        seen = set()
+        return sys.getsizeof(self._entries) + sum(_sizeof(k, seen) + _sizeof(v[0], seen) for k, v in entries)
@@ -0,0 +1,197 @@
+import json
+import typing
+import dataclasses
+
+from enum import Enum
+from datetime import datetime
+from marshmallow import ValidationError, fields
+from marshmallow_dataclass import class_schema
+
+
+class CompileError(Exception):
+    pass
+
+
+def _identity(value):
+    return value
+
+
+_DATETIME_FIELD = fields.DateTime()
+
+
+def parse_datetime(value: str) -> datetime:
+    """
+    Returns the ISO 8601 datetime, ie. with a trailing 'Z' for UTC.
+    Raises marshmallow.ValidationError if it is not one.
+    """
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        # fromisoformat() only reads every ISO 8601 format from Python 3.11
+        return _DATETIME_FIELD.deserialize(value)
+
+
+def _compile_datetime():
+    return parse_datetime
+
+
+def _compile_enum(enum_class):
+    members = enum_class.__members__
+
+    def convert(value):
+        try:
+            return members[value]
+        except (KeyError, TypeError):
+            raise ValueError(f'{value!r} is not a {enum_class.__name__}')
+
+    return convert
+
+
+def _compile_type(typ):
+    """
+    Returns a function converting a JSON value to the type, the same
+    way the marshmallow field for the type does for well-formed data.
+    """
+    origin = getattr(typ, '__origin__', None)
+    args = getattr(typ, '__args__', ())
+
+    if typ in (str, bool, typing.Any):
+        return _identity
+
+    if typ is int:
+        return lambda value: value if type(value) is int else int(value)
+
+    if typ is float:
+        return float
+
+    if typ is datetime:
+        return _compile_datetime()
+
+    if isinstance(typ, type) and issubclass(typ, Enum):
+        return _compile_enum(typ)
+
+    if dataclasses.is_dataclass(typ):
+        return _compile_dataclass(typ)
+
+    if origin is typing.Union and len(args) == 2 and type(None) in args:
+        inner = _compile_type(args[0] if args[1] is type(None) else args[1])
+        return lambda value: None if value is None else inner(value)
+
+    if origin is list:
+        inner = _compile_type(args[0]) if args else _identity
+        if inner is _identity:
+            return _identity
+        return lambda value: [inner(v) for v in value]
+
+    if origin is dict:
+        key = _compile_type(args[0]) if args else _identity
+        inner = _compile_type(args[1]) if args else _identity
+        if key is _identity and inner is _identity:
+            return _identity
+        return lambda value: {key(k): inner(v) for k, v in value.items()}
+
+    raise CompileError(f'Can not compile type {typ!r}')
+
+
+def _compile_dataclass(cls):
+    hints = typing.get_type_hints(cls)
+    compiled = []
+
+    for field in dataclasses.fields(cls):
+        if not field.init:
+            continue
+        required = field.default is dataclasses.MISSING and field.default_factory is dataclasses.MISSING
+        compiled.append((field.name, required, _compile_type(hints[field.name])))
+
+    def convert(data: dict):
+        kwargs = {}
+        for name, required, convert_value in compiled:
+            value = data.get(name, dataclasses.MISSING)
+            if value is dataclasses.MISSING:
+                if required:
+                    raise ValidationError('Missing data for required field.', name)
+            elif value is None:
+                kwargs[name] = None
+            else:
+                kwargs[name] = convert_value(value)
+        return cls(**kwargs)
+
+    return convert
+
+
+class CompiledDeserializer(object):
+    """
+    Decodes JSON into a dataclass without running it through marshmallow,
+    by converting each field straight from the parsed JSON.
+
+    This is meant for data from the ledger, which is well-formed: fields
+    the dataclass does not know are ignored, and values are only checked
+    as far as converting them requires. With strict=True, data is loaded
+    with the marshmallow schema of the dataclass instead.
+
+    Dataclasses which can not be compiled are always loaded with marshmallow.
+    Either way, invalid data raises a ValidationError.
+
+    Neither the schema nor the compiled functions are built until they are
+    first used, so creating a deserializer at import time is cheap.
+    """
+
+    def __init__(self, cls):
+        self.cls = cls
+        self._schema = None
+        self._convert = None
+        self._compiled = None
+
+    @property
+    def schema(self):
+        if self._schema is None:
+            self._schema = class_schema(self.cls)()
+        return self._schema
+
+    @property
+    def compiled(self) -> bool:
+        self._compile()
+        return self._compiled
+
+    def _compile(self):
+        if self._convert is not None:
+            return
+
+        try:
+            convert = _compile_dataclass(self.cls)
+            self._compiled = True
+        except CompileError:
+            convert = self.schema.load
+            self._compiled = False
+
+        self._convert = convert
+
+    def load(self, data: dict, strict=False):
+        if strict:
+            return self.schema.load(data)
+
+        if self._convert is None:
+            self._compile()
+
+        try:
+            return self._convert(data)
+        except ValidationError:
+            raise
+        except (KeyError, ValueError, TypeError, AttributeError) as e:
+            raise ValidationError(f'Invalid {self.cls.__name__}: {e}')
+
+    def loads(self, content, strict=False):
+        if strict:
+            return self.schema.loads(content)
+
+        return self.load(json.loads(content))
+
+
+_deserializers = {}
+
+
+def get_deserializer(cls) -> CompiledDeserializer:
+    deserializer = _deserializers.get(cls)
+    if deserializer is None:
+        deserializer = _deserializers[cls] = CompiledDeserializer(cls)
+    return deserializer
@@ -0,0 +1,231 @@
+import logging
+import threading
+
+from typing import List, Dict, Iterable, Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from sawtooth_sdk.protobuf.validator_pb2 import Message
+from sawtooth_sdk.protobuf.events_pb2 import EventList, EventSubscription, EventFilter
+from sawtooth_sdk.protobuf.transaction_receipt_pb2 import StateChangeList, StateChange
+from sawtooth_sdk.protobuf.client_event_pb2 import (
+    ClientEventsSubscribeRequest,
+    ClientEventsSubscribeResponse,
+    ClientEventsUnsubscribeRequest,
+    ClientEventsUnsubscribeResponse,
+)
+
+from .batch import BatchStatus
+from .ledger_dto import AddressPrefix, generate_address
+from .ledger_connector import (
+    LedgerException,
+    BatchStatusResponse,
+    measurement_deserializer,
+    ggo_deserializer,
+    settlement_deserializer,
+    get_batch_ids,
+    _decode_object,
+)
+from .zmq_ledger_connector import ZmqLedger
+
+
+BLOCK_COMMIT = 'sawtooth/block-commit'
+STATE_DELTA = 'sawtooth/state-delta'
+
+_deserializers = {
+    AddressPrefix.GGO: ggo_deserializer,
+    AddressPrefix.MEASUREMENT: measurement_deserializer,
+    AddressPrefix.SETTLEMENT: settlement_deserializer,
+}
+
+
+def get_address_prefix(prefix: AddressPrefix) -> str:
+    """
+    Returns the hex prefix shared by every address of the given type.
+    """
+    return generate_address(prefix, b'')[:6]
+
+
+class LedgerSubscriber(object):
+    """
+    Subscribes to block commits and state changes on a validator.
+
+    Futures returned by watch_batches are resolved when their batches are
+    committed or invalid, which is checked once per committed block instead
+    of polling. Changes to GGOs, measurements and settlements are decoded
+    and passed to the registered callbacks as callback(address, obj, block_id),
+    where obj is None if the address was deleted.
+
+    If the ledger has a cache, changed addresses are invalidated in it.
+
+    :param ZmqLedger ledger: The ledger connected to the validator.
+    :param Iterable[AddressPrefix] prefixes: The types of state to receive changes for.
+    """
+
+    def __init__(self, ledger: ZmqLedger, prefixes: Iterable[AddressPrefix] = tuple(AddressPrefix)):
+        self.ledger = ledger
+        self._prefixes = {get_address_prefix(prefix): _deserializers[prefix] for prefix in prefixes}
+        self._callbacks: List[Callable] = []
+        self._pending: Dict[str, Future] = {}
+        self._check_scheduled = False
+        self._lock = threading.Lock()
+        # Requests to the validator can not be made from the connections
+        # I/O thread which delivers the events, so events are handled here.
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def add_callback(self, callback: Callable):
+        self._callbacks.append(callback)
+
+    def start(self, last_known_block_ids: List[str] = None):
+        self.ledger.connection.add_listener(Message.CLIENT_EVENTS, self._on_events)
+
+        address_filter = EventFilter(
+            key='address',
+            match_string=f'^({"|".join(self._prefixes)}).*',
+            filter_type=EventFilter.REGEX_ANY,
+        )
+
+        response = self.ledger.connection.request(
+            Message.CLIENT_EVENTS_SUBSCRIBE_REQUEST,
+            ClientEventsSubscribeRequest(
+                subscriptions=[
+                    EventSubscription(event_type=BLOCK_COMMIT),
+                    EventSubscription(event_type=STATE_DELTA, filters=[address_filter]),
+                ],
+                last_known_block_ids=last_known_block_ids or [],
+            ),
+            ClientEventsSubscribeResponse,
+        )
+
+        if response.status != ClientEventsSubscribeResponse.OK:
+            raise LedgerException(f'Failed to subscribe to events: {response.response_message}')
+
+    def stop(self):
+        self.ledger.connection.remove_listener(Message.CLIENT_EVENTS, self._on_events)
+
+        try:
+            response = self.ledger.connection.request(
+                Message.CLIENT_EVENTS_UNSUBSCRIBE_REQUEST,
+                ClientEventsUnsubscribeRequest(),
+                ClientEventsUnsubscribeResponse,
+            )
+        finally:
+            self._executor.shutdown()
+
+            # Nothing resolves them anymore
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            for future in pending.values():
+                future.cancel()
+
+        if response.status != ClientEventsUnsubscribeResponse.OK:
+            raise LedgerException('Failed to unsubscribe from events')
+
+    def watch_batches(self, handles: Iterable[str]) -> List[Future]:
+        """
+        Returns a future for each batch, resolved with its BatchStatusResponse
+        once it is COMMITTED or INVALID. Futures which are not resolved when
+        the subscriber stops are cancelled.
+
+        :param Iterable[str] handles: Batch ids or handles returned by execute_batch.
+        """
+        futures = []
+
+        with self._lock:
+            for batch_id in (i for handle in handles for i in get_batch_ids(handle)):
+                future = self._pending.get(batch_id)
+                if future is None:
+                    future = self._pending[batch_id] = Future()
+                futures.append(future)
+
+        # The batches may have been committed before they were watched
+        self._schedule_check()
+
+        return futures
+
+    def _submit(self, fn, *args):
+        self._executor.submit(fn, *args).add_done_callback(self._log_failure)
+
+    @staticmethod
+    def _log_failure(future: Future):
+        if not future.cancelled() and future.exception() is not None:
+            logging.error('Failed to handle ledger events', exc_info=future.exception())
+
+    def _schedule_check(self):
+        """
+        Schedules a check of the pending batches, unless one is already
+        waiting to run, so the statuses of every pending batch are
+        requested at most once for all the blocks committed meanwhile.
+        """
+        with self._lock:
+            if self._check_scheduled:
+                return
+            self._check_scheduled = True
+
+        self._submit(self._check_pending)
+
+    def _on_events(self, message):
+        self._submit(self._handle_events, EventList.FromString(message.content))
+
+    def _handle_events(self, event_list: EventList):
+        block_id = None
+        committed = False
+
+        for event in event_list.events:
+            if event.event_type == BLOCK_COMMIT:
+                committed = True
+                block_id = next((a.value for a in event.attributes if a.key == 'block_id'), None)
+
+        try:
+            for event in event_list.events:
+                if event.event_type == STATE_DELTA:
+                    self._handle_state_changes(StateChangeList.FromString(event.data), block_id)
+        finally:
+            # The batches of the block are final however the changes went
+            if committed:
+                self._schedule_check()
+
+    def _handle_state_changes(self, state_changes: StateChangeList, block_id: str):
+        for change in state_changes.state_changes:
+            deserializer = self._prefixes.get(change.address[:6])
+            if deserializer is None:
+                continue
+
+            if self.ledger.cache is not None:
+                self.ledger.cache.invalidate([change.address])
+
+            obj = None
+            if change.type == StateChange.SET:
+                try:
+                    obj = _decode_object(change.value, deserializer, change.address, self.ledger.strict)
+                except Exception:
+                    logging.exception(f'Failed to decode state change of {change.address}')
+                    continue
+
+            for callback in self._callbacks:
+                try:
+                    callback(change.address, obj, block_id)
+                except Exception:
+                    logging.exception('State change callback failed')
+
+    def _check_pending(self):
+        with self._lock:
+            self._check_scheduled = False
+            batch_ids = list(self._pending)
+
+        if not batch_ids:
+            return
+
+        statuses: List[BatchStatusResponse] = self.ledger.get_batch_statuses(batch_ids)
+
+        for status in statuses:
+            if status.status in (BatchStatus.COMMITTED, BatchStatus.INVALID):
+                with self._lock:
+                    future = self._pending.pop(status.id, None)
+                if future is not None:
+                    future.set_result(status)
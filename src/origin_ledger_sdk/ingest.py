@@ -0,0 +1,157 @@
+import csv
+import json
+import time
+import queue
+import threading
+
+from typing import List, Iterable, Iterator, Callable, TextIO
+from dataclasses import dataclass, field
+from marshmallow import ValidationError
+from sawtooth_sdk.protobuf.batch_pb2 import Batch as SignedBatch
+
+from .requests import PublishMeasurementRequest
+from .submitter import BatchSubmitter
+from .ledger_connector import Ledger
+from .ledger_dto import MeasurementType
+from .deserializers import parse_datetime
+
+
+FORMATS = ('jsonl', 'csv')
+
+
+@dataclass
+class IngestProgress:
+    transactions: int = field(default=0)
+    batches: int = field(default=0)
+    bytes: int = field(default=0)
+    elapsed: float = field(default=0)
+
+    @property
+    def transactions_per_second(self) -> float:
+        return self.transactions / self.elapsed if self.elapsed else 0.0
+
+
+def _parse_measurement(row: dict) -> PublishMeasurementRequest:
+    return PublishMeasurementRequest(
+        address=row['address'],
+        begin=parse_datetime(row['begin']),
+        end=parse_datetime(row['end']),
+        sector=row['sector'],
+        type=MeasurementType(row['type']),
+        amount=int(row['amount']),
+    )
+
+
+def read_measurements(file: TextIO, format: str = 'jsonl') -> Iterator[PublishMeasurementRequest]:
+    """
+    Reads measurements one row at a time, with the fields address,
+    begin, end, sector, type and amount. Begin and end are ISO 8601,
+    ie. 2020-01-01T00:00:00Z or 2020-01-01T00:00:00+00:00.
+
+    :param TextIO file: The file to read.
+    :param str format: 'jsonl' for a JSON object per line, or 'csv' with a header row.
+    """
+    if format == 'jsonl':
+        rows = (json.loads(line) for line in file if line.strip())
+    elif format == 'csv':
+        rows = csv.DictReader(file)
+    else:
+        raise ValueError(f'Unknown format {format}, must be one of {", ".join(FORMATS)}')
+
+    for number, row in enumerate(rows, start=1):
+        try:
+            yield _parse_measurement(row)
+        except (KeyError, ValueError, ValidationError) as e:
+            raise ValueError(f'Invalid measurement in row {number}: {e!r}') from e
+
+
+class IngestPipeline(object):
+    """
+    Signs and submits a stream of requests in bounded stages, so memory
+    use does not depend on the number of requests.
+
+    Requests are signed and packed into BatchLists in the calling thread,
+    while sender threads submit them, so signing and HTTP overlap. At most
+    max_pending BatchLists wait to be sent, which bounds memory to roughly
+    (max_pending + senders + 1) * max_list_bytes.
+
+    BEWARE - every batch is signed with the same key, so anyone can see
+    that all the requests were submitted by the same entity.
+
+    :param Ledger ledger: The ledger to submit the requests to.
+    :param bytes signer_private_key: The private key to sign the batches with.
+    :param int max_batch_transactions: The maximum number of transactions in a batch.
+    :param int max_list_batches: The maximum number of batches sent in one request.
+    :param int max_pending: The number of BatchLists which may wait to be sent.
+    :param int senders: The number of threads sending BatchLists.
+    :param progress: Called with an IngestProgress every time a BatchList has been sent.
+    """
+
+    def __init__(self, ledger: Ledger, signer_private_key: bytes, max_batch_transactions=100,
+                 max_list_batches=20, max_pending=4, senders=1,
+                 progress: Callable[[IngestProgress], None] = None):
+        self.ledger = ledger
+        self.max_pending = max_pending
+        self.senders = senders
+        self.progress = progress
+        self._submitter = BatchSubmitter(
+            ledger,
+            signer_private_key,
+            max_batch_transactions=max_batch_transactions,
+            max_list_batches=max_list_batches,
+        )
+
+    def run(self, requests: Iterable) -> IngestProgress:
+        """
+        Signs and submits the requests, and returns the totals once every
+        batch has been accepted by the ledger. Raises the first error
+        which made a submission fail, after the pipeline has stopped.
+        """
+        pending = queue.Queue(maxsize=self.max_pending)
+        errors = []
+        lock = threading.Lock()
+        result = IngestProgress()
+        begin = time.monotonic()
+
+        def send():
+            while True:
+                batches: List[SignedBatch] = pending.get()
+                if batches is None:
+                    return
+                if errors:
+                    continue
+
+                try:
+                    self.ledger._send_batches(batches)
+                except Exception as e:
+                    errors.append(e)
+                    continue
+
+                with lock:
+                    result.transactions += sum(len(batch.transactions) for batch in batches)
+                    result.batches += len(batches)
+                    result.bytes += sum(batch.ByteSize() for batch in batches)
+                    result.elapsed = time.monotonic() - begin
+                    if self.progress is not None:
+                        self.progress(result)
+
+        threads = [threading.Thread(target=send, daemon=True) for _ in range(self.senders)]
+        for thread in threads:
+            thread.start()
+
+        try:
+            for batches in self._submitter._pack_lists(self._submitter._pack_batches(requests)):
+                if errors:
+                    break
+                pending.put(batches)
+        finally:
+            for _ in threads:
+                pending.put(None)
+            for thread in threads:
+                thread.join()
+
+        if errors:
+            raise errors[0]
+
+        result.elapsed = time.monotonic() - begin
+        return result
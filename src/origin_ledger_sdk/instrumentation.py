@@ -0,0 +1,242 @@
+import time
+import bisect
+import threading
+
+from typing import List, Dict, Tuple, Sequence
+
+
+# Default histogram buckets for durations, in seconds
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Histogram buckets for metrics which are not durations
+SIZE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+METRIC_BUCKETS = {
+    'batch_transactions': SIZE_BUCKETS,
+}
+
+
+class Collector(object):
+    """
+    Receives the measurements made by the SDK. Register an instance
+    with register_collector() to start receiving them.
+
+    Durations are observed in seconds, with names ending in _seconds.
+    """
+
+    def observe(self, name: str, value: float, labels: Dict[str, str]):
+        """
+        Records a value of a histogram, ie. a duration.
+        """
+        pass
+
+    def increment(self, name: str, value: float, labels: Dict[str, str]):
+        """
+        Increments a counter.
+        """
+        pass
+
+
+_collectors: List[Collector] = []
+
+
+def register_collector(collector: Collector):
+    if collector not in _collectors:
+        _collectors.append(collector)
+
+
+def unregister_collector(collector: Collector):
+    if collector in _collectors:
+        _collectors.remove(collector)
+
+
+def enabled() -> bool:
+    """
+    Returns whether any collector is registered, so callers can skip
+    computing values nobody receives.
+    """
+    return bool(_collectors)
+
+
+def observe(name: str, value: float, **labels):
+    for collector in _collectors:
+        collector.observe(name, value, labels)
+
+
+def increment(name: str, value: float = 1, **labels):
+    for collector in _collectors:
+        collector.increment(name, value, labels)
+
+
+class _Span(object):
+    __slots__ = ('name', 'labels', 'begin')
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.begin = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        elapsed = time.perf_counter() - self.begin
+        for collector in _collectors:
+            collector.observe(self.name, elapsed, self.labels)
+
+
+class _NoopSpan(object):
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+_noop_span = _NoopSpan()
+
+
+def span(name: str, **labels):
+    """
+    Returns a context manager observing the time spent inside it.
+    When no collector is registered it does nothing.
+    """
+    if not _collectors:
+        return _noop_span
+    return _Span(name, labels)
+
+
+class _Histogram(object):
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimates the q-quantile as the upper bound of the bucket it falls in.
+        """
+        rank = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return bound
+        return float('inf')
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class InMemoryCollector(Collector):
+    """
+    Collects measurements into histograms and counters kept in memory,
+    which can be exported in the Prometheus text exposition format.
+
+    :param Dict[str, Sequence[float]] buckets: Histogram bucket bounds per metric
+        name, for metrics which should not use the default buckets.
+    """
+
+    def __init__(self, buckets: Dict[str, Sequence[float]] = None):
+        self.buckets = dict(METRIC_BUCKETS, **(buckets or {}))
+        self._histograms: Dict[str, Dict[tuple, _Histogram]] = {}
+        self._counters: Dict[str, Dict[tuple, float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float, labels: Dict[str, str]):
+        key = tuple(sorted(labels.items()))
+
+        with self._lock:
+            histograms = self._histograms.setdefault(name, {})
+            histogram = histograms.get(key)
+            if histogram is None:
+                histogram = histograms[key] = _Histogram(self.buckets.get(name, DEFAULT_BUCKETS))
+            histogram.observe(value)
+
+    def increment(self, name: str, value: float, labels: Dict[str, str]):
+        key = tuple(sorted(labels.items()))
+
+        with self._lock:
+            counters = self._counters.setdefault(name, {})
+            counters[key] = counters.get(key, 0) + value
+
+    def count(self, name: str, **labels) -> int:
+        """
+        Returns the number of values observed by a histogram.
+        """
+        histogram = self._histograms.get(name, {}).get(tuple(sorted(labels.items())))
+        return histogram.count if histogram is not None else 0
+
+    def total(self, name: str, **labels) -> float:
+        """
+        Returns the sum of the values observed by a histogram.
+        """
+        histogram = self._histograms.get(name, {}).get(tuple(sorted(labels.items())))
+        return histogram.sum if histogram is not None else 0.0
+
+    def quantile(self, name: str, q: float, **labels) -> float:
+        histogram = self._histograms.get(name, {}).get(tuple(sorted(labels.items())))
+        return histogram.quantile(q) if histogram is not None else None
+
+    def counter(self, name: str, **labels) -> float:
+        return self._counters.get(name, {}).get(tuple(sorted(labels.items())), 0)
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def to_prometheus(self, namespace='origin_ledger_sdk') -> str:
+        """
+        Returns the metrics in the Prometheus text exposition format.
+        """
+        lines = []
+
+        with self._lock:
+            for name, histograms in sorted(self._histograms.items()):
+                metric = f'{namespace}_{name}'
+                lines.append(f'# TYPE {metric} histogram')
+
+                for key, histogram in sorted(histograms.items()):
+                    cumulative = 0
+                    for bound, count in zip(list(histogram.buckets) + [float('inf')], histogram.counts):
+                        cumulative += count
+                        labels = _format_labels(key + (('le', _format_value(bound)),))
+                        lines.append(f'{metric}_bucket{labels} {cumulative}')
+                    lines.append(f'{metric}_sum{_format_labels(key)} {_format_value(histogram.sum)}')
+                    lines.append(f'{metric}_count{_format_labels(key)} {histogram.count}')
+
+            for name, counters in sorted(self._counters.items()):
+                metric = f'{namespace}_{name}'
+                lines.append(f'# TYPE {metric} counter')
+
+                for key, value in sorted(counters.items()):
+                    lines.append(f'{metric}{_format_labels(key)} {_format_value(value)}')
+
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,331 @@
+import os
+import mmap
+import zlib
+import struct
+import threading
+
+from enum import Enum
+from typing import List, Dict, Tuple, Iterable
+from sawtooth_sdk.protobuf.batch_pb2 import Batch as SignedBatch, BatchList
+
+from .batch import BatchStatus
+from .ledger_connector import Ledger, BatchStatusResponse
+
+
+class BatchState(Enum):
+    SIGNED = 1
+    SUBMITTED = 2
+    COMMITTED = 3
+    INVALID = 4
+
+
+class JournalError(Exception):
+    pass
+
+
+_MAGIC = b'OLSJ\x00\x00\x00\x01'
+
+# Every record is the length and CRC32 of its body, followed by the body:
+# the state, the length of the batch id, the batch id, and for SIGNED
+# records the serialized batch.
+_PREFIX = struct.Struct('<II')
+_BODY = struct.Struct('<BH')
+
+_FINAL_STATES = (BatchState.COMMITTED, BatchState.INVALID)
+
+
+def _encode_record(state: BatchState, batch_id: str, data: bytes = b'') -> bytes:
+    id_bytes = batch_id.encode()
+    body = _BODY.pack(state.value, len(id_bytes)) + id_bytes + data
+    return _PREFIX.pack(len(body), zlib.crc32(body)) + body
+
+
+def _data_offset(record_offset: int, batch_id: str) -> int:
+    return record_offset + _PREFIX.size + _BODY.size + len(batch_id.encode())
+
+
+class SubmissionJournal(object):
+    """
+    Append-only journal of signed batches and their lifecycle,
+    SIGNED -> SUBMITTED -> COMMITTED or INVALID, keyed by batch id.
+
+    Batches are written to the journal, and synced to disk, before they
+    are sent to the ledger. If the process dies, resume() finds the
+    batches whose fate is unknown and sends them again as they were
+    signed, instead of signing them again.
+
+    The journal is memory-mapped when opened, and only an index of the
+    batches is kept in memory. A record torn by a crash while it was
+    written is discarded, along with anything after it.
+
+    :param str path: The path of the journal file, created if it does not exist.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._index: Dict[str, Tuple[BatchState, int, int]] = {}
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._written = 0
+        self._synced = 0
+        self._mmap = None
+
+        self._open()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, batch_id):
+        return batch_id in self._index
+
+    def _open(self):
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            with open(self.path, 'wb') as f:
+                f.write(_MAGIC)
+                f.flush()
+                os.fsync(f.fileno())
+
+        with open(self.path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if mm[:len(_MAGIC)] != _MAGIC:
+                    raise JournalError(f'{self.path} is not a submission journal')
+                end = self._load(mm)
+
+        self._file = open(self.path, 'r+b')
+        self._file.truncate(end)
+        self._file.seek(end)
+        self._size = end
+
+    def _load(self, mm) -> int:
+        """
+        Builds the index from the journal, and returns the offset
+        of the end of the last complete record.
+        """
+        offset = len(_MAGIC)
+        size = len(mm)
+
+        while offset + _PREFIX.size <= size:
+            length, crc = _PREFIX.unpack_from(mm, offset)
+            body = offset + _PREFIX.size
+
+            if body + length > size or zlib.crc32(mm[body:body + length]) != crc:
+                break
+
+            state, id_length = _BODY.unpack_from(mm, body)
+            batch_id = mm[body + _BODY.size:body + _BODY.size + id_length].decode()
+            data = body + _BODY.size + id_length
+
+            if state == BatchState.SIGNED.value:
+                self._index[batch_id] = (BatchState.SIGNED, data, body + length - data)
+            elif batch_id in self._index:
+                _, data_offset, data_length = self._index[batch_id]
+                self._index[batch_id] = (BatchState(state), data_offset, data_length)
+
+            offset = body + length
+
+        return offset
+
+    def _append(self, state: BatchState, batch_id: str, data: bytes = b'') -> int:
+        """
+        Writes a record, and returns the offset of its data.
+        Must be called with the lock held.
+        """
+        record = _encode_record(state, batch_id, data)
+        self._file.write(record)
+
+        data_offset = _data_offset(self._size, batch_id)
+        self._size += len(record)
+        self._written += 1
+
+        return data_offset
+
+    def sync(self):
+        """
+        Writes every record appended so far to disk. Threads syncing at
+        the same time share a single fsync.
+        """
+        with self._lock:
+            target = self._written
+
+        with self._sync_lock:
+            if self._synced >= target:
+                return
+
+            with self._lock:
+                written = self._written
+                self._file.flush()
+
+            os.fsync(self._file.fileno())
+            self._synced = written
+
+    def state(self, batch_id: str) -> BatchState:
+        entry = self._index.get(batch_id)
+        return entry[0] if entry is not None else None
+
+    def pending(self) -> List[str]:
+        """
+        Returns the ids of the batches which are not yet COMMITTED or INVALID.
+        """
+        return [batch_id for batch_id, (state, _, _) in self._index.items() if state not in _FINAL_STATES]
+
+    def get_batch_bytes(self, batch_id: str) -> bytes:
+        _, offset, length = self._index[batch_id]
+
+        with self._lock:
+            if self._mmap is None or len(self._mmap) < offset + length:
+                self._file.flush()
+                if self._mmap is not None:
+                    self._mmap.close()
+                self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+            return self._mmap[offset:offset + length]
+
+    def get_batch(self, batch_id: str) -> SignedBatch:
+        return SignedBatch.FromString(self.get_batch_bytes(batch_id))
+
+    def record_signed(self, batches: Iterable[SignedBatch]):
+        """
+        Writes the signed batches to the journal, and waits for them to
+        be on disk before returning.
+        """
+        with self._lock:
+            for batch in batches:
+                if batch.header_signature in self._index:
+                    continue
+                data = batch.SerializeToString()
+                offset = self._append(BatchState.SIGNED, batch.header_signature, data)
+                self._index[batch.header_signature] = (BatchState.SIGNED, offset, len(data))
+
+        self.sync()
+
+    def record_state(self, batch_ids: Iterable[str], state: BatchState, durable=False):
+        """
+        Records that the batches have moved on to the state.
+
+        Losing this record in a crash only means the batch is checked
+        again by resume(), so it is not synced to disk unless durable.
+
+        Batches which are not in the journal are ignored, as compact()
+        removes batches once they are COMMITTED or INVALID, and their
+        status may still be reported afterwards.
+        """
+        with self._lock:
+            for batch_id in batch_ids:
+                entry = self._index.get(batch_id)
+                if entry is None or entry[0] == state or entry[0] in _FINAL_STATES:
+                    continue
+                self._append(state, batch_id)
+                self._index[batch_id] = (state, entry[1], entry[2])
+
+        if durable:
+            self.sync()
+
+    def record_statuses(self, statuses: Iterable[BatchStatusResponse]):
+        """
+        Records the final statuses, as returned by Ledger.wait_for_batches.
+        """
+        for status in statuses:
+            if status.status == BatchStatus.COMMITTED:
+                self.record_state([status.id], BatchState.COMMITTED)
+            elif status.status == BatchStatus.INVALID:
+                self.record_state([status.id], BatchState.INVALID)
+
+    def submit(self, ledger: Ledger, batches: List[SignedBatch]) -> str:
+        """
+        Journals the signed batches and sends them to the ledger.
+        """
+        self.record_signed(batches)
+        handle = ledger._send_batches(batches)
+        self.record_state([batch.header_signature for batch in batches], BatchState.SUBMITTED)
+
+        return handle
+
+    def resume(self, ledger: Ledger) -> List[str]:
+        """
+        Checks the status of every pending batch on the ledger, records the
+        final ones, and sends the batches the ledger does not know again,
+        without signing them again. Returns the ids of the batches sent.
+        """
+        pending = self.pending()
+        if not pending:
+            return []
+
+        statuses = {status.id: status.status for status in ledger.get_batch_statuses(pending)}
+        resend = []
+
+        for batch_id in pending:
+            status = statuses.get(batch_id, BatchStatus.UNKNOWN)
+            if status == BatchStatus.COMMITTED:
+                self.record_state([batch_id], BatchState.COMMITTED)
+            elif status == BatchStatus.INVALID:
+                self.record_state([batch_id], BatchState.INVALID)
+            elif status == BatchStatus.PENDING:
+                self.record_state([batch_id], BatchState.SUBMITTED)
+            else:
+                resend.append(batch_id)
+
+        if resend:
+            batch_list = BatchList(batches=[self.get_batch(batch_id) for batch_id in resend])
+            ledger._send_batch_list(batch_list.SerializeToString(), resend)
+            self.record_state(resend, BatchState.SUBMITTED)
+
+        self.sync()
+        return resend
+
+    def compact(self):
+        """
+        Rewrites the journal with only the batches which are still pending.
+        """
+        temporary_path = f'{self.path}.compact'
+
+        with self._lock:
+            self._file.flush()
+            index = {}
+            size = len(_MAGIC)
+
+            with open(temporary_path, 'wb') as f:
+                f.write(_MAGIC)
+
+                for batch_id, (state, offset, length) in self._index.items():
+                    if state in _FINAL_STATES:
+                        continue
+
+                    self._file.seek(offset)
+                    record = _encode_record(BatchState.SIGNED, batch_id, self._file.read(length))
+                    if state != BatchState.SIGNED:
+                        record += _encode_record(state, batch_id)
+
+                    f.write(record)
+                    index[batch_id] = (state, _data_offset(size, batch_id), length)
+                    size += len(record)
+
+                f.flush()
+                os.fsync(f.fileno())
+
+            if self._mmap is not None:
+                self._mmap.close()
+                self._mmap = None
+            self._file.close()
+
+            os.replace(temporary_path, self.path)
+
+            self._file = open(self.path, 'r+b')
+            self._file.seek(size)
+            self._size = size
+            self._index = index
+            self._synced = self._written
+
+    def close(self):
+        self.sync()
+        with self._lock:
+            if self._mmap is not None:
+                self._mmap.close()
+                self._mmap = None
+            self._file.close()
+
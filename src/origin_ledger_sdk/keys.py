@@ -0,0 +1,235 @@
+import os
+import hmac
+import struct
+import threading
+
+from typing import List, Dict, Tuple, Sequence
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor
+from sawtooth_signing.secp256k1 import Secp256k1PrivateKey as PrivateKey
+
+from .ledger_dto import AddressPrefix, generate_address
+
+
+CURVE_ORDER = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+
+# Added to an index to derive a hardened child key
+HARDENED = 0x80000000
+
+_INDEX = struct.Struct('>L')
+
+
+class ExtendedKey(object):
+    """
+    A BIP32 extended private key, deriving the same child keys as
+    bip32utils.BIP32Key, but with the curve arithmetic of libsecp256k1.
+    """
+
+    __slots__ = ('private_key', 'chain_code', '_public_key')
+
+    def __init__(self, private_key: bytes, chain_code: bytes):
+        self.private_key = private_key
+        self.chain_code = chain_code
+        self._public_key = None
+
+    @classmethod
+    def from_entropy(cls, entropy: bytes) -> 'ExtendedKey':
+        digest = hmac.digest(b'Bitcoin seed', entropy, 'sha512')
+        return cls(digest[:32], digest[32:])
+
+    @classmethod
+    def from_bip32(cls, key) -> 'ExtendedKey':
+        """
+        Returns the extended key of a bip32utils.BIP32Key.
+        """
+        return cls(key.PrivateKey(), key.ChainCode())
+
+    @property
+    def public_key(self) -> bytes:
+        """
+        The compressed public key.
+        """
+        if self._public_key is None:
+            self._public_key = PrivateKey.from_bytes(self.private_key).secp256k1_private_key.pubkey.serialize()
+        return self._public_key
+
+    def child(self, index: int) -> 'ExtendedKey':
+        if index & HARDENED:
+            data = b'\0' + self.private_key + _INDEX.pack(index)
+        else:
+            data = self.public_key + _INDEX.pack(index)
+
+        digest = hmac.digest(self.chain_code, data, 'sha512')
+        tweak = int.from_bytes(digest[:32], 'big')
+        key = (tweak + int.from_bytes(self.private_key, 'big')) % CURVE_ORDER
+
+        if tweak >= CURVE_ORDER or key == 0:
+            raise ValueError(f'Child key {index} is not a valid key, use another index')
+
+        return ExtendedKey(key.to_bytes(32, 'big'), digest[32:])
+
+
+@dataclass
+class DerivedKey:
+    index: int = field()
+    private_key: bytes = field()
+    public_key: bytes = field()
+    addresses: Dict[AddressPrefix, str] = field(default_factory=dict)
+
+    def address(self, prefix: AddressPrefix = AddressPrefix.MEASUREMENT) -> str:
+        address = self.addresses.get(prefix)
+        if address is None:
+            address = self.addresses[prefix] = generate_address(prefix, self.public_key)
+        return address
+
+
+def _derive_range(private_key: bytes, chain_code: bytes, start: int, stop: int,
+                  prefixes: Tuple[AddressPrefix, ...]) -> List[DerivedKey]:
+    parent = ExtendedKey(private_key, chain_code)
+    keys = []
+
+    for index in range(start, stop):
+        child = parent.child(index)
+        keys.append(DerivedKey(
+            index=index,
+            private_key=child.private_key,
+            public_key=child.public_key,
+            addresses={prefix: generate_address(prefix, child.public_key) for prefix in prefixes},
+        ))
+
+    return keys
+
+
+class KeyDeriver(object):
+    """
+    Derives the keys of a key hierarchy, ie. a key per meter per hour,
+    along with their ledger addresses.
+
+    The extended keys along each path are kept in a bounded LRU cache, so
+    deriving many keys below the same parent derives the parent only once.
+    Ranges of sibling keys are derived in bulk, across a pool of processes
+    when the range is large.
+
+    :param ExtendedKey master: The key at the root of the hierarchy.
+    :param int max_keys: The maximum number of extended keys to keep.
+    :param int max_workers: The number of worker processes, defaults to the number of CPUs.
+    :param int threshold: Ranges with fewer keys than this are derived in this process.
+    :param int chunk_size: The number of keys sent to a worker at a time.
+    """
+
+    def __init__(self, master: ExtendedKey, max_keys=4096, max_workers=None, threshold=5000, chunk_size=None):
+        self.master = master
+        self.max_keys = max_keys
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.threshold = threshold
+        self.chunk_size = chunk_size
+        self.hits = 0
+        self.misses = 0
+        self._keys: Dict[Tuple[int, ...], ExtendedKey] = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def get_key(self, path: Sequence[int]) -> ExtendedKey:
+        """
+        Returns the extended key at the path below the master key,
+        deriving it from the nearest cached key along the path.
+        """
+        path = tuple(path)
+        depth = len(path)
+        key = self.master
+
+        with self._lock:
+            while depth > 0:
+                cached = self._keys.get(path[:depth])
+                if cached is not None:
+                    self._keys.move_to_end(path[:depth])
+                    key = cached
+                    break
+                depth -= 1
+
+            if depth == len(path):
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        derived = []
+        for i in range(depth, len(path)):
+            key = key.child(path[i])
+            derived.append((path[:i + 1], key))
+
+        if derived:
+            with self._lock:
+                for key_path, derived_key in derived:
+                    self._keys[key_path] = derived_key
+                    self._keys.move_to_end(key_path)
+                while len(self._keys) > self.max_keys:
+                    self._keys.popitem(last=False)
+
+        return key
+
+    def derive(self, path: Sequence[int], prefixes: Sequence[AddressPrefix] = (AddressPrefix.MEASUREMENT,)) -> DerivedKey:
+        """
+        Returns the key at the path, with its addresses for each prefix.
+        """
+        key = self.get_key(path)
+
+        return DerivedKey(
+            index=path[-1] if path else 0,
+            private_key=key.private_key,
+            public_key=key.public_key,
+            addresses={prefix: generate_address(prefix, key.public_key) for prefix in prefixes},
+        )
+
+    def derive_range(self, path: Sequence[int], start: int, stop: int,
+                     prefixes: Sequence[AddressPrefix] = (AddressPrefix.MEASUREMENT,)) -> List[DerivedKey]:
+        """
+        Returns the children start to stop (exclusive) of the key at the
+        path, with their addresses for each prefix. The children are not
+        cached, only the keys along the path.
+
+        :param Sequence[int] path: The path of the parent key.
+        :param int start: The index of the first child.
+        :param int stop: The index after the last child.
+        :param Sequence[AddressPrefix] prefixes: The types of addresses to generate.
+        """
+        parent = self.get_key(path)
+        prefixes = tuple(prefixes)
+        count = stop - start
+
+        if count < self.threshold:
+            return _derive_range(parent.private_key, parent.chain_code, start, stop, prefixes)
+
+        executor = self._get_executor()
+        chunk_size = self.chunk_size or max(1, -(-count // (self.max_workers * 4)))
+        starts = range(start, stop, chunk_size)
+
+        results = executor.map(
+            _derive_range,
+            [parent.private_key] * len(starts),
+            [parent.chain_code] * len(starts),
+            starts,
+            [min(s + chunk_size, stop) for s in starts],
+            [prefixes] * len(starts),
+        )
+
+        return [key for chunk in results for key in chunk]
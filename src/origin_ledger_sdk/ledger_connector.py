@@ -1,14 +1,24 @@
-import requests
+import time
 import base64
 import json
-import marshmallow_dataclass
 
-from typing import List
+from typing import List, Dict, Iterable, Iterator, Tuple, Callable
+from urllib.parse import urlparse, parse_qs
+from collections import defaultdict
 from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+from marshmallow import ValidationError
 from sawtooth_sdk.protobuf.batch_pb2 import BatchList
-from marshmallow_dataclass import class_schema
-
-from .batch import Batch, BatchStatus
+from sawtooth_sdk.protobuf.transaction_pb2 import TransactionHeader
+
+from .batch import Batch, BatchStatus, order_batches
+from .signing import ParallelSigner
+from .streaming import BatchListEncoder
+from .spool import BatchSpool
+from .transport import HttpTransport, ConnectionStats
+from .cache import StateCache
+from .instrumentation import span, increment
+from .deserializers import get_deserializer
 from .ledger_dto import Measurement, GGO, Settlement
 
 
@@ -27,8 +37,10 @@ class Handle:
 
 @dataclass
 class Paging:
-    limit: int = field()
-    start: int = field()
+    limit: int = field(default=None)
+    start: str = field(default=None)
+    next_position: str = field(default=None)
+    next: str = field(default=None)
 
 
 @dataclass
@@ -59,120 +71,554 @@ class StateResponse:
     error: Error = field(default=None)
 
 
+@dataclass
+class StateEntry:
+    address: str = field()
+    data: str = field()
+
+
+@dataclass
+class StateListResponse:
+    data: List[StateEntry] = field(default=None)
+    head: str = field(default=None)
+    link: str = field(default=None)
+    paging: Paging = field(default=None)
+    error: Error = field(default=None)
+
+
+class BulkReadResult(dict):
+    """
+    The objects read by a bulk read, keyed by their address.
+
+    Addresses which could not be read are left out, and the reason is
+    kept in errors, keyed by address.
+    """
+
+    def __init__(self):
+        super(BulkReadResult, self).__init__()
+        self.errors = {}
+
+
 class LedgerException(Exception):
-    def __init__(self, message, code=None):
+    def __init__(self, message, code=None, status_code=None):
         super(LedgerException, self).__init__(message)
         self.code = code
+        self.status_code = status_code
 
     @staticmethod
-    def from_error(error: Error):
-        return LedgerException(error.message, error.code)
+    def from_error(error: Error, status_code=None):
+        increment('ledger_errors_total', code=str(error.code))
+        return LedgerException(error.message, error.code, status_code)
 
 
 class LedgerConnectionError(Exception):
     pass
 
 
-handle_schema = marshmallow_dataclass.class_schema(Handle)()
-batch_status_schema = marshmallow_dataclass.class_schema(BatchStatusResponseHeader)()
-state_response_schema = marshmallow_dataclass.class_schema(StateResponse)()
-measurement_schema = class_schema(Measurement)()
-ggo_schema = class_schema(GGO)()
-settlement_schema = class_schema(Settlement)()
+handle_deserializer = get_deserializer(Handle)
+batch_status_deserializer = get_deserializer(BatchStatusResponseHeader)
+state_response_deserializer = get_deserializer(StateResponse)
+state_list_response_deserializer = get_deserializer(StateListResponse)
+measurement_deserializer = get_deserializer(Measurement)
+ggo_deserializer = get_deserializer(GGO)
+settlement_deserializer = get_deserializer(Settlement)
 
 
-class Ledger(object):
+def _decode_handle(content: bytes, status_code: int = None, strict=False) -> str:
+    if status_code is not None and status_code >= 400:
+        # Proxies in front of the ledger respond with errors of their own
+        try:
+            handle: Handle = handle_deserializer.loads(content)
+        except (ValueError, ValidationError):
+            handle = None
+
+        if handle is not None and handle.error is not None:
+            raise LedgerException.from_error(handle.error, status_code)
+
+        raise LedgerException(f'Ledger responded with status {status_code} "{content.decode(errors="replace")}"',
+                              status_code=status_code)
+
+    try:
+        handle: Handle = handle_deserializer.loads(content, strict)
+    except json.decoder.JSONDecodeError:
+        raise LedgerException(f'Invalid response from Ledger "{content.decode()}"', status_code=status_code)
+
+    if handle.error is not None:
+        raise LedgerException.from_error(handle.error, status_code)
+
+    return handle.link
 
-    def __init__(self, url, verify=True):
+
+def _decode_batch_statuses(content: bytes, strict=False) -> List[BatchStatusResponse]:
+    batch_status = batch_status_deserializer.loads(content, strict)
+
+    if batch_status.error:
+        raise LedgerException.from_error(batch_status.error)
+
+    return batch_status.data
+
+
+def _decode_batch_status(content: bytes, strict=False) -> BatchStatusResponse:
+    return _decode_batch_statuses(content, strict)[0]
+
+
+def get_batch_ids(handle: str) -> List[str]:
+    """
+    Returns the batch ids of a handle returned by execute_batch,
+    or the id itself if it is not a handle.
+    """
+    if '?' not in handle:
+        return [handle]
+
+    query = parse_qs(urlparse(handle).query)
+    return [i for ids in query.get('id', []) for i in ids.split(',')]
+
+
+def _decode_object(body: bytes, deserializer, address: str, strict=False):
+    obj = deserializer.loads(body, strict)
+    obj.address = address
+
+    return obj
+
+
+def _decode_state(response: StateResponse, deserializer, address: str, strict=False):
+    if response.error:
+        raise LedgerException.from_error(response.error)
+
+    return _decode_object(base64.b64decode(response.data), deserializer, address, strict)
+
+
+class Ledger(object):
+    """
+    :param str url: The url of the ledgers REST API.
+    :param bool verify: Whether to verify the servers TLS certificate.
+    :param int pool_connections: The number of hosts to keep connection pools for.
+    :param int pool_maxsize: The maximum number of connections to keep open per host.
+    :param float connect_timeout: Seconds to wait for a connection to be established.
+    :param float read_timeout: Seconds to wait for the ledger to send a response.
+    :param int max_workers: The number of concurrent requests made by bulk reads.
+    :param int prefix_length: The address prefix length bulk reads group addresses by.
+    :param int list_threshold: The number of addresses sharing a prefix from which
+        bulk reads list the whole prefix instead of reading each address.
+    :param StateCache cache: Optional cache for objects read from the ledger.
+    :param bool strict: Whether to validate responses with marshmallow,
+        instead of decoding them straight into objects.
+    """
+
+    def __init__(self, url, verify=True, pool_connections=10, pool_maxsize=10,
+                 connect_timeout=10, read_timeout=60, max_workers=8,
+                 prefix_length=8, list_threshold=256, cache: StateCache = None,
+                 strict=False):
         self.url = url
         self.verify = verify
-
-    def execute_batch(self, batch: Batch) -> str:
-        signed_batch = batch.get_signed_batch()
+        self.cache = cache
+        self.strict = strict
+        self.max_workers = max_workers
+        self.prefix_length = prefix_length
+        self.list_threshold = list_threshold
+        self._transport = self._create_transport(
+            verify=verify,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _create_transport(self, **options) -> HttpTransport:
+        """
+        Returns the transport of the REST API, or None for ledgers
+        which do not talk to it themselves.
+        """
+        return HttpTransport(**options)
+
+    def close(self):
+        if self._transport is not None:
+            self._transport.close()
+
+    def connection_stats(self) -> ConnectionStats:
+        if self._transport is None:
+            return ConnectionStats()
+        return self._transport.stats()
+
+    def execute_batch(self, batch: Batch, parallel_signer: ParallelSigner = None) -> str:
+        signed_batch = batch.get_signed_batch(parallel_signer)
         return self._send_batches([signed_batch])
 
+    def execute_batches(self, batches: List[Batch]) -> str:
+        """
+        Sends several batches in one request, ordered so batches come after
+        the batches containing the requests they depend on. This allows a
+        chain of dependent requests to be sent without waiting for commits.
+        """
+        signed_batches = [batch.get_signed_batch() for batch in order_batches(batches)]
+        return self._send_batches(signed_batches)
+
+    def stream_batches(self, batches: List[Batch], encoder: BatchListEncoder = None) -> str:
+        """
+        Sends several batches in one request, like execute_batches, but
+        signs and serializes them while the request is sent, as a chunked
+        request body. The signed transactions are not all kept in memory,
+        which makes a difference for batches of many thousand transactions.
+
+        :param List[Batch] batches: The batches to send.
+        :param BatchListEncoder encoder: Optional encoder, to set the chunk size.
+        """
+        encoder = encoder or BatchListEncoder()
+        ordered = order_batches(batches)
+
+        handle = self._send_batch_stream(lambda: encoder.encode(ordered))
+
+        if self.cache is not None:
+            for batch_id, batch in zip(get_batch_ids(handle), ordered):
+                self.cache.submitted(batch_id, (address for r in batch.requests for address in r.get_outputs() or ()))
+
+        return handle
+
+    def send_spooled(self, spool: BatchSpool, max_batches=20, max_bytes=8 * 1024 * 1024) -> List[str]:
+        """
+        Sends the batches signed ahead of time into the spool, and returns
+        the handle of each request. The batches are sent straight from the
+        memory-mapped segments of the spool, so nothing is signed, serialized
+        or copied when sending.
+
+        :param BatchSpool spool: The spool to send the batches of.
+        :param int max_batches: The maximum number of batches sent in one request.
+        :param int max_bytes: The maximum size of the batches sent in one request.
+        """
+        def send(batch_list: memoryview, batch_ids: List[str]) -> str:
+            handle = self._send_batch_list(batch_list, batch_ids)
+            if self.cache is not None:
+                self._track_outputs(BatchList.FromString(bytes(batch_list)).batches)
+            return handle
+
+        return spool.drain(send, max_batches, max_bytes)
+
     def get_batch_status(self, link: str) -> BatchStatusResponse:
         try:
-            response = requests.get(link, verify=self.verify)
+            with span('ledger_request_seconds', operation='get_batch_status'):
+                response = self._transport.get(link)
         except:
             raise LedgerConnectionError('Failed to perform http GET to ledger')
 
-        batch_status = batch_status_schema.loads(response.content)
+        with span('ledger_decode_seconds', operation='get_batch_status'):
+            status = _decode_batch_status(response.content, self.strict)
 
-        if batch_status.error:
-            raise LedgerException.from_error(batch_status.error)
+        self._observe_statuses([status])
 
-        return batch_status.data[0]
+        return status
 
-    def _send_batches(self, signed_batches) -> str:
-        batch_list_bytes = BatchList(batches=signed_batches).SerializeToString()
+    def get_batch_statuses(self, batch_ids: List[str], wait: int = None) -> List[BatchStatusResponse]:
+        """
+        Returns the status of many batches in a single request.
+
+        :param List[str] batch_ids: The ids of the batches.
+        :param int wait: Seconds the ledger may wait for the batches to
+            leave PENDING before it responds.
+        """
+        statuses = self._get_batch_statuses(batch_ids, wait)
+        self._observe_statuses(statuses)
+        return statuses
+
+    def _get_batch_statuses(self, batch_ids: List[str], wait: int = None) -> List[BatchStatusResponse]:
+        url = f'{self.url}/batch_statuses'
+        timeout = self._transport.timeout
+
+        if wait:
+            url += f'?wait={wait}'
+            timeout = (timeout[0], timeout[1] + wait)
 
         try:
-            response = requests.post(
-                url=f'{self.url}/batches',
-                data=batch_list_bytes,
-                headers={'Content-Type': 'application/octet-stream'},
-                verify=self.verify,
-            )
+            with span('ledger_request_seconds', operation='get_batch_statuses'):
+                response = self._transport.post(
+                    url=url,
+                    data=json.dumps(batch_ids),
+                    headers={'Content-Type': 'application/json'},
+                    timeout=timeout,
+                )
         except:
             raise LedgerConnectionError('Failed to perform http POST to ledger')
 
+        with span('ledger_decode_seconds', operation='get_batch_statuses'):
+            return _decode_batch_statuses(response.content, self.strict)
+
+    def get_head_block_num(self) -> int:
+        """
+        Returns the number of the newest block known by the ledger.
+        """
         try:
-            handle: Handle = handle_schema.loads(response.content)
+            response = self._transport.get(f'{self.url}/blocks?limit=1')
+        except:
+            raise LedgerConnectionError('Failed to perform http GET to ledger')
+
+        try:
+            body = json.loads(response.content)
         except json.decoder.JSONDecodeError:
-            raise LedgerException(f'Invalid response from Ledger "{response.content.decode()}"')
+            raise LedgerException(f'Invalid response from Ledger "{response.content.decode()}"',
+                                  status_code=response.status_code)
+
+        if 'error' in body:
+            raise LedgerException(body['error'].get('message'), body['error'].get('code'), response.status_code)
+
+        return int(body['data'][0]['header']['block_num'])
+
+    def wait_for_batches(self, batch_ids: Iterable[str], timeout: float = 30, poll_wait: int = 5) -> Iterator[BatchStatusResponse]:
+        """
+        Yields the status of each batch as soon as it is COMMITTED or INVALID.
+
+        All pending batches are queried in one long-polling request, and
+        batches are dropped from the request once they are final. Batches
+        still pending when the timeout expires are yielded last with their
+        most recent status.
 
-        if handle.error is not None:
-            raise LedgerException.from_error(handle.error)
+        :param Iterable[str] batch_ids: Batch ids or handles returned by execute_batch.
+        :param float timeout: Seconds to wait for all batches to be final.
+        :param int poll_wait: Seconds each request may wait on the ledger.
+        """
+        pending = {i: None for handle in batch_ids for i in get_batch_ids(handle)}
+        deadline = time.monotonic() + timeout
 
-        return handle.link
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
 
-    def _get_state(self, address) -> StateResponse:
+            wait = max(1, min(poll_wait, int(remaining)))
+
+            for status in self.get_batch_statuses(list(pending), wait=wait):
+                if status.id not in pending:
+                    continue
+                if status.status in (BatchStatus.COMMITTED, BatchStatus.INVALID):
+                    del pending[status.id]
+                    yield status
+                else:
+                    pending[status.id] = status
+
+        for batch_id, status in pending.items():
+            yield status or BatchStatusResponse(id=batch_id, status=BatchStatus.UNKNOWN)
+
+    def _send_batches(self, signed_batches) -> str:
+        with span('ledger_serialize_seconds'):
+            batch_list_bytes = BatchList(batches=signed_batches).SerializeToString()
+
+        handle = self._send_batch_list(batch_list_bytes, [batch.header_signature for batch in signed_batches])
+
+        self._track_outputs(signed_batches)
+
+        return handle
+
+    def _send_batch_list(self, batch_list_bytes: bytes, batch_ids: List[str]) -> str:
+        """
+        Sends an already serialized BatchList and returns its handle.
+        """
         try:
-            response = requests.get(
-                url=f'{self.url}/state/{address}',
-                verify=self.verify
-            )
+            with span('ledger_request_seconds', operation='send_batches'):
+                response = self._transport.post(
+                    url=f'{self.url}/batches',
+                    data=batch_list_bytes,
+                    headers={'Content-Type': 'application/octet-stream'},
+                )
+        except:
+            raise LedgerConnectionError('Failed to perform http POST to ledger')
+
+        with span('ledger_decode_seconds', operation='send_batches'):
+            return _decode_handle(response.content, response.status_code, self.strict)
+
+    def _send_batch_stream(self, encode: Callable[[], Iterator[bytes]]) -> str:
+        """
+        Sends the BatchList yielded by encode as a chunked request body,
+        and returns its handle.
+        """
+        errors = []
+
+        def body():
+            try:
+                yield from encode()
+            except Exception as e:
+                errors.append(e)
+                raise
+
+        try:
+            with span('ledger_request_seconds', operation='send_batches'):
+                response = self._transport.post(
+                    url=f'{self.url}/batches',
+                    data=body(),
+                    headers={'Content-Type': 'application/octet-stream'},
+                )
+        except:
+            # Signing the batches failed, not the connection
+            if errors:
+                raise errors[0]
+            raise LedgerConnectionError('Failed to perform http POST to ledger')
+
+        with span('ledger_decode_seconds', operation='send_batches'):
+            return _decode_handle(response.content, response.status_code, self.strict)
+
+    def _track_outputs(self, signed_batches):
+        if self.cache is not None:
+            for batch in signed_batches:
+                self.cache.submitted(batch.header_signature, (
+                    address
+                    for transaction in batch.transactions
+                    for address in TransactionHeader.FromString(transaction.header).outputs
+                ))
+
+    def _observe_statuses(self, statuses: List[BatchStatusResponse]):
+        """
+        Lets the cache read the outputs of batches once they are final.
+        """
+        if self.cache is not None:
+            for status in statuses:
+                if status.status in (BatchStatus.COMMITTED, BatchStatus.INVALID):
+                    self.cache.finalized(status.id)
+
+    def _get_state(self, address, head: str = None) -> StateResponse:
+        url = f'{self.url}/state/{address}'
+        if head is not None:
+            url += f'?head={head}'
+
+        try:
+            with span('ledger_request_seconds', operation='get_state'):
+                response = self._transport.get(url=url)
         except:
             raise LedgerConnectionError('Failed to perform http GET to ledger')
 
-        return state_response_schema.loads(response.content)
+        with span('ledger_decode_seconds', operation='get_state'):
+            return state_response_deserializer.loads(response.content, self.strict)
 
-    def get_measurement(self, address: str) -> Measurement:
-        response = self._get_state(address)
+    def _read_state(self, address, head: str = None) -> Tuple[bytes, str]:
+        """
+        Returns the raw state at the address, and the head it was read at.
+        """
+        response = self._get_state(address, head)
 
         if response.error:
             raise LedgerException.from_error(response.error)
 
-        body = base64.b64decode(response.data)
+        return base64.b64decode(response.data), response.head
+
+    def _get_object(self, address: str, deserializer, head: str = None):
+        if self.cache is not None:
+            obj = self.cache.get(address, head)
+            if obj is not None:
+                return obj
+
+        body, read_head = self._read_state(address, head)
+        obj = _decode_object(body, deserializer, address, self.strict)
+
+        if self.cache is not None:
+            self.cache.put(address, read_head, obj, pinned=head is not None)
 
-        measurement = measurement_schema.loads(body)
-        measurement.address = address
+        return obj
+
+    def get_measurement(self, address: str, head: str = None) -> Measurement:
+        return self._get_object(address, measurement_deserializer, head)
+
+    def get_ggo(self, address: str, head: str = None) -> GGO:
+        return self._get_object(address, ggo_deserializer, head)
 
-        return measurement
+    def get_settlement(self, address: str, head: str = None) -> Settlement:
+        return self._get_object(address, settlement_deserializer, head)
 
-    def get_ggo(self, address: str) -> GGO:
-        response = self._get_state(address)
+    def get_measurements(self, addresses: Iterable[str], head: str = None) -> BulkReadResult:
+        return self._get_many(addresses, measurement_deserializer, head)
 
-        if response.error:
-            raise LedgerException.from_error(response.error)
+    def get_ggos(self, addresses: Iterable[str], head: str = None) -> BulkReadResult:
+        return self._get_many(addresses, ggo_deserializer, head)
 
-        body = base64.b64decode(response.data)
+    def get_settlements(self, addresses: Iterable[str], head: str = None) -> BulkReadResult:
+        return self._get_many(addresses, settlement_deserializer, head)
 
-        ggo = ggo_schema.loads(body)
-        ggo.address = address
+    def _list_state(self, prefix: str, head: str = None) -> Tuple[Dict[str, bytes], str]:
+        """
+        Returns the raw state of every address starting with the prefix,
+        and the head it was read at.
+        """
+        entries = {}
+        url = f'{self.url}/state?address={prefix}'
+        if head is not None:
+            url += f'&head={head}'
 
-        return ggo
+        while url:
+            try:
+                response = self._transport.get(url=url)
+            except:
+                raise LedgerConnectionError('Failed to perform http GET to ledger')
 
-    def get_settlement(self, address: str) -> Settlement:
-        response = self._get_state(address)
+            state_list = state_list_response_deserializer.loads(response.content, self.strict)
 
-        if response.error:
-            raise LedgerException.from_error(response.error)
+            if state_list.error:
+                raise LedgerException.from_error(state_list.error)
+
+            for entry in state_list.data or []:
+                entries[entry.address] = base64.b64decode(entry.data)
+            head = state_list.head
+
+            url = state_list.paging.next if state_list.paging else None
+
+        return entries, head
+
+    def _get_many(self, addresses: Iterable[str], deserializer, head: str = None) -> BulkReadResult:
+        result = BulkReadResult()
+
+        groups = defaultdict(list)
+        for address in dict.fromkeys(addresses):
+            obj = self.cache.get(address, head) if self.cache is not None else None
+            if obj is not None:
+                result[address] = obj
+            else:
+                groups[address[:self.prefix_length]].append(address)
+
+        singles = []
+        prefixes = []
+        for prefix, group in groups.items():
+            if self.list_threshold is not None and len(group) >= self.list_threshold:
+                prefixes.append(prefix)
+            else:
+                singles.extend(group)
 
-        body = base64.b64decode(response.data)
+        # Any error is reported for the addresses it concerns, ie. state
+        # which is not valid base64 or JSON, instead of being lost
+        def read_single(address):
+            try:
+                result[address] = self._get_object(address, deserializer, head)
+            except Exception as e:
+                result.errors[address] = e
 
-        settlement = settlement_schema.loads(body)
-        settlement.address = address
+        def read_prefix(prefix):
+            try:
+                entries, read_head = self._list_state(prefix, head)
+            except Exception as e:
+                for address in groups[prefix]:
+                    result.errors[address] = e
+                return
 
-        return settlement
+            for address in groups[prefix]:
+                if address not in entries:
+                    result.errors[address] = LedgerException('State not found', 75)
+                    continue
+
+                try:
+                    obj = _decode_object(entries[address], deserializer, address, self.strict)
+                except Exception as e:
+                    result.errors[address] = e
+                    continue
+
+                result[address] = obj
+
+                if self.cache is not None:
+                    self.cache.put(address, read_head, obj, pinned=head is not None)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(read_prefix, prefix) for prefix in prefixes]
+            futures.extend(executor.submit(read_single, address) for address in singles)
+
+        for future in futures:
+            future.result()
+
+        return result
@@ -0,0 +1,334 @@
+import time
+import threading
+
+from typing import List, Dict, Tuple, Callable, Iterator
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+
+from .cache import StateCache
+from .transport import ConnectionStats
+from .scheduler import is_transient
+from .instrumentation import increment, observe
+from .ledger_connector import Ledger, LedgerConnectionError, BatchStatusResponse, get_batch_ids
+
+
+@dataclass
+class NodeStatus:
+    url: str = field()
+    healthy: bool = field()
+    circuit: str = field()
+    latency: float = field(default=None)
+    block_num: int = field(default=None)
+    failures: int = field(default=0)
+
+
+class _Node(object):
+    def __init__(self, url: str, ledger: Ledger):
+        self.url = url
+        self.ledger = ledger
+        self.healthy = True
+        self.latency = None
+        self.block_num = None
+        self.failures = 0
+        self.open_until = 0
+        self.trial = False
+
+    def circuit(self, now: float) -> str:
+        if not self.open_until:
+            return 'closed'
+        if now < self.open_until:
+            return 'open'
+        return 'half_open'
+
+
+class MultiLedger(Ledger):
+    """
+    Ledger spread over the REST APIs of several nodes of the same network.
+
+    The nodes are probed in the background for their latency and newest
+    block. Requests go to the healthy node with the lowest latency, and
+    move on to the next node if one fails with a connection error or an
+    error which goes away by itself, like a full queue. A node is not
+    healthy if its newest block is more than max_lag blocks behind the
+    other nodes, ie. while it is catching up.
+
+    Every node has a circuit breaker, which opens after failure_threshold
+    consecutive failures or slow responses, and keeps requests away from
+    the node for reset_timeout seconds. After that a single request is let
+    through, and closes the circuit again if it succeeds.
+
+    Requests are counted per node in the ledger_routed_total metric, and
+    failovers and opened circuits in ledger_failover_total and
+    ledger_circuit_open_total.
+
+    :param List[str] urls: The urls of the nodes REST APIs.
+    :param float probe_interval: Seconds between probes, None to only probe when probe() is called.
+    :param int failure_threshold: The number of consecutive failures which open the circuit of a node.
+    :param float slow_threshold: Seconds after which a response counts as a failure, None for no limit.
+    :param float reset_timeout: Seconds the circuit of a node stays open.
+    :param int max_lag: The number of blocks a node may be behind the others and still be healthy.
+    :param float latency_smoothing: The weight of the newest latency in the moving average of each node.
+
+    The remaining parameters are the same as for Ledger, and apply to each node.
+    """
+
+    def __init__(self, urls: List[str], verify=True, pool_connections=10, pool_maxsize=10,
+                 connect_timeout=10, read_timeout=60, max_workers=8, prefix_length=8,
+                 list_threshold=256, cache: StateCache = None, probe_interval=5,
+                 failure_threshold=3, slow_threshold=None, reset_timeout=30, max_lag=10,
+                 latency_smoothing=0.3, strict=False):
+        if not urls:
+            raise ValueError('At least one url is required')
+
+        super(MultiLedger, self).__init__(
+            urls[0],
+            verify=verify,
+            max_workers=max_workers,
+            prefix_length=prefix_length,
+            list_threshold=list_threshold,
+            cache=cache,
+            strict=strict,
+        )
+
+        self.probe_interval = probe_interval
+        self.failure_threshold = failure_threshold
+        self.slow_threshold = slow_threshold
+        self.reset_timeout = reset_timeout
+        self.max_lag = max_lag
+        self.latency_smoothing = latency_smoothing
+
+        self._nodes = [
+            _Node(url, Ledger(
+                url,
+                verify=verify,
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                connect_timeout=connect_timeout,
+                read_timeout=read_timeout,
+                strict=strict,
+            ))
+            for url in urls
+        ]
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        if probe_interval is not None:
+            self._thread = threading.Thread(target=self._probe_loop, daemon=True)
+            self._thread.start()
+
+    def _create_transport(self, **options):
+        # Every request goes through the Ledger of a node
+        return None
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        for node in self._nodes:
+            node.ledger.close()
+        super(MultiLedger, self).close()
+
+    def connection_stats(self) -> ConnectionStats:
+        stats = [node.ledger.connection_stats() for node in self._nodes]
+        return ConnectionStats(
+            requests=sum(s.requests for s in stats),
+            connections=sum(s.connections for s in stats),
+        )
+
+    def nodes(self) -> List[NodeStatus]:
+        now = time.monotonic()
+
+        with self._lock:
+            return [
+                NodeStatus(
+                    url=node.url,
+                    healthy=node.healthy,
+                    circuit=node.circuit(now),
+                    latency=node.latency,
+                    block_num=node.block_num,
+                    failures=node.failures,
+                )
+                for node in self._nodes
+            ]
+
+    # -- Probing -------------------------------------------------------------
+
+    def _probe_loop(self):
+        while True:
+            self.probe()
+            if self._stop.wait(self.probe_interval):
+                return
+
+    def probe(self):
+        """
+        Measures the latency and newest block of every node,
+        except those whose circuit is open.
+        """
+        now = time.monotonic()
+        trials = {node for node in self._nodes if self._begin_trial(node)}
+        nodes = [node for node in self._nodes if node in trials or node.circuit(now) == 'closed']
+
+        def probe_node(node: _Node) -> Tuple[_Node, int]:
+            begin = time.monotonic()
+            try:
+                block_num = node.ledger.get_head_block_num()
+            except Exception:
+                self._record_failure(node)
+                block_num = None
+            else:
+                latency = time.monotonic() - begin
+                observe('ledger_node_latency_seconds', latency, node=node.url)
+                self._record_success(node, latency)
+            finally:
+                if node in trials:
+                    self._end_trial(node)
+
+            return node, block_num
+
+        if not nodes:
+            return
+
+        with ThreadPoolExecutor(max_workers=len(nodes)) as executor:
+            results = list(executor.map(probe_node, nodes))
+
+        with self._lock:
+            for node, block_num in results:
+                node.block_num = block_num
+
+            newest = max((node.block_num for node in self._nodes if node.block_num is not None), default=None)
+
+            for node, block_num in results:
+                node.healthy = block_num is not None and newest - block_num <= self.max_lag
+
+    # -- Circuit breaker -----------------------------------------------------
+
+    def _record_success(self, node: _Node, latency: float = None):
+        if latency is not None and self.slow_threshold is not None and latency > self.slow_threshold:
+            self._record_failure(node, latency)
+            return
+
+        with self._lock:
+            node.failures = 0
+            node.open_until = 0
+            self._update_latency(node, latency)
+
+    def _record_failure(self, node: _Node, latency: float = None):
+        now = time.monotonic()
+
+        with self._lock:
+            node.failures += 1
+            self._update_latency(node, latency)
+
+            if node.circuit(now) == 'half_open' or node.failures >= self.failure_threshold:
+                node.open_until = now + self.reset_timeout
+                opened = True
+            else:
+                opened = False
+
+        if opened:
+            increment('ledger_circuit_open_total', node=node.url)
+
+    def _begin_trial(self, node: _Node) -> bool:
+        """
+        Returns whether a request may be the single trial of a half open
+        circuit, and lets no other request try the node until it ends.
+        """
+        with self._lock:
+            if node.circuit(time.monotonic()) != 'half_open' or node.trial:
+                return False
+            node.trial = True
+            return True
+
+    def _end_trial(self, node: _Node):
+        with self._lock:
+            node.trial = False
+
+    def _update_latency(self, node: _Node, latency: float):
+        if latency is None:
+            return
+        if node.latency is None:
+            node.latency = latency
+        else:
+            node.latency += self.latency_smoothing * (latency - node.latency)
+
+    # -- Routing -------------------------------------------------------------
+
+    def _candidates(self) -> List[_Node]:
+        """
+        Returns the nodes to try in order: healthy nodes with a closed
+        circuit by latency, then nodes whose circuit is half open and not
+        being tried already, then the remaining nodes, as trying them is
+        better than failing.
+        """
+        now = time.monotonic()
+
+        def priority(node: _Node):
+            circuit = node.circuit(now)
+            return (
+                not node.healthy or circuit == 'open' or (circuit == 'half_open' and node.trial),
+                circuit == 'half_open',
+                node.latency is None,
+                node.latency or 0,
+            )
+
+        with self._lock:
+            return sorted(self._nodes, key=priority)
+
+    def _route(self, operation: str, call: Callable[[Ledger], object], measure_latency=True):
+        last_error = None
+
+        for node in self._candidates():
+            trial = self._begin_trial(node)
+            begin = time.monotonic()
+
+            try:
+                result = call(node.ledger)
+            except Exception as e:
+                if not is_transient(e):
+                    # The node answered, the request itself failed
+                    self._record_success(node)
+                    raise
+
+                self._record_failure(node)
+                increment('ledger_failover_total', node=node.url, operation=operation)
+                last_error = e
+                continue
+            else:
+                self._record_success(node, time.monotonic() - begin if measure_latency else None)
+            finally:
+                if trial:
+                    self._end_trial(node)
+
+            increment('ledger_routed_total', node=node.url, operation=operation)
+
+            return result
+
+        raise last_error or LedgerConnectionError('No ledger nodes available')
+
+    def get_head_block_num(self) -> int:
+        return self._route('get_head_block_num', lambda ledger: ledger.get_head_block_num())
+
+    def get_batch_status(self, link: str) -> BatchStatusResponse:
+        return self.get_batch_statuses(get_batch_ids(link))[0]
+
+    def _get_batch_statuses(self, batch_ids: List[str], wait: int = None) -> List[BatchStatusResponse]:
+        # Long polling takes as long as it takes, so it says nothing about latency
+        return self._route(
+            'get_batch_statuses',
+            lambda ledger: ledger.get_batch_statuses(batch_ids, wait),
+            measure_latency=not wait,
+        )
+
+    def _send_batch_list(self, batch_list_bytes: bytes, batch_ids: List[str]) -> str:
+        return self._route('send_batches', lambda ledger: ledger._send_batch_list(batch_list_bytes, batch_ids))
+
+    def _send_batch_stream(self, encode: Callable[[], Iterator[bytes]]) -> str:
+        # Each attempt encodes the batches again, giving the same bytes
+        return self._route('send_batches', lambda ledger: ledger._send_batch_stream(encode))
+
+    def _read_state(self, address, head: str = None) -> Tuple[bytes, str]:
+        return self._route('get_state', lambda ledger: ledger._read_state(address, head))
+
+    def _list_state(self, prefix: str, head: str = None) -> Tuple[Dict[str, bytes], str]:
+        return self._route('list_state', lambda ledger: ledger._list_state(prefix, head))
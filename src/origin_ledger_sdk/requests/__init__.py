@@ -2,10 +2,13 @@
 
 from .abstract_request import AbstractRequest
 from .publish_measurement_request import PublishMeasurementRequest
+from .measurement_batch import MeasurementBatch
 from .issue_ggo_request import IssueGGORequest
 from .split_ggo_request import SplitGGORequest, SplitGGOPart
 from .transfer_ggo_request import TransferGGORequest
 from .retire_ggo_request import RetireGGORequest, RetireGGOPart
+from .dependency_graph import order_requests, DependencyCycleError
+from .conflicts import Conflict, ConflictError, find_conflicts, split_conflicts
 
 from sawtooth_signing.secp256k1 import Secp256k1PrivateKey as PrivateKey
 from sawtooth_signing.secp256k1 import Secp256k1PublicKey as PublicKey
\ No newline at end of file
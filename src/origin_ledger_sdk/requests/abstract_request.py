@@ -1,21 +1,139 @@
 
 
+import warnings
+
 from hashlib import sha512
 from abc import ABC, abstractmethod
 from sawtooth_sdk.protobuf.transaction_pb2 import TransactionHeader, Transaction
-from typing import List
+from typing import List, Optional
+
+from .helpers import get_public_key_hex
+from .serializers import to_bytes
+from ..instrumentation import span
 
 class AbstractRequest(ABC):
+    """
+    The signed transactions of a request are memoized per batch signer,
+    so a request must not be modified once it has been signed.
+
+    Requests depending on the request refer to the header signature of
+    its most recent signing, which is the one sent to the ledger, so a
+    request must be signed before the requests depending on it.
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
 
-    dependencies = []
+        # Requests used to implement get_signed_transactions themselves,
+        # which is now what build_transactions does
+        if 'get_signed_transactions' in cls.__dict__ and 'build_transactions' not in cls.__dict__:
+            warnings.warn(
+                f'{cls.__name__} implements get_signed_transactions, which is deprecated, '
+                f'implement build_transactions instead',
+                DeprecationWarning,
+                stacklevel=2,
+            )
+            cls.build_transactions = cls.__dict__['get_signed_transactions']
+            cls.get_signed_transactions = AbstractRequest.get_signed_transactions
 
     @abstractmethod
-    def get_signed_transactions(self, batch_signer) -> List[Transaction]:
+    def build_transactions(self, batch_signer) -> List[Transaction]:
         raise NotImplementedError
 
 
-    def get_header_signature(self):
-        return self.get_signed_transactions[-1].header_signature
+    def get_signed_transactions(self, batch_signer) -> List[Transaction]:
+        signed = self.__dict__.setdefault('_signed_transactions', {})
+        key = get_public_key_hex(batch_signer)
+
+        transactions = signed.get(key)
+        if transactions is None:
+            transactions = signed[key] = self.build_transactions(batch_signer)
+
+        self._record_signing(transactions)
+
+        return transactions
+
+
+    def _set_signed_transactions(self, batch_signer, transactions: List[Transaction]):
+        """
+        Memoizes transactions signed elsewhere, ie. in another process.
+        """
+        key = get_public_key_hex(batch_signer)
+        self.__dict__.setdefault('_signed_transactions', {})[key] = transactions
+        self._record_signing(transactions)
+
+
+    def _record_signing(self, transactions: List[Transaction]):
+        """
+        Records the header signature of the most recently signed
+        transactions, which the requests depending on it refer to.
+        """
+        if transactions:
+            self.__dict__['_header_signature'] = transactions[-1].header_signature
+
+
+    def get_header_signature(self) -> str:
+        """
+        Returns the header signature of the requests last transaction,
+        of its most recent signing, as that is the one which will be sent
+        to the ledger.
+
+        Raises ValueError if the request has not been signed yet.
+        """
+        header_signature = self.__dict__.get('_header_signature')
+
+        if header_signature is None:
+            raise ValueError(
+                f'{type(self).__name__} has not been signed yet, '
+                f'it must be signed before the requests depending on it'
+            )
+
+        return header_signature
+
+
+    def get_inputs(self) -> Optional[List[str]]:
+        """
+        Returns the addresses read by the requests transactions,
+        or None if the request does not declare them.
+        """
+        return None
+
+
+    def get_outputs(self) -> Optional[List[str]]:
+        """
+        Returns the addresses written by the requests transactions,
+        or None if the request does not declare them.
+        """
+        return None
+
+
+    def get_spent_addresses(self) -> List[str]:
+        """
+        Returns the addresses of the GGOs the request spends,
+        which can only be spent once.
+        """
+        return []
+
+
+    def get_transaction_count(self) -> int:
+        """
+        Returns the number of transactions the request signs.
+        """
+        return 1
+
+
+    def _get_signing_parts(self, size: int) -> List['AbstractRequest']:
+        """
+        Returns requests of at most size transactions each, which together
+        sign the same transactions as the request, so they can be signed
+        in parallel. Requests which can not be split return themselves.
+        """
+        return [self]
+
+
+    @property
+    def dependencies(self) -> List['AbstractRequest']:
+        return self.__dict__.setdefault('_dependencies', [])
 
     
     def add_dependency(self, request):
@@ -31,19 +149,22 @@ class AbstractRequest(ABC):
             family_name,
             family_version) -> Transaction:
 
-        header = TransactionHeader(
-            batcher_public_key=batch_signer.get_public_key().as_hex(),
-            dependencies=[dep.get_header_signature() for dep in self.dependencies],
-            family_name=family_name,
-            family_version=family_version,
-            inputs=inputs,
-            outputs=outputs,
-            payload_sha512=sha512(payload_bytes).hexdigest(),
-            signer_public_key=transaction_signer.get_public_key().as_hex()
-        )
+        with span('transaction_header_seconds'):
+            header = TransactionHeader(
+                batcher_public_key=get_public_key_hex(batch_signer),
+                dependencies=[dep.get_header_signature() for dep in self.dependencies],
+                family_name=family_name,
+                family_version=family_version,
+                inputs=inputs,
+                outputs=outputs,
+                payload_sha512=sha512(payload_bytes).hexdigest(),
+                signer_public_key=get_public_key_hex(transaction_signer)
+            )
+
+            transaction_header_bytes = header.SerializeToString()
 
-        transaction_header_bytes = header.SerializeToString()
-        signature = transaction_signer.sign(transaction_header_bytes)
+        with span('transaction_sign_seconds'):
+            signature = transaction_signer.sign(transaction_header_bytes)
 
         transaction = Transaction(
             header=transaction_header_bytes,
@@ -55,4 +176,5 @@ class AbstractRequest(ABC):
 
  
     def _to_bytes(self, schema, obj):
-        return schema().dumps(obj=obj).encode('utf8')
+        with span('request_serialize_seconds'):
+            return to_bytes(schema, obj)
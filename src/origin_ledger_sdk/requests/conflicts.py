@@ -0,0 +1,151 @@
+
+from typing import List, Dict, Set, Iterable
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from .abstract_request import AbstractRequest
+from .dependency_graph import order_requests
+
+
+@dataclass
+class Conflict:
+    """
+    Two requests accessing the same address, where at least one of them
+    writes it, without the second depending on the first.
+
+    A double spend is two requests spending the same GGO, which fails
+    no matter how the requests are ordered.
+    """
+    address: str = field()
+    first: AbstractRequest = field()
+    second: AbstractRequest = field()
+    double_spend: bool = field(default=False)
+
+
+class ConflictError(Exception):
+    def __init__(self, conflicts: List[Conflict]):
+        super(ConflictError, self).__init__(
+            f'{len(conflicts)} conflict(s), first on address {conflicts[0].address}')
+        self.conflicts = conflicts
+
+
+def _unique(requests: Iterable[AbstractRequest]) -> List[AbstractRequest]:
+    # Requests are dataclasses and therefore not hashable
+    return list({id(request): request for request in requests}.values())
+
+
+class _Ancestors(object):
+    """
+    Answers whether a request depends on another, directly or not.
+    """
+
+    def __init__(self):
+        self._ancestors: Dict[int, Set[int]] = {}
+
+    def get(self, request: AbstractRequest) -> Set[int]:
+        ancestors = self._ancestors.get(id(request))
+        if ancestors is None:
+            ancestors = set()
+            stack = list(request.dependencies)
+            while stack:
+                dependency = stack.pop()
+                if id(dependency) not in ancestors:
+                    ancestors.add(id(dependency))
+                    stack.extend(dependency.dependencies)
+            self._ancestors[id(request)] = ancestors
+        return ancestors
+
+
+def find_conflicts(requests: Iterable[AbstractRequest]) -> List[Conflict]:
+    """
+    Returns the conflicts between the requests, in the order they
+    will be signed in.
+
+    Each access of an address is checked against the last request
+    writing it, and each write against the requests reading it since.
+
+    Raises ValueError if a request does not declare its inputs and outputs.
+    """
+    ancestors = _Ancestors()
+    conflicts = []
+    double_spends = set()
+    spenders: Dict[str, AbstractRequest] = {}
+    writers: Dict[str, AbstractRequest] = {}
+    readers: Dict[str, List[AbstractRequest]] = defaultdict(list)
+
+    for request in order_requests(requests):
+        for address in dict.fromkeys(request.get_spent_addresses()):
+            first = spenders.setdefault(address, request)
+            if first is not request:
+                conflicts.append(Conflict(address=address, first=first, second=request, double_spend=True))
+                double_spends.add((id(first), address))
+
+        inputs = request.get_inputs()
+        outputs = request.get_outputs()
+        if inputs is None or outputs is None:
+            raise ValueError(f'{type(request).__name__} does not declare its inputs and outputs, '
+                             f'so its conflicts can not be found')
+
+        written = set(outputs)
+
+        for address in dict.fromkeys(inputs + outputs):
+            writer = writers.get(address)
+            others = [writer] if writer is not None else []
+            if address in written:
+                others.extend(readers[address])
+
+            for other in _unique(others):
+                if other is request or id(other) in ancestors.get(request) \
+                        or (id(other), address) in double_spends:
+                    continue
+                conflicts.append(Conflict(address=address, first=other, second=request))
+
+            if address in written:
+                writers[address] = request
+                readers[address] = []
+            else:
+                readers[address].append(request)
+
+    return conflicts
+
+
+def split_conflicts(requests: Iterable[AbstractRequest]) -> List[List[AbstractRequest]]:
+    """
+    Splits the requests into groups without conflicts, where every
+    request comes in a later group than the requests it conflicts with.
+    The second request of each conflict is made to depend on the first,
+    so the ledger executes them in order.
+
+    Raises ConflictError if any GGO is spent twice, and ValueError if
+    a request does not declare its inputs and outputs, or a request
+    which would get a dependency has already been signed.
+    """
+    requests = order_requests(requests)
+    conflicts = find_conflicts(requests)
+
+    double_spends = [conflict for conflict in conflicts if conflict.double_spend]
+    if double_spends:
+        raise ConflictError(double_spends)
+
+    firsts = defaultdict(list)
+    for conflict in conflicts:
+        firsts[id(conflict.second)].append(conflict.first)
+
+    for request in requests:
+        if firsts[id(request)] and '_signed_transactions' in request.__dict__:
+            raise ValueError(f'{type(request).__name__} has already been signed, so dependencies can not be added')
+
+    levels = {}
+    groups = defaultdict(list)
+
+    for request in requests:
+        level = max((levels[id(d)] for d in request.dependencies if id(d) in levels), default=0)
+        level = max([level] + [levels[id(first)] + 1 for first in firsts[id(request)]])
+        levels[id(request)] = level
+        groups[level].append(request)
+
+        for first in _unique(firsts[id(request)]):
+            if all(d is not first for d in request.dependencies):
+                request.add_dependency(first)
+
+    return [groups[level] for level in sorted(groups)]
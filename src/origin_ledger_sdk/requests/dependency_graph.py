@@ -0,0 +1,55 @@
+
+import heapq
+
+from typing import List, Callable, Iterable, TypeVar
+
+from .abstract_request import AbstractRequest
+
+T = TypeVar('T')
+
+
+class DependencyCycleError(Exception):
+    pass
+
+
+def topological_order(nodes: Iterable[T], get_dependencies: Callable[[T], Iterable[T]]) -> List[T]:
+    """
+    Orders the nodes so every node comes after the nodes it depends on,
+    otherwise keeping their original order.
+
+    Dependencies which are not among the nodes are ignored.
+    """
+    index = {}
+    for node in nodes:
+        index.setdefault(id(node), node)
+    nodes = list(index.values())
+    index = {id(node): i for i, node in enumerate(nodes)}
+
+    dependents = {i: [] for i in range(len(nodes))}
+    remaining = [0] * len(nodes)
+
+    for i, node in enumerate(nodes):
+        for dependency in set(index[id(d)] for d in get_dependencies(node) if id(d) in index):
+            dependents[dependency].append(i)
+            remaining[i] += 1
+
+    ready = [i for i in range(len(nodes)) if remaining[i] == 0]
+    ordered = []
+
+    while ready:
+        i = heapq.heappop(ready)
+        ordered.append(nodes[i])
+
+        for dependent in dependents[i]:
+            remaining[dependent] -= 1
+            if remaining[dependent] == 0:
+                heapq.heappush(ready, dependent)
+
+    if len(ordered) != len(nodes):
+        raise DependencyCycleError('The dependencies between the requests contain a cycle')
+
+    return ordered
+
+
+def order_requests(requests: Iterable[AbstractRequest]) -> List[AbstractRequest]:
+    return topological_order(requests, lambda request: request.dependencies)
@@ -1,10 +1,83 @@
 
+import threading
+
+from hashlib import sha256
+from collections import OrderedDict
 from sawtooth_signing import create_context
-from sawtooth_signing import CryptoFactory, Signer
+from sawtooth_signing import Signer
 from sawtooth_signing.secp256k1 import Secp256k1PrivateKey as PrivateKey
 
 
+_context = create_context('secp256k1')
+
+
+class PooledSigner(Signer):
+    """
+    A Signer which computes its public key hex once, as it is
+    embedded in every transaction and batch header it signs.
+    """
+
+    def __init__(self, context, private_key):
+        super(PooledSigner, self).__init__(context, private_key)
+        self.public_key_hex = self.get_public_key().as_hex()
+
+
+class SignerPool(object):
+    """
+    Bounded LRU cache of signers, keyed by a SHA-256 digest of the
+    private key so raw keys are never kept as dictionary keys.
+
+    :param int max_size: The maximum number of signers to keep.
+    """
+
+    def __init__(self, max_size=4096):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._signers = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._signers)
+
+    def get(self, private_key_bytes: bytes) -> PooledSigner:
+        digest = sha256(private_key_bytes).digest()
+
+        with self._lock:
+            signer = self._signers.get(digest)
+            if signer is not None:
+                self._signers.move_to_end(digest)
+                self.hits += 1
+                return signer
+            self.misses += 1
+
+        private_key = PrivateKey.from_bytes(private_key_bytes)
+        signer = PooledSigner(_context, private_key)
+
+        with self._lock:
+            self._signers[digest] = signer
+            self._signers.move_to_end(digest)
+            while len(self._signers) > self.max_size:
+                self._signers.popitem(last=False)
+
+        return signer
+
+    def clear(self):
+        with self._lock:
+            self._signers.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+signer_pool = SignerPool()
+
+
 def get_signer(private_key_bytes: bytes) -> Signer:
-    context = create_context('secp256k1')
-    private_key = PrivateKey.from_bytes(private_key_bytes)
-    return CryptoFactory(context).new_signer(private_key)   
+    return signer_pool.get(private_key_bytes)
+
+
+def get_public_key_hex(signer: Signer) -> str:
+    public_key_hex = getattr(signer, 'public_key_hex', None)
+    if public_key_hex is None:
+        public_key_hex = signer.get_public_key().as_hex()
+    return public_key_hex
@@ -1,15 +1,14 @@
-import marshmallow_dataclass
-
 from typing import List, Dict
 from dataclasses import dataclass, field
 from sawtooth_sdk.protobuf.transaction_pb2 import Transaction
 
 from .abstract_request import AbstractRequest
+from .serializers import LazySchema
 
 from ..ledger_dto.requests import IssueGGORequest as LedgerIssueGGORequest
 
 
-issue_ggo_schema = marshmallow_dataclass.class_schema(LedgerIssueGGORequest)
+issue_ggo_schema = LazySchema(LedgerIssueGGORequest)
 
 
 @dataclass
@@ -31,7 +30,13 @@ class IssueGGORequest(AbstractRequest):
     fuel_type: str = field()
     emissions: Dict[str, str] = field(default=None)
 
-    def get_signed_transactions(self, batch_signer) -> List[Transaction]:
+    def get_inputs(self) -> List[str]:
+        return [self.measurement_address, self.ggo_address]
+
+    def get_outputs(self) -> List[str]:
+        return [self.ggo_address]
+
+    def build_transactions(self, batch_signer) -> List[Transaction]:
 
         request = LedgerIssueGGORequest(
             origin=self.measurement_address,
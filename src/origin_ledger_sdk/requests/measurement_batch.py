@@ -0,0 +1,265 @@
+from array import array
+from hashlib import sha512
+from datetime import datetime, timedelta, timezone
+from typing import List, Iterable, Iterator, Sequence, Union
+from sawtooth_sdk.protobuf.transaction_pb2 import TransactionHeader, Transaction
+
+from .abstract_request import AbstractRequest
+from .helpers import get_public_key_hex
+from .publish_measurement_request import PublishMeasurementRequest, measurement_schema
+from .serializers import get_serializer
+
+from ..instrumentation import span
+from ..ledger_dto.requests import PublishMeasurementRequest as LedgerPublishMeasurementRequest
+from ..ledger_dto import MeasurementType
+
+
+ADDRESS_LENGTH = 35
+
+_TYPES = list(MeasurementType)
+_TYPE_CODES = {t: code for code, t in enumerate(_TYPES)}
+
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_EPOCH_NAIVE = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_HOUR = 3600 * 1000000
+
+# Not None, as None is the timezone of naive datetimes
+_UNSET = object()
+
+
+class MeasurementBatch(AbstractRequest):
+    """
+    Many measurements to publish, stored column by column instead of as a
+    PublishMeasurementRequest each: addresses as raw bytes, begin, end and
+    amount as 64-bit integers, and sector and type as indices into the few
+    distinct values. A measurement takes up 61 bytes.
+
+    It signs a transaction per measurement, identical to the transaction
+    of the PublishMeasurementRequest with the same fields, and is added
+    to a Batch like any other request. Its dependencies apply to every
+    measurement.
+
+    All begin and end datetimes must have the UTC offset of the timezone of
+    the first one, or all be naive.
+    """
+
+    def __init__(self, measurements: Iterable[PublishMeasurementRequest] = ()):
+        self._addresses = bytearray()
+        self._begins = array('q')
+        self._ends = array('q')
+        self._amounts = array('q')
+        self._sectors = array('B')
+        self._types = array('B')
+        self._sector_names: List[str] = []
+        self._tzinfo = _UNSET
+
+        for measurement in measurements:
+            self.append(
+                address=measurement.address,
+                begin=measurement.begin,
+                end=measurement.end,
+                sector=measurement.sector,
+                type=measurement.type,
+                amount=measurement.amount,
+            )
+
+    @classmethod
+    def hourly(cls, address: str, begin: datetime, amounts: Sequence[int], sector: str,
+               type: MeasurementType) -> 'MeasurementBatch':
+        """
+        Returns the consecutive hourly measurements of one meter, where
+        the first begins at begin.
+
+        :param str address: The address of the meter.
+        :param datetime begin: The datetime where the first measurement begins.
+        :param Sequence[int] amounts: The amount of each hour in Wh.
+        :param str sector: The sector (price-zone) of the meter.
+        :param MeasurementType type: The type of the measurements.
+        """
+        batch = cls()
+        count = len(amounts)
+        first = batch._to_micros(begin)
+
+        batch._addresses = bytearray(_address_bytes(address)) * count
+        batch._begins = array('q', range(first, first + count * _HOUR, _HOUR))
+        batch._ends = array('q', range(first + _HOUR, first + (count + 1) * _HOUR, _HOUR))
+        batch._amounts = array('q', amounts)
+        batch._sectors = array('B', [batch._sector_code(sector)]) * count
+        batch._types = array('B', [_TYPE_CODES[type]]) * count
+
+        return batch
+
+    def __len__(self):
+        return len(self._amounts)
+
+    def __getitem__(self, index: int) -> PublishMeasurementRequest:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('MeasurementBatch index out of range')
+
+        return PublishMeasurementRequest(
+            address=self._address(index),
+            begin=self._from_micros(self._begins[index]),
+            end=self._from_micros(self._ends[index]),
+            sector=self._sector_names[self._sectors[index]],
+            type=_TYPES[self._types[index]],
+            amount=self._amounts[index],
+        )
+
+    def __iter__(self) -> Iterator[PublishMeasurementRequest]:
+        return (self[i] for i in range(len(self)))
+
+    @property
+    def nbytes(self) -> int:
+        """
+        The number of bytes taken up by the measurements.
+        """
+        return len(self._addresses) + sum(
+            column.itemsize * len(column)
+            for column in (self._begins, self._ends, self._amounts, self._sectors, self._types)
+        )
+
+    def append(self, address: str, begin: datetime, end: datetime, sector: str,
+               type: MeasurementType, amount: int):
+        if '_header_signature' in self.__dict__:
+            raise ValueError('MeasurementBatch has already been signed, so measurements can not be added')
+
+        self._addresses += _address_bytes(address)
+        self._begins.append(self._to_micros(begin))
+        self._ends.append(self._to_micros(end))
+        self._sectors.append(self._sector_code(sector))
+        self._types.append(_TYPE_CODES[type])
+        self._amounts.append(amount)
+
+    def split(self, size: int) -> List['MeasurementBatch']:
+        """
+        Splits the measurements into batches of at most size measurements,
+        ie. to fit within the transaction limit of a Batch.
+        """
+        batches = []
+
+        for start in range(0, len(self), size):
+            stop = start + size
+            batch = MeasurementBatch()
+            batch._addresses = self._addresses[start * ADDRESS_LENGTH:stop * ADDRESS_LENGTH]
+            batch._begins = self._begins[start:stop]
+            batch._ends = self._ends[start:stop]
+            batch._amounts = self._amounts[start:stop]
+            batch._sectors = self._sectors[start:stop]
+            batch._types = self._types[start:stop]
+            batch._sector_names = list(self._sector_names)
+            batch._tzinfo = self._tzinfo
+            batch.dependencies.extend(self.dependencies)
+            batches.append(batch)
+
+        return batches
+
+    def get_inputs(self) -> List[str]:
+        return [self._address(i) for i in range(len(self))]
+
+    def get_outputs(self) -> List[str]:
+        return self.get_inputs()
+
+    def get_transaction_count(self) -> int:
+        return len(self)
+
+    def _get_signing_parts(self, size: int) -> List['MeasurementBatch']:
+        if len(self) <= size:
+            return [self]
+        return self.split(size)
+
+    def build_transactions(self, batch_signer) -> List[Transaction]:
+        with span('request_serialize_seconds'):
+            payloads = self._build_payloads()
+
+        # Everything but the address and payload is the same for every
+        # transaction, so the header is built once and copied
+        template = TransactionHeader(
+            batcher_public_key=get_public_key_hex(batch_signer),
+            dependencies=[dep.get_header_signature() for dep in self.dependencies],
+            family_name=LedgerPublishMeasurementRequest.__name__,
+            family_version='0.1',
+            signer_public_key=get_public_key_hex(batch_signer),
+        )
+
+        transactions = []
+
+        for i, payload_bytes in enumerate(payloads):
+            address = self._address(i)
+
+            header = TransactionHeader()
+            header.CopyFrom(template)
+            header.inputs.append(address)
+            header.outputs.append(address)
+            header.payload_sha512 = sha512(payload_bytes).hexdigest()
+            header_bytes = header.SerializeToString()
+
+            transactions.append(Transaction(
+                header=header_bytes,
+                header_signature=batch_signer.sign(header_bytes),
+                payload=payload_bytes,
+            ))
+
+        return transactions
+
+    def _build_payloads(self) -> List[bytes]:
+        """
+        Returns the payload of each measurement, serialized like
+        PublishMeasurementRequest does. The end of a measurement is
+        usually the begin of the next, so datetimes are only built once.
+        """
+        serializer = get_serializer(measurement_schema)
+        datetimes = {}
+
+        def from_micros(micros):
+            value = datetimes.get(micros)
+            if value is None:
+                value = datetimes[micros] = self._from_micros(micros)
+            return value
+
+        return [
+            serializer.dumps(LedgerPublishMeasurementRequest(
+                begin=from_micros(begin),
+                end=from_micros(end),
+                sector=self._sector_names[sector],
+                amount=amount,
+                type=_TYPES[type],
+            )).encode('utf8')
+            for begin, end, sector, type, amount
+            in zip(self._begins, self._ends, self._sectors, self._types, self._amounts)
+        ]
+
+    def _address(self, index: int) -> str:
+        return self._addresses[index * ADDRESS_LENGTH:(index + 1) * ADDRESS_LENGTH].hex()
+
+    def _sector_code(self, sector: str) -> int:
+        try:
+            return self._sector_names.index(sector)
+        except ValueError:
+            self._sector_names.append(sector)
+            return len(self._sector_names) - 1
+
+    def _to_micros(self, value: datetime) -> int:
+        if self._tzinfo is _UNSET:
+            self._tzinfo = value.tzinfo
+        elif (value.tzinfo is None) != (self._tzinfo is None) or (
+                value.tzinfo is not None and value.utcoffset() != value.astimezone(self._tzinfo).utcoffset()):
+            # Equal timezones may be different objects, ie. pytz.utc and timezone.utc
+            raise ValueError('All measurements of a MeasurementBatch must have the same timezone')
+
+        epoch = _EPOCH_NAIVE if value.tzinfo is None else _EPOCH_UTC
+        return (value - epoch) // _MICROSECOND
+
+    def _from_micros(self, micros: int) -> datetime:
+        if self._tzinfo is None:
+            return _EPOCH_NAIVE + timedelta(microseconds=micros)
+        return (_EPOCH_UTC + timedelta(microseconds=micros)).astimezone(self._tzinfo)
+
+
+def _address_bytes(address: Union[str, bytes]) -> bytes:
+    raw = bytes.fromhex(address) if isinstance(address, str) else bytes(address)
+    if len(raw) != ADDRESS_LENGTH:
+        raise ValueError(f'Invalid address {address!r}, must be {ADDRESS_LENGTH} bytes')
+    return raw
@@ -1,18 +1,17 @@
 
 
-import marshmallow_dataclass
-
 from datetime import datetime
 from typing import List
 from dataclasses import dataclass, field
 from sawtooth_sdk.protobuf.transaction_pb2 import Transaction
 
 from .abstract_request import AbstractRequest
+from .serializers import LazySchema
 
 from ..ledger_dto.requests import PublishMeasurementRequest as LedgerPublishMeasurementRequest
 from ..ledger_dto import MeasurementType
 
-measurement_schema = marshmallow_dataclass.class_schema(LedgerPublishMeasurementRequest)
+measurement_schema = LazySchema(LedgerPublishMeasurementRequest)
 
 
 @dataclass
@@ -33,7 +32,13 @@ class PublishMeasurementRequest(AbstractRequest):
     type: MeasurementType = field()
     amount: int = field()
 
-    def get_signed_transactions(self, batch_signer) -> List[Transaction]:
+    def get_inputs(self) -> List[str]:
+        return [self.address]
+
+    def get_outputs(self) -> List[str]:
+        return [self.address]
+
+    def build_transactions(self, batch_signer) -> List[Transaction]:
 
         measurement = LedgerPublishMeasurementRequest(
             begin=self.begin,
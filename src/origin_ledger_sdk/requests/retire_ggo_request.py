@@ -1,18 +1,17 @@
 
-import marshmallow_dataclass
-
 from typing import List
 from dataclasses import dataclass, field
 from sawtooth_sdk.protobuf.transaction_pb2 import Transaction
 
 from .abstract_request import AbstractRequest
+from .serializers import LazySchema
 from .helpers import get_signer
 
 from ..ledger_dto.requests import RetireGGORequest as LedgerRetireGGORequest
 from ..ledger_dto.requests import SettlementRequest as LedgerSettlementRequest
 
-retire_ggo_schema = marshmallow_dataclass.class_schema(LedgerRetireGGORequest)
-settlment_schema = marshmallow_dataclass.class_schema(LedgerSettlementRequest)
+retire_ggo_schema = LazySchema(LedgerRetireGGORequest)
+settlment_schema = LazySchema(LedgerSettlementRequest)
 
 
 @dataclass
@@ -39,7 +38,19 @@ class RetireGGORequest(AbstractRequest):
     measurement_private_key: bytes = field()
     parts: List[RetireGGOPart] = field()
 
-    def get_signed_transactions(self, batch_signer) -> List[Transaction]:
+    def get_inputs(self) -> List[str]:
+        return [self.settlement_address, self.measurement_address] + [part.address for part in self.parts]
+
+    def get_outputs(self) -> List[str]:
+        return [self.settlement_address] + [part.address for part in self.parts]
+
+    def get_spent_addresses(self) -> List[str]:
+        return [part.address for part in self.parts]
+
+    def get_transaction_count(self) -> int:
+        return len(self.parts) + 1
+
+    def build_transactions(self, batch_signer) -> List[Transaction]:
 
         signed_transaction = []
         addresses = [self.settlement_address, self.measurement_address]
@@ -0,0 +1,129 @@
+
+from datetime import datetime
+from marshmallow import Schema, fields, missing
+from marshmallow_dataclass import class_schema
+
+
+class CompileError(Exception):
+    pass
+
+
+def _compile_field(field: fields.Field):
+    """
+    Returns a function converting a value the same way field._serialize
+    does. Common cases are specialized, everything else calls the field.
+    """
+    serialize = field._serialize
+
+    if isinstance(field, fields.Nested):
+        nested = _compile_schema(field.schema)
+        if field.many:
+            return lambda value: None if value is None else [nested(v) for v in value]
+        return lambda value: None if value is None else nested(value)
+
+    if isinstance(field, fields.List):
+        inner = _compile_field(field.inner)
+        return lambda value: None if value is None else [inner(v) for v in value]
+
+    if isinstance(field, fields.Mapping):
+        key = _compile_field(field.key_field) if field.key_field else lambda k: k
+        value_field = _compile_field(field.value_field) if field.value_field else lambda v: v
+        mapping_type = field.mapping_type
+        return lambda value: None if value is None else mapping_type(
+            (key(k), value_field(v)) for k, v in value.items())
+
+    if isinstance(field, fields.String):
+        return lambda value: value if type(value) is str else serialize(value, None, None)
+
+    if isinstance(field, fields.Integer) and not field.as_string:
+        return lambda value: value if type(value) is int else serialize(value, None, None)
+
+    if isinstance(field, fields.DateTime) and (field.format or field.DEFAULT_FORMAT) in ('iso', 'iso8601') \
+            and field.SERIALIZATION_FUNCS.get('iso') is datetime.isoformat:
+        return lambda value: None if value is None else value.isoformat()
+
+    if type(field).__name__ in ('Enum', 'EnumField'):
+        return lambda value: serialize(value, None, None)
+
+    if isinstance(field, (fields.Raw, fields.Boolean, fields.Number, fields.DateTime, fields.Date)):
+        return lambda value: serialize(value, None, None)
+
+    raise CompileError(f'Can not compile field {type(field).__name__}')
+
+
+def _compile_schema(schema: Schema):
+    if type(schema).get_attribute is not Schema.get_attribute:
+        raise CompileError('Can not compile schema with custom get_attribute')
+    if any('dump' in str(key) and hooks for key, hooks in schema._hooks.items()):
+        raise CompileError('Can not compile schema with dump hooks')
+
+    compiled = [
+        (field.attribute or name, field.data_key or name, _compile_field(field))
+        for name, field in schema.dump_fields.items()
+    ]
+
+    def serialize(obj):
+        result = {}
+        for attribute, key, convert in compiled:
+            value = getattr(obj, attribute, missing)
+            if value is not missing:
+                result[key] = convert(value)
+        return result
+
+    return serialize
+
+
+class CompiledSerializer(object):
+    """
+    Serializes objects to the exact same JSON as schema().dumps(obj),
+    without instantiating the schema and running marshmallows dump
+    machinery for every object.
+
+    Schemas which can not be compiled are serialized with marshmallow.
+    """
+
+    def __init__(self, schema_class):
+        self.schema = schema_class()
+        self.render = self.schema.opts.render_module.dumps
+
+        try:
+            self._serialize = _compile_schema(self.schema)
+            self.compiled = True
+        except CompileError:
+            self._serialize = self.schema.dump
+            self.compiled = False
+
+    def dumps(self, obj) -> str:
+        return self.render(self._serialize(obj))
+
+
+class LazySchema(object):
+    """
+    Stands in for the schema class of a dataclass, and only builds it
+    the first time it is called, as building it slows down imports.
+    """
+
+    def __init__(self, cls):
+        self.cls = cls
+        self._schema_class = None
+
+    def __call__(self, *args, **kwargs) -> Schema:
+        if self._schema_class is None:
+            self._schema_class = class_schema(self.cls)
+        return self._schema_class(*args, **kwargs)
+
+
+_serializers = {}
+
+
+def get_serializer(schema_class) -> CompiledSerializer:
+    serializer = _serializers.get(schema_class)
+    if serializer is None:
+        serializer = _serializers[schema_class] = CompiledSerializer(schema_class)
+    return serializer
+
+
+def to_bytes(schema_class, obj, compiled=True) -> bytes:
+    if compiled:
+        return get_serializer(schema_class).dumps(obj).encode('utf8')
+    return schema_class().dumps(obj=obj).encode('utf8')
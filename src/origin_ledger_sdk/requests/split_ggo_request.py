@@ -1,7 +1,5 @@
 
 
-import marshmallow_dataclass
-
 from typing import List
 from dataclasses import dataclass, field
 from sawtooth_sdk.protobuf.transaction_pb2 import Transaction
@@ -9,11 +7,12 @@ from sawtooth_signing.secp256k1 import Secp256k1PrivateKey as PrivateKey
 
 from .helpers import get_signer
 from .abstract_request import AbstractRequest
+from .serializers import LazySchema
 
 from ..ledger_dto.requests import SplitGGORequest as LedgerSplitGGORequest
 from ..ledger_dto.requests import SplitGGOPart as LedgerSplitGGOPart
 
-split_ggo_schema = marshmallow_dataclass.class_schema(LedgerSplitGGORequest)
+split_ggo_schema = LazySchema(LedgerSplitGGORequest)
 
 @dataclass
 class SplitGGOPart():
@@ -38,7 +37,16 @@ class SplitGGORequest(AbstractRequest):
 
     parts: List[SplitGGOPart] = field()
 
-    def get_signed_transactions(self, batch_signer) -> List[Transaction]:
+    def get_inputs(self) -> List[str]:
+        return [self.source_address] + [part.address for part in self.parts]
+
+    def get_outputs(self) -> List[str]:
+        return self.get_inputs()
+
+    def get_spent_addresses(self) -> List[str]:
+        return [self.source_address]
+
+    def build_transactions(self, batch_signer) -> List[Transaction]:
 
         addresses = [self.source_address]
         parts = []
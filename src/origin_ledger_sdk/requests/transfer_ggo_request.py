@@ -1,15 +1,14 @@
 
-import marshmallow_dataclass
-
 from typing import List
 from dataclasses import dataclass, field
 from sawtooth_sdk.protobuf.transaction_pb2 import Transaction
 
 from .abstract_request import AbstractRequest
+from .serializers import LazySchema
 from .helpers import get_signer
 from ..ledger_dto.requests import TransferGGORequest as LedgerTransferGGORequest
 
-transfer_ggo_schema = marshmallow_dataclass.class_schema(LedgerTransferGGORequest)
+transfer_ggo_schema = LazySchema(LedgerTransferGGORequest)
 
 
 @dataclass
@@ -24,7 +23,16 @@ class TransferGGORequest(AbstractRequest):
     source_address: str = field()
     destination_address: str = field()
 
-    def get_signed_transactions(self, batch_signer) -> List[Transaction]:
+    def get_inputs(self) -> List[str]:
+        return [self.source_address, self.destination_address]
+
+    def get_outputs(self) -> List[str]:
+        return [self.source_address, self.destination_address]
+
+    def get_spent_addresses(self) -> List[str]:
+        return [self.source_address]
+
+    def build_transactions(self, batch_signer) -> List[Transaction]:
 
         request = LedgerTransferGGORequest(
             origin=self.source_address,
@@ -0,0 +1,321 @@
+import time
+import random
+import logging
+import threading
+
+from typing import List, Dict, Union
+from collections import deque
+from dataclasses import dataclass, field
+from concurrent.futures import Future
+from sawtooth_sdk.protobuf.batch_pb2 import Batch as SignedBatch, BatchList
+
+from .batch import Batch, BatchStatus
+from .ledger_connector import Ledger, LedgerException, LedgerConnectionError
+
+
+# Error codes of the REST API for errors which go away by themselves:
+# validator not ready, validator disconnected, validator timed out and queue full
+TRANSIENT_ERROR_CODES = {10, 15, 17, 31}
+
+# HTTP status codes for the same, also returned by proxies in front of the API
+TRANSIENT_STATUS_CODES = {429, 503}
+
+
+def is_transient(error: Exception) -> bool:
+    """
+    Returns whether a request which failed with the error may
+    succeed if it is sent again later.
+    """
+    if isinstance(error, LedgerConnectionError):
+        return True
+    if isinstance(error, LedgerException):
+        return error.code in TRANSIENT_ERROR_CODES or error.status_code in TRANSIENT_STATUS_CODES
+    return False
+
+
+class AimdController(object):
+    """
+    Additive increase, multiplicative decrease of the number of batches
+    allowed to be in flight, ie. submitted but not yet committed.
+
+    The limit grows by one for every limit batches committed, and is
+    multiplied by backoff when a submission is rejected or a batch took
+    longer than latency_target to commit. It is decreased at most once
+    for the batches sent before the previous decrease, so a burst of
+    rejections caused by the same congestion only counts once.
+
+    Since each batch occupies the window until committed, the rate of
+    submissions follows the limit divided by the commit latency.
+
+    :param float initial_limit: The number of batches allowed in flight to begin with.
+    :param float min_limit: The lowest the limit can decrease to.
+    :param float max_limit: The highest the limit can increase to.
+    :param float backoff: The factor the limit is multiplied by on congestion.
+    :param float latency_target: Seconds a batch may take to commit before it
+        is considered a sign of congestion, None to only react to rejections.
+    """
+
+    def __init__(self, initial_limit=4, min_limit=1, max_limit=256, backoff=0.5, latency_target=None):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_target = latency_target
+        self._sequence = 0
+        self._recovered_after = 0
+
+    def sent(self) -> int:
+        """
+        Returns the sequence number of a batch being sent.
+        """
+        self._sequence += 1
+        return self._sequence
+
+    def on_commit(self, sequence: int, latency: float):
+        if self.latency_target is not None and latency > self.latency_target:
+            self.on_congestion(sequence)
+        else:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def on_congestion(self, sequence: int):
+        if sequence > self._recovered_after:
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+            self._recovered_after = self._sequence
+
+
+@dataclass
+class _Submission:
+    batch: SignedBatch = field()
+    entry: bytes = field()
+    future: Future = field()
+    attempts: int = field(default=0)
+    sequence: int = field(default=0)
+    sent_at: float = field(default=0)
+
+
+class SubmissionScheduler(object):
+    """
+    Submits batches to the ledger from a bounded queue, adapting the
+    number of batches in flight to how congested the validator is.
+
+    Submissions which fail with a transient error, like a full validator
+    queue, are paused and sent again later with their original signature,
+    so they are never signed twice. Submissions which fail permanently
+    fail their futures with the error.
+
+    Batches are submitted in the order they were queued, except that
+    batches sent again are placed at the front of the queue.
+
+    :param Ledger ledger: The ledger to submit the batches to.
+    :param int max_queue: The number of batches which may wait to be sent
+        before submit() blocks.
+    :param int max_list_batches: The maximum number of batches sent in one request.
+    :param int max_retries: The number of times a batch is sent again before
+        its future fails with the last error.
+    :param float retry_delay: Seconds to pause after the first rejection,
+        doubled for every consecutive rejection.
+    :param float max_retry_delay: The longest pause after a rejection.
+    :param int poll_wait: Seconds each batch status request may wait on the ledger.
+    :param float unknown_timeout: Seconds after which a batch the ledger does
+        not know is assumed to be dropped, and sent again.
+    :param AimdController controller: Controls the number of batches in flight.
+    """
+
+    def __init__(self, ledger: Ledger, max_queue=1000, max_list_batches=20,
+                 max_retries=10, retry_delay=0.5, max_retry_delay=30,
+                 poll_wait=1, unknown_timeout=60, controller: AimdController = None):
+        self.ledger = ledger
+        self.max_queue = max_queue
+        self.max_list_batches = max_list_batches
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.poll_wait = poll_wait
+        self.unknown_timeout = unknown_timeout
+        self.controller = controller or AimdController()
+        self.rejections = 0
+
+        self._queue = deque()
+        self._in_flight: Dict[str, _Submission] = {}
+        self._sending = 0
+        self._paused_until = 0
+        self._consecutive_rejections = 0
+        self._closing = False
+        self._condition = threading.Condition()
+
+        self._threads = [
+            threading.Thread(target=self._submit_loop, daemon=True),
+            threading.Thread(target=self._status_loop, daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight) + self._sending
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    def submit(self, batch: Union[Batch, SignedBatch], timeout: float = None) -> Future:
+        """
+        Queues a batch for submission, blocking while the queue is full.
+
+        Returns a future resolved with the BatchStatusResponse of the batch
+        once it is COMMITTED or INVALID.
+
+        :param batch: The batch to submit, signed here if it is not already.
+        :param float timeout: Seconds to wait for room in the queue.
+        """
+        if isinstance(batch, Batch):
+            batch = batch.get_signed_batch()
+
+        submission = _Submission(
+            batch=batch,
+            entry=BatchList(batches=[batch]).SerializeToString(),
+            future=Future(),
+        )
+
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._closing or len(self._queue) < self.max_queue, timeout):
+                raise TimeoutError('Timed out waiting for room in the submission queue')
+            if self._closing:
+                raise RuntimeError('SubmissionScheduler is closed')
+
+            self._queue.append(submission)
+            self._condition.notify_all()
+
+        return submission.future
+
+    def close(self):
+        """
+        Waits for every queued batch to be committed, invalid or failed,
+        and stops the scheduler.
+        """
+        with self._condition:
+            self._closing = True
+            self._condition.notify_all()
+
+        for thread in self._threads:
+            thread.join()
+
+    def _done(self) -> bool:
+        return self._closing and not self._queue and not self.in_flight
+
+    def _can_send(self) -> bool:
+        return bool(self._queue) and self.in_flight < int(self.controller.limit) \
+            and time.monotonic() >= self._paused_until
+
+    def _submit_loop(self):
+        while True:
+            with self._condition:
+                while not self._done() and not self._can_send():
+                    self._condition.wait(max(0.0, self._paused_until - time.monotonic()) or None)
+
+                if self._done():
+                    return
+
+                count = min(self.max_list_batches, int(self.controller.limit) - self.in_flight)
+                submissions = [self._queue.popleft() for _ in range(min(count, len(self._queue)))]
+                self._sending += len(submissions)
+
+                for submission in submissions:
+                    submission.attempts += 1
+                    submission.sequence = self.controller.sent()
+                    submission.sent_at = time.monotonic()
+
+            self._send(submissions)
+
+    def _send(self, submissions: List[_Submission]):
+        try:
+            self.ledger._send_batch_list(
+                b''.join(submission.entry for submission in submissions),
+                [submission.batch.header_signature for submission in submissions],
+            )
+        except Exception as e:
+            with self._condition:
+                self._sending -= len(submissions)
+
+                if is_transient(e):
+                    self._reject(submissions, e)
+                else:
+                    for submission in submissions:
+                        submission.future.set_exception(e)
+
+                self._condition.notify_all()
+            return
+
+        self.ledger._track_outputs([submission.batch for submission in submissions])
+
+        with self._condition:
+            self._sending -= len(submissions)
+            self._consecutive_rejections = 0
+            for submission in submissions:
+                self._in_flight[submission.batch.header_signature] = submission
+            self._condition.notify_all()
+
+    def _reject(self, submissions: List[_Submission], error: Exception):
+        """
+        Puts the submissions back at the front of the queue and pauses
+        sending. Must be called with the condition held.
+        """
+        self.rejections += 1
+        self._consecutive_rejections += 1
+        self.controller.on_congestion(min(submission.sequence for submission in submissions))
+
+        delay = min(self.max_retry_delay, self.retry_delay * 2 ** (self._consecutive_rejections - 1))
+        self._paused_until = time.monotonic() + delay * random.uniform(0.5, 1.0)
+
+        for submission in reversed(submissions):
+            if self.max_retries is not None and submission.attempts > self.max_retries:
+                submission.future.set_exception(error)
+            else:
+                self._queue.appendleft(submission)
+
+    def _status_loop(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._done() or self._in_flight)
+                if self._done():
+                    return
+                batch_ids = list(self._in_flight)
+
+            try:
+                statuses = self.ledger.get_batch_statuses(batch_ids, wait=self.poll_wait)
+            except Exception:
+                logging.exception('Failed to get status of submitted batches')
+                time.sleep(self.retry_delay)
+                continue
+
+            now = time.monotonic()
+            resolved = []
+
+            with self._condition:
+                for status in statuses:
+                    submission = self._in_flight.get(status.id)
+                    if submission is None:
+                        continue
+
+                    if status.status in (BatchStatus.COMMITTED, BatchStatus.INVALID):
+                        del self._in_flight[status.id]
+                        resolved.append((submission, status))
+
+                        # Invalid batches are rejected early, so they say nothing about capacity
+                        if status.status == BatchStatus.COMMITTED:
+                            self.controller.on_commit(submission.sequence, now - submission.sent_at)
+
+                    elif status.status == BatchStatus.UNKNOWN and now - submission.sent_at > self.unknown_timeout:
+                        del self._in_flight[status.id]
+                        self._reject([submission], LedgerException('Batch was dropped by the ledger'))
+
+                self._condition.notify_all()
+
+            for submission, status in resolved:
+                submission.future.set_result(status)
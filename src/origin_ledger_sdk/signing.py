@@ -0,0 +1,181 @@
+import os
+
+from copy import copy
+from typing import List, Dict, Tuple
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from sawtooth_sdk.protobuf.transaction_pb2 import Transaction
+
+from .requests import AbstractRequest
+from .requests.helpers import get_signer
+
+
+def _sign_requests(signer_private_key: bytes, requests: List[AbstractRequest]) -> List[List[bytes]]:
+    signer = get_signer(signer_private_key)
+    return [[t.SerializeToString() for t in r.get_signed_transactions(signer)] for r in requests]
+
+
+class _SignedDependency(object):
+    """
+    Stands in for a dependency which has already been signed, so only
+    its header signature is sent to the worker processes.
+    """
+
+    def __init__(self, header_signature: str):
+        self.header_signature = header_signature
+
+    def get_header_signature(self) -> str:
+        return self.header_signature
+
+
+class ParallelSigner(object):
+    """
+    Signs the transactions of a batch across a pool of processes.
+
+    Requests are split into contiguous chunks of about the same number of
+    transactions and signed in the worker processes, which return the
+    serialized transactions of each request. Requests with many
+    transactions, ie. a MeasurementBatch, are split across chunks. The
+    transactions are memoized on the requests, like when signing serially.
+    As secp256k1 signatures are deterministic, the result is identical to
+    signing serially.
+
+    A chunk is only sent to a worker once the chunks signing the requests
+    it depends on are done, and only the header signatures of those
+    requests are sent along with it.
+
+    :param int max_workers: The number of worker processes, defaults to the number of CPUs.
+    :param int threshold: Batches with fewer transactions than this are signed serially.
+    :param int chunk_size: The number of transactions sent to a worker at a time.
+    """
+
+    def __init__(self, max_workers=None, threshold=500, chunk_size=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.threshold = threshold
+        self.chunk_size = chunk_size
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def _split(self, parts: List[Tuple[AbstractRequest, AbstractRequest]],
+               chunk_size: int) -> List[List[Tuple[AbstractRequest, AbstractRequest]]]:
+        chunks = [[]]
+        transactions = 0
+
+        for request, part in parts:
+            if transactions >= chunk_size:
+                chunks.append([])
+                transactions = 0
+            chunks[-1].append((request, part))
+            transactions += part.get_transaction_count()
+
+        return chunks
+
+    def _detach(self, chunk: List[Tuple[AbstractRequest, AbstractRequest]],
+                signatures: Dict[int, str]) -> List[AbstractRequest]:
+        """
+        Returns copies of the parts of a chunk to send to a worker, where
+        the dependencies which are not signed in the chunk itself are
+        replaced by their header signatures.
+        """
+        detached = []
+        signed_in_chunk = {}
+
+        for request, part in chunk:
+            dependencies = []
+            for dependency in request.dependencies:
+                if id(dependency) in signed_in_chunk:
+                    dependencies.append(signed_in_chunk[id(dependency)])
+                elif id(dependency) in signatures:
+                    dependencies.append(_SignedDependency(signatures[id(dependency)]))
+                else:
+                    dependencies.append(_SignedDependency(dependency.get_header_signature()))
+
+            clone = copy(part)
+            clone.__dict__.pop('_signed_transactions', None)
+            clone.__dict__.pop('_header_signature', None)
+            clone.__dict__['_dependencies'] = dependencies
+
+            detached.append(clone)
+            signed_in_chunk[id(request)] = clone
+
+        return detached
+
+    def _sign_chunks(self, signer_private_key: bytes,
+                     chunks: List[List[Tuple[AbstractRequest, AbstractRequest]]]) -> Dict[int, List[Transaction]]:
+        """
+        Signs the chunks in the worker processes, and returns the
+        transactions of each part, by its id.
+        """
+        last_part = {id(request): part for chunk in chunks for request, part in chunk}
+        chunk_of = {id(part): i for i, chunk in enumerate(chunks) for _, part in chunk}
+
+        # The chunks signing the requests each chunk depends on
+        waiting_for = [
+            set(chunk_of[id(last_part[id(d)])] for request, _ in chunk for d in request.dependencies
+                if id(d) in last_part) - {i}
+            for i, chunk in enumerate(chunks)
+        ]
+
+        executor = self._get_executor()
+        remaining = list(range(len(chunks)))
+        done_chunks = set()
+        pending = {}
+        signatures = {}
+        transactions = {}
+
+        while remaining or pending:
+            for i in [i for i in remaining if waiting_for[i] <= done_chunks]:
+                remaining.remove(i)
+                future = executor.submit(_sign_requests, signer_private_key, self._detach(chunks[i], signatures))
+                pending[future] = i
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                i = pending.pop(future)
+
+                for (request, part), part_transactions in zip(chunks[i], future.result()):
+                    part_transactions = [Transaction.FromString(t) for t in part_transactions]
+                    transactions[id(part)] = part_transactions
+
+                    if part is last_part[id(request)] and part_transactions:
+                        signatures[id(request)] = part_transactions[-1].header_signature
+
+                done_chunks.add(i)
+
+        return transactions
+
+    def sign(self, signer_private_key: bytes, requests: List[AbstractRequest]) -> List[Transaction]:
+        signer = get_signer(signer_private_key)
+        count = sum(r.get_transaction_count() for r in requests)
+
+        if count < self.threshold:
+            return [t for r in requests for t in r.get_signed_transactions(signer)]
+
+        chunk_size = self.chunk_size or max(1, -(-count // (self.max_workers * 4)))
+        parts = {id(r): r._get_signing_parts(chunk_size) for r in requests}
+        chunks = self._split([(r, part) for r in requests for part in parts[id(r)]], chunk_size)
+
+        signed = self._sign_chunks(signer_private_key, chunks)
+        transactions = []
+
+        for request in requests:
+            request_transactions = [t for part in parts[id(request)] for t in signed[id(part)]]
+            request._set_signed_transactions(signer, request_transactions)
+            transactions.extend(request_transactions)
+
+        return transactions
@@ -0,0 +1,325 @@
+import os
+import mmap
+import struct
+import threading
+
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import List, Dict, Tuple, Iterable, Callable
+from sawtooth_sdk.protobuf.batch_pb2 import Batch as SignedBatch
+
+from .batch import Batch
+from .streaming import BatchListEncoder, _BATCH_LIST_BATCHES, _field
+
+
+class SpoolError(Exception):
+    pass
+
+
+_MAGIC = b'OLSS\x00\x00\x00\x01'
+
+# The segment number and offset of the first batch not yet sent
+_CURSOR = struct.Struct('<QQ')
+_CURSOR_FILE = 'cursor'
+
+_SEGMENT_SUFFIX = '.segment'
+
+
+def _read_varint(buffer, offset: int) -> Tuple[int, int]:
+    """
+    Returns the varint at offset, and the offset after it.
+    Raises IndexError if the buffer ends before the varint does.
+    """
+    value = 0
+    shift = 0
+    while True:
+        byte = buffer[offset]
+        offset += 1
+        value |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return value, offset
+        shift += 7
+
+
+def _batch_id(buffer, offset: int) -> str:
+    """
+    Returns the header_signature of the batch at offset, which is the
+    second field of a serialized Batch, after the header.
+    """
+    _, offset = _read_varint(buffer, offset + 1)
+    header_length, offset = _read_varint(buffer, offset + 1)
+    signature_length, offset = _read_varint(buffer, offset + header_length + 1)
+    return bytes(buffer[offset:offset + signature_length]).decode()
+
+
+class BatchSpool(object):
+    """
+    A directory of batches signed ahead of time, ie. while the CPU is idle,
+    to be sent to the ledger later with Ledger.send_spooled().
+
+    Batches are appended to segment files, each a magic number followed by
+    the batches as serialized BatchList fields. Any run of consecutive
+    batches in a segment is therefore itself a serialized BatchList, and is
+    sent straight from the memory-mapped segment without being copied.
+
+    A new segment is started once a segment exceeds segment_size. Segments
+    are deleted once all of their batches have been sent, and the position
+    of the first batch not yet sent is kept in a cursor file. Batches sent
+    right before a crash may be sent again, which the ledger ignores.
+
+    A batch torn by a crash while it was written is discarded when the
+    spool is opened.
+
+    :param str directory: The directory of the spool, created if it does not exist.
+    :param int segment_size: The size in bytes from which a new segment is started.
+    """
+
+    def __init__(self, directory: str, segment_size=64 * 1024 * 1024):
+        self.directory = directory
+        self.segment_size = segment_size
+        self._segments: Dict[int, array] = OrderedDict()
+        self._cursor = (0, len(_MAGIC))
+        self._lock = threading.Lock()
+        self._drain_lock = threading.Lock()
+        self._file = None
+        self._number = None
+
+        os.makedirs(directory, exist_ok=True)
+        self._open()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        """
+        Returns the number of batches not yet sent.
+        """
+        number, offset = self._cursor
+        return sum(
+            len(offsets) - (bisect_left(offsets, offset) if n == number else 0)
+            for n, offsets in self._segments.items()
+        )
+
+    def _path(self, number: int) -> str:
+        return os.path.join(self.directory, f'{number:010d}{_SEGMENT_SUFFIX}')
+
+    def _open(self):
+        cursor_path = os.path.join(self.directory, _CURSOR_FILE)
+        if os.path.exists(cursor_path):
+            with open(cursor_path, 'rb') as f:
+                self._cursor = _CURSOR.unpack(f.read())
+
+        numbers = sorted(
+            int(name[:-len(_SEGMENT_SUFFIX)])
+            for name in os.listdir(self.directory)
+            if name.endswith(_SEGMENT_SUFFIX)
+        )
+
+        for number in numbers:
+            if number < self._cursor[0]:
+                # Sent, but not deleted before a crash
+                os.remove(self._path(number))
+            else:
+                self._segments[number] = self._load(number)
+
+        if self._segments and self._cursor[0] < next(iter(self._segments)):
+            self._cursor = (next(iter(self._segments)), len(_MAGIC))
+
+    def _load(self, number: int) -> array:
+        """
+        Returns the offsets of the batches in the segment, and truncates
+        the segment after the last complete batch.
+        """
+        path = self._path(number)
+        offsets = array('q')
+
+        with open(path, 'r+b') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < len(_MAGIC):
+                f.truncate(0)
+                f.write(_MAGIC)
+                return offsets
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if mm[:len(_MAGIC)] != _MAGIC:
+                    raise SpoolError(f'{path} is not a batch spool segment')
+
+                offset = len(_MAGIC)
+                while offset < size:
+                    try:
+                        length, data = _read_varint(mm, offset + 1)
+                    except IndexError:
+                        break
+                    if mm[offset] != _BATCH_LIST_BATCHES[0] or data + length > size:
+                        break
+                    offsets.append(offset)
+                    offset = data + length
+
+            f.truncate(offset)
+
+        return offsets
+
+    def _writable_segment(self):
+        """
+        Returns the segment file to append to, starting a new segment
+        if there is none or the current one is full.
+        Must be called with the lock held.
+        """
+        if self._file is not None and self._file.tell() >= self.segment_size:
+            self._close_segment()
+
+        if self._file is None:
+            self._number = max(self._segments, default=self._cursor[0]) + 1
+            self._file = open(self._path(self._number), 'wb')
+            self._file.write(_MAGIC)
+            self._segments[self._number] = array('q')
+
+        return self._file
+
+    def _close_segment(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+
+    def add(self, batches: Iterable[Batch]) -> List[str]:
+        """
+        Signs the batches and writes them to the spool, and waits for
+        them to be on disk before returning their ids.
+        """
+        encoder = BatchListEncoder()
+        batch_ids = []
+
+        with self._lock:
+            for batch in batches:
+                file = self._writable_segment()
+                offset = file.tell()
+                batch_ids.extend(encoder.write([batch], file))
+                self._segments[self._number].append(offset)
+
+            self._sync()
+
+        return batch_ids
+
+    def add_signed(self, batches: Iterable[SignedBatch]) -> List[str]:
+        """
+        Writes batches which are already signed, ie. by a ParallelSigner,
+        to the spool, and waits for them to be on disk before returning.
+        """
+        batch_ids = []
+
+        with self._lock:
+            for batch in batches:
+                file = self._writable_segment()
+                offset = file.tell()
+                file.write(_field(_BATCH_LIST_BATCHES, batch.SerializeToString()))
+                self._segments[self._number].append(offset)
+                batch_ids.append(batch.header_signature)
+
+            self._sync()
+
+        return batch_ids
+
+    def _sync(self):
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def drain(self, send: Callable[[memoryview, List[str]], str], max_batches=20,
+              max_bytes=8 * 1024 * 1024) -> List[str]:
+        """
+        Sends the batches not yet sent, in order, and returns the handle
+        of each request. Use Ledger.send_spooled() rather than this.
+
+        Runs of at most max_batches batches and max_bytes bytes are passed
+        to send as a memoryview of the memory-mapped segment, along with
+        the ids of the batches. A batch larger than max_bytes is sent alone.
+        If send raises, the batches of that run and after stay in the spool.
+
+        Batches may be added while the spool is drained, as the lock is
+        only held to take the batches to send and to move the cursor.
+        Batches added meanwhile are sent by the next drain.
+
+        :param send: Sends a serialized BatchList and returns its handle.
+        :param int max_batches: The maximum number of batches sent in one request.
+        :param int max_bytes: The maximum size of the batches sent in one request.
+        """
+        handles = []
+
+        with self._drain_lock:
+            with self._lock:
+                if self._file is not None:
+                    self._file.flush()
+
+                cursor = self._cursor
+                writing = self._number
+                size = self._file.tell() if self._file is not None else None
+                segments = [(number, array('q', offsets)) for number, offsets in self._segments.items()]
+
+            for number, offsets in segments:
+                first = bisect_left(offsets, cursor[1]) if number == cursor[0] else 0
+
+                if first < len(offsets):
+                    handles.extend(self._drain_segment(
+                        number, offsets, first, size if number == writing else None,
+                        send, max_batches, max_bytes))
+
+                if number == writing:
+                    # Still being written to, so kept
+                    break
+
+                with self._lock:
+                    del self._segments[number]
+                    self._set_cursor(number + 1, len(_MAGIC))
+                os.remove(self._path(number))
+
+        return handles
+
+    def _drain_segment(self, number, offsets, first, size, send, max_batches, max_bytes) -> List[str]:
+        """
+        Sends the batches of the segment from first on. Only the first
+        size bytes are sent of a segment which is still written to.
+        """
+        handles = []
+
+        with open(self._path(number), 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as buffer:
+                ends = offsets[1:] + array('q', [len(mm) if size is None else size])
+                i = first
+
+                while i < len(offsets):
+                    j = i + 1
+                    while j < len(offsets) and j - i < max_batches and ends[j] - offsets[i] <= max_bytes:
+                        j += 1
+
+                    batch_ids = [_batch_id(buffer, offset) for offset in offsets[i:j]]
+
+                    with buffer[offsets[i]:ends[j - 1]] as batch_list:
+                        handles.append(send(batch_list, batch_ids))
+
+                    with self._lock:
+                        self._set_cursor(number, ends[j - 1])
+                    i = j
+
+        return handles
+
+    def _set_cursor(self, number: int, offset: int):
+        """
+        Moves the cursor, replacing the cursor file so it is never torn.
+        It is not synced to disk, as losing it only means batches are
+        sent again.
+        """
+        path = os.path.join(self.directory, _CURSOR_FILE)
+        with open(f'{path}.tmp', 'wb') as f:
+            f.write(_CURSOR.pack(number, offset))
+        os.replace(f'{path}.tmp', path)
+        self._cursor = (number, offset)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._close_segment()
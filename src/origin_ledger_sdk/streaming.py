@@ -0,0 +1,98 @@
+import tempfile
+
+from typing import List, Iterable, Iterator, BinaryIO
+from sawtooth_sdk.protobuf.batch_pb2 import BatchHeader
+
+from .batch import Batch
+from .requests.helpers import get_signer, get_public_key_hex
+from .instrumentation import span, observe
+
+
+# Tags of the length-delimited fields, ie. (field number << 3) | 2
+_BATCH_LIST_BATCHES = b'\x0a'
+_BATCH_HEADER = b'\x0a'
+_BATCH_HEADER_SIGNATURE = b'\x12'
+_BATCH_TRANSACTIONS = b'\x1a'
+
+
+def _varint(value: int) -> bytes:
+    encoded = bytearray()
+    while value > 0x7f:
+        encoded.append((value & 0x7f) | 0x80)
+        value >>= 7
+    encoded.append(value)
+    return bytes(encoded)
+
+
+def _field(tag: bytes, value: bytes) -> bytes:
+    return tag + _varint(len(value)) + value
+
+
+class BatchListEncoder(object):
+    """
+    Encodes batches as a serialized BatchList, a piece at a time, instead
+    of building every Transaction, Batch and the BatchList in memory before
+    serializing it. The bytes are identical to BatchList.SerializeToString().
+
+    Transactions are signed one request at a time, and serialized to a
+    spool which is kept in memory until it exceeds spool_size, and moved to
+    a temporary file after that. The length of a batch must be written
+    before it, so a batch is only yielded once all of its transactions
+    have been signed.
+
+    :param int chunk_size: The maximum number of bytes yielded at a time.
+    :param int spool_size: The number of bytes of transactions of a batch
+        kept in memory before they are moved to a temporary file.
+    """
+
+    def __init__(self, chunk_size=64 * 1024, spool_size=4 * 1024 * 1024):
+        self.chunk_size = chunk_size
+        self.spool_size = spool_size
+
+    def encode(self, batches: Iterable[Batch]) -> Iterator[bytes]:
+        """
+        Yields the serialized BatchList of the batches in chunks,
+        ie. to send as the body of a chunked HTTP request.
+        """
+        return self._encode(batches, [])
+
+    def write(self, batches: Iterable[Batch], file: BinaryIO) -> List[str]:
+        """
+        Writes the serialized BatchList of the batches to a file,
+        and returns the ids of the batches.
+        """
+        batch_ids = []
+        for chunk in self._encode(batches, batch_ids):
+            file.write(chunk)
+        return batch_ids
+
+    def _encode(self, batches: Iterable[Batch], batch_ids: List[str]) -> Iterator[bytes]:
+        for batch in batches:
+            with tempfile.SpooledTemporaryFile(max_size=self.spool_size) as spool:
+                signer = get_signer(batch._signer_private_key)
+                transaction_ids = []
+
+                for transaction in batch.iter_signed_transactions(signer):
+                    spool.write(_field(_BATCH_TRANSACTIONS, transaction.SerializeToString()))
+                    transaction_ids.append(transaction.header_signature)
+
+                observe('batch_transactions', len(transaction_ids))
+
+                with span('batch_sign_seconds'):
+                    header_bytes = BatchHeader(
+                        signer_public_key=get_public_key_hex(signer),
+                        transaction_ids=transaction_ids,
+                    ).SerializeToString()
+                    signature = signer.sign(header_bytes)
+
+                head = _field(_BATCH_HEADER, header_bytes) + _field(_BATCH_HEADER_SIGNATURE, signature.encode())
+                batch_ids.append(signature)
+
+                # The header holds the id of every transaction, so it is chunked too
+                head = _BATCH_LIST_BATCHES + _varint(len(head) + spool.tell()) + head
+                for i in range(0, len(head), self.chunk_size):
+                    yield head[i:i + self.chunk_size]
+
+                spool.seek(0)
+                for chunk in iter(lambda: spool.read(self.chunk_size), b''):
+                    yield chunk
@@ -0,0 +1,113 @@
+from typing import List, Iterable, Iterator
+from dataclasses import dataclass, field
+from sawtooth_sdk.protobuf.batch_pb2 import Batch as SignedBatch
+from sawtooth_sdk.protobuf.transaction_pb2 import Transaction
+
+from .batch import sign_batch
+from .requests import AbstractRequest
+from .requests.helpers import get_signer
+from .ledger_connector import Ledger, get_batch_ids
+
+
+@dataclass
+class SubmittedBatch:
+    batch_id: str = field()
+    link: str = field()
+    transaction_count: int = field()
+
+
+class BatchSubmitter(object):
+    """
+    Packs a stream of requests into batches, and batches into BatchLists,
+    bounded by transaction count and serialized size.
+
+    The transactions of a single request are always kept in the same batch.
+
+    BEWARE - every batch is signed with the same key, so anyone can see
+    that all the requests were submitted by the same entity.
+
+    :param Ledger ledger: The ledger to submit the batches to.
+    :param bytes signer_private_key: The private key to sign the batches with.
+    :param int max_batch_transactions: The maximum number of transactions in a batch.
+    :param int max_batch_bytes: The maximum serialized size of the transactions in a batch.
+    :param int max_list_batches: The maximum number of batches sent in one request.
+    :param int max_list_bytes: The maximum serialized size of the batches sent in one request.
+    """
+
+    def __init__(self, ledger: Ledger, signer_private_key: bytes,
+                 max_batch_transactions=100, max_batch_bytes=1024 * 1024,
+                 max_list_batches=20, max_list_bytes=8 * 1024 * 1024):
+        self.ledger = ledger
+        self.max_batch_transactions = max_batch_transactions
+        self.max_batch_bytes = max_batch_bytes
+        self.max_list_batches = max_list_batches
+        self.max_list_bytes = max_list_bytes
+        self._signer = get_signer(signer_private_key)
+
+    def submit(self, requests: Iterable[AbstractRequest]) -> Iterator[SubmittedBatch]:
+        """
+        Signs and submits the requests, yielding a SubmittedBatch for each
+        batch as soon as it has been accepted by the ledger.
+        """
+        for batches in self._pack_lists(self._pack_batches(requests)):
+            yield from self._send(batches)
+
+    def _pack_batches(self, requests: Iterable[AbstractRequest]) -> Iterator[SignedBatch]:
+        transactions: List[Transaction] = []
+        transactions_bytes = 0
+
+        for request in requests:
+            request_transactions = request.get_signed_transactions(self._signer)
+            request_bytes = sum(t.ByteSize() for t in request_transactions)
+
+            if len(request_transactions) > self.max_batch_transactions or request_bytes > self.max_batch_bytes:
+                raise ValueError(f'{type(request).__name__} does not fit within a single batch')
+
+            if len(transactions) + len(request_transactions) > self.max_batch_transactions \
+                    or transactions_bytes + request_bytes > self.max_batch_bytes:
+                yield sign_batch(self._signer, transactions)
+                transactions, transactions_bytes = [], 0
+
+            transactions.extend(request_transactions)
+            transactions_bytes += request_bytes
+
+        if transactions:
+            yield sign_batch(self._signer, transactions)
+
+    def _pack_lists(self, batches: Iterable[SignedBatch]) -> Iterator[List[SignedBatch]]:
+        batch_list: List[SignedBatch] = []
+        batch_list_bytes = 0
+
+        for batch in batches:
+            batch_bytes = batch.ByteSize()
+
+            if batch_list and (len(batch_list) + 1 > self.max_list_batches
+                               or batch_list_bytes + batch_bytes > self.max_list_bytes):
+                yield batch_list
+                batch_list, batch_list_bytes = [], 0
+
+            batch_list.append(batch)
+            batch_list_bytes += batch_bytes
+
+        if batch_list:
+            yield batch_list
+
+    def _send(self, batches: List[SignedBatch]) -> Iterator[SubmittedBatch]:
+        handle = self.ledger._send_batches(batches)
+
+        for batch, batch_id in zip(batches, get_batch_ids(handle)):
+            yield SubmittedBatch(
+                batch_id=batch.header_signature,
+                link=_get_batch_link(handle, batch_id),
+                transaction_count=len(batch.transactions),
+            )
+
+
+def _get_batch_link(handle: str, batch_id: str) -> str:
+    """
+    Returns the link to a single batch of a handle returned for several batches.
+    """
+    if '?' not in handle:
+        return batch_id
+
+    return f'{handle.split("?", 1)[0]}?id={batch_id}'
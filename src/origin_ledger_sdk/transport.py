@@ -0,0 +1,119 @@
+import weakref
+import threading
+import requests
+
+from types import GeneratorType
+from dataclasses import dataclass, field
+from requests.adapters import HTTPAdapter
+
+from .instrumentation import enabled, increment
+
+
+@dataclass
+class ConnectionStats:
+    requests: int = field(default=0)
+    connections: int = field(default=0)
+
+    @property
+    def reused(self) -> int:
+        return max(0, self.requests - self.connections)
+
+
+def _count_sent_bytes(chunks):
+    for chunk in chunks:
+        increment('ledger_sent_bytes_total', len(chunk))
+        yield chunk
+
+
+class HttpTransport(object):
+    """
+    Keep-alive HTTP transport backed by a single connection pool.
+
+    Each thread gets its own requests.Session, but all sessions share the
+    same HTTPAdapter and therefore the same pool of open connections.
+    The session of a thread is dropped when the thread ends.
+
+    :param bool verify: Whether to verify the servers TLS certificate.
+    :param int pool_connections: The number of hosts to keep connection pools for.
+    :param int pool_maxsize: The maximum number of connections to keep open per host.
+    :param bool pool_block: Whether to block when all connections to a host are in use.
+    :param float connect_timeout: Seconds to wait for a connection to be established.
+    :param float read_timeout: Seconds to wait for the server to send a response.
+    """
+
+    def __init__(self, verify=True, pool_connections=10, pool_maxsize=10,
+                 pool_block=False, connect_timeout=10, read_timeout=60):
+        self.verify = verify
+        self.timeout = (connect_timeout, read_timeout)
+        self._adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        )
+        self._local = threading.local()
+        self._sessions = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._requests = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _get_session(self) -> requests.Session:
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.mount('http://', self._adapter)
+            session.mount('https://', self._adapter)
+            session.verify = self.verify
+            self._local.session = session
+            with self._lock:
+                self._sessions.add(session)
+        return session
+
+    def request(self, method, url, **kwargs) -> requests.Response:
+        kwargs.setdefault('timeout', self.timeout)
+
+        data = kwargs.get('data') or b''
+        if enabled() and isinstance(data, GeneratorType):
+            # A body streamed in chunks is counted as it is sent
+            kwargs['data'] = _count_sent_bytes(data)
+
+        try:
+            response = self._get_session().request(method, url, **kwargs)
+        except requests.RequestException:
+            increment('ledger_errors_total', code='connection')
+            raise
+
+        with self._lock:
+            self._requests += 1
+
+        if enabled():
+            if isinstance(data, (bytes, str, memoryview)):
+                increment('ledger_sent_bytes_total', len(data.encode() if isinstance(data, str) else data))
+            increment('ledger_received_bytes_total', len(response.content))
+
+        return response
+
+    def get(self, url, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def stats(self) -> ConnectionStats:
+        pools = self._adapter.poolmanager.pools
+        connections = sum(pools[key].num_connections for key in pools.keys())
+
+        with self._lock:
+            return ConnectionStats(requests=self._requests, connections=connections)
+
+    def close(self):
+        with self._lock:
+            sessions, self._sessions = list(self._sessions), weakref.WeakSet()
+        for session in sessions:
+            session.close()
+        self._adapter.close()
+        self._local = threading.local()
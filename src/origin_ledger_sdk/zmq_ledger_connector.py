@@ -0,0 +1,357 @@
+import uuid
+import logging
+import threading
+import zmq
+
+from typing import List, Dict, Tuple, Callable, Iterator
+from collections import defaultdict
+from concurrent.futures import Future, TimeoutError
+from sawtooth_sdk.protobuf.validator_pb2 import Message
+from sawtooth_sdk.protobuf.batch_pb2 import BatchList
+from sawtooth_sdk.protobuf.block_pb2 import BlockHeader
+from sawtooth_sdk.protobuf.client_block_pb2 import (
+    ClientBlockGetByIdRequest,
+    ClientBlockGetResponse,
+    ClientBlockListRequest,
+    ClientBlockListResponse,
+)
+from sawtooth_sdk.protobuf.client_list_control_pb2 import ClientPagingControls
+from sawtooth_sdk.protobuf.client_batch_submit_pb2 import (
+    ClientBatchSubmitResponse,
+    ClientBatchStatusRequest,
+    ClientBatchStatusResponse,
+    ClientBatchStatus,
+)
+from sawtooth_sdk.protobuf.client_state_pb2 import (
+    ClientStateGetRequest,
+    ClientStateGetResponse,
+    ClientStateListRequest,
+    ClientStateListResponse,
+)
+
+from .batch import BatchStatus
+from .cache import StateCache
+from .instrumentation import increment
+from .ledger_connector import (
+    Ledger,
+    LedgerException,
+    LedgerConnectionError,
+    BatchStatusResponse,
+    InvalidTransaction,
+    get_batch_ids,
+)
+
+
+# The error codes the REST API uses for the same errors
+_error_codes = {
+    'INVALID_BATCH': 30,
+    'QUEUE_FULL': 31,
+    'INVALID_ADDRESS': 62,
+    'NO_RESOURCE': 75,
+}
+
+
+class ValidatorConnection(object):
+    """
+    Connection to a validators client endpoint, multiplexing requests
+    from any number of threads over a single ZMQ socket.
+
+    Responses are matched to requests by correlation id. Messages which
+    are not responses are passed to the listeners of their message type.
+
+    :param str url: The url of the validator, ie. 'tcp://localhost:4004'.
+    :param float timeout: Seconds to wait for a response.
+    """
+
+    def __init__(self, url, timeout=30):
+        self.url = url
+        self.timeout = timeout
+        self._futures: Dict[str, Future] = {}
+        self._listeners = defaultdict(list)
+        self._lock = threading.Lock()
+
+        self._context = zmq.Context()
+        self._socket = self._context.socket(zmq.DEALER)
+        self._socket.connect(url)
+
+        # Other threads hand messages to the I/O thread through an inproc
+        # socket, as the ZMQ socket may only be used by a single thread.
+        inproc_url = f'inproc://validator-connection-{uuid.uuid4().hex}'
+        self._outbox = self._context.socket(zmq.PULL)
+        self._outbox.bind(inproc_url)
+        self._inbox = self._context.socket(zmq.PUSH)
+        self._inbox.connect(inproc_url)
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def add_listener(self, message_type, callback):
+        self._listeners[message_type].append(callback)
+
+    def remove_listener(self, message_type, callback):
+        self._listeners[message_type].remove(callback)
+
+    def send(self, message_type, content: bytes) -> Future:
+        correlation_id = uuid.uuid4().hex
+        message = Message(message_type=message_type, correlation_id=correlation_id, content=content)
+        future = Future()
+        future.correlation_id = correlation_id
+
+        with self._lock:
+            if self._inbox is None:
+                raise LedgerConnectionError('Connection to validator is closed')
+            self._futures[correlation_id] = future
+            self._inbox.send(message.SerializeToString())
+
+        return future
+
+    def request(self, message_type, request, response_class, timeout=None):
+        """
+        Sends a request and waits for its response.
+
+        :param message_type: The Message type of the request.
+        :param request: The request message, or its serialized bytes.
+        :param response_class: The message class to parse the response as.
+        :param float timeout: Seconds to wait, defaults to the connections timeout.
+        """
+        if not isinstance(request, bytes):
+            request = request.SerializeToString()
+
+        future = self.send(message_type, request)
+
+        try:
+            message = future.result(timeout or self.timeout)
+        except TimeoutError:
+            with self._lock:
+                self._futures.pop(future.correlation_id, None)
+            raise LedgerConnectionError(f'Timed out waiting for response from validator at {self.url}')
+
+        return response_class.FromString(message.content)
+
+    def close(self):
+        with self._lock:
+            if self._inbox is None:
+                return
+            self._inbox.send(b'')
+            self._inbox.close(linger=0)
+            self._inbox = None
+
+        self._thread.join()
+        self._context.term()
+
+    def _run(self):
+        poller = zmq.Poller()
+        poller.register(self._socket, zmq.POLLIN)
+        poller.register(self._outbox, zmq.POLLIN)
+
+        while True:
+            events = dict(poller.poll())
+
+            if self._outbox in events:
+                frame = self._outbox.recv()
+                if not frame:
+                    break
+                self._socket.send(frame)
+
+            if self._socket in events:
+                message = Message.FromString(self._socket.recv())
+
+                with self._lock:
+                    future = self._futures.pop(message.correlation_id, None)
+
+                if future is not None:
+                    future.set_result(message)
+                else:
+                    for listener in self._listeners[message.message_type]:
+                        try:
+                            listener(message)
+                        except Exception:
+                            logging.exception('Listener failed to handle message from validator')
+
+        self._socket.close(linger=0)
+        self._outbox.close(linger=0)
+
+        with self._lock:
+            futures, self._futures = self._futures, {}
+        for future in futures.values():
+            future.set_exception(LedgerConnectionError('Connection to validator is closed'))
+
+
+def _raise_for_status(response, action):
+    status = type(response).Status.Name(response.status)
+    if status != 'OK':
+        increment('ledger_errors_total', code=str(_error_codes.get(status, status)))
+        raise LedgerException(f'Failed to {action}: {status}', _error_codes.get(status))
+
+
+class ZmqLedger(Ledger):
+    """
+    Ledger which talks directly to a validator over ZMQ instead of
+    through the REST API, avoiding the extra hop and the JSON and
+    base64 encoding of every response.
+
+    Handles returned by execute_batch are shaped like those of the
+    REST API, so get_batch_status and wait_for_batches accept them.
+
+    A ZMQ message is sent whole, so stream_batches joins the streamed
+    BatchList in memory before sending it.
+
+    :param str url: The url of the validator, ie. 'tcp://localhost:4004'.
+    :param float timeout: Seconds to wait for a response.
+    :param int max_workers: The number of concurrent requests made by bulk reads.
+    :param int prefix_length: The address prefix length bulk reads group addresses by.
+    :param int list_threshold: The number of addresses sharing a prefix from which
+        bulk reads list the whole prefix instead of reading each address.
+    :param StateCache cache: Optional cache for objects read from the ledger.
+    :param bool strict: Whether to validate objects with marshmallow,
+        instead of decoding them straight into objects.
+    """
+
+    def __init__(self, url, timeout=30, max_workers=8, prefix_length=8,
+                 list_threshold=256, cache: StateCache = None, strict=False):
+        super(ZmqLedger, self).__init__(
+            url,
+            max_workers=max_workers,
+            prefix_length=prefix_length,
+            list_threshold=list_threshold,
+            cache=cache,
+            strict=strict,
+        )
+        self.connection = ValidatorConnection(url, timeout)
+        self._state_roots = {}
+
+    def _create_transport(self, **options):
+        return None
+
+    def close(self):
+        self.connection.close()
+        super(ZmqLedger, self).close()
+
+    def get_head_block_num(self) -> int:
+        response = self.connection.request(
+            Message.CLIENT_BLOCK_LIST_REQUEST,
+            ClientBlockListRequest(paging=ClientPagingControls(limit=1)),
+            ClientBlockListResponse,
+        )
+
+        _raise_for_status(response, 'list blocks')
+
+        return BlockHeader.FromString(response.blocks[0].header).block_num
+
+    def get_batch_status(self, link: str) -> BatchStatusResponse:
+        return self.get_batch_statuses(get_batch_ids(link))[0]
+
+    def _get_batch_statuses(self, batch_ids: List[str], wait: int = None) -> List[BatchStatusResponse]:
+        response = self.connection.request(
+            Message.CLIENT_BATCH_STATUS_REQUEST,
+            ClientBatchStatusRequest(batch_ids=batch_ids, wait=bool(wait), timeout=wait or 0),
+            ClientBatchStatusResponse,
+            timeout=self.connection.timeout + (wait or 0),
+        )
+
+        _raise_for_status(response, 'get batch status')
+
+        return [
+            BatchStatusResponse(
+                id=batch_status.batch_id,
+                status=BatchStatus[ClientBatchStatus.Status.Name(batch_status.status)],
+                invalid_transactions=[
+                    InvalidTransaction(id=t.transaction_id, message=t.message)
+                    for t in batch_status.invalid_transactions
+                ],
+            )
+            for batch_status in response.batch_statuses
+        ]
+
+    def _send_batch_list(self, batch_list_bytes: bytes, batch_ids: List[str]) -> str:
+        # A serialized BatchList is also a valid ClientBatchSubmitRequest,
+        # as both consist of the batches as field number 1. Spooled
+        # batches are a memoryview, which the message must copy anyway.
+        response = self.connection.request(
+            Message.CLIENT_BATCH_SUBMIT_REQUEST,
+            bytes(batch_list_bytes),
+            ClientBatchSubmitResponse,
+        )
+
+        _raise_for_status(response, 'submit batches')
+
+        return f'{self.url}/batch_statuses?id={",".join(batch_ids)}'
+
+    def _send_batch_stream(self, encode: Callable[[], Iterator[bytes]]) -> str:
+        batch_list_bytes = b''.join(encode())
+        batch_ids = [batch.header_signature for batch in BatchList.FromString(batch_list_bytes).batches]
+
+        return self._send_batch_list(batch_list_bytes, batch_ids)
+
+    def _get_state_root(self, head: str) -> str:
+        """
+        Returns the state root of the block with id head, as the
+        validator reads state by state root rather than block id.
+        """
+        if head is None:
+            return ''
+
+        state_root = self._state_roots.get(head)
+        if state_root is None:
+            response = self.connection.request(
+                Message.CLIENT_BLOCK_GET_BY_ID_REQUEST,
+                ClientBlockGetByIdRequest(block_id=head),
+                ClientBlockGetResponse,
+            )
+
+            _raise_for_status(response, 'get block')
+
+            state_root = BlockHeader.FromString(response.block.header).state_root_hash
+            self._state_roots[head] = state_root
+
+        return state_root
+
+    def _read_state(self, address, head: str = None) -> Tuple[bytes, str]:
+        response = self.connection.request(
+            Message.CLIENT_STATE_GET_REQUEST,
+            ClientStateGetRequest(state_root=self._get_state_root(head), address=address),
+            ClientStateGetResponse,
+        )
+
+        _raise_for_status(response, 'get state')
+
+        # The state root is not a block id, so reads of the current
+        # state are not reported as read at a head
+        return response.value, head
+
+    def _list_state(self, prefix: str, head: str = None) -> Tuple[Dict[str, bytes], str]:
+        entries = {}
+        state_root = self._get_state_root(head)
+        start = ''
+
+        while True:
+            response = self.connection.request(
+                Message.CLIENT_STATE_LIST_REQUEST,
+                ClientStateListRequest(
+                    state_root=state_root,
+                    address=prefix,
+                    paging=ClientPagingControls(start=start),
+                ),
+                ClientStateListResponse,
+            )
+
+            if response.status == ClientStateListResponse.NO_RESOURCE:
+                break
+
+            _raise_for_status(response, 'list state')
+
+            for entry in response.entries:
+                entries[entry.address] = entry.data
+
+            state_root = response.state_root
+            start = response.paging.next
+            if not start:
+                break
+
+        return entries, head
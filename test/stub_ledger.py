@@ -0,0 +1,159 @@
+
+import json
+import time
+import base64
+import threading
+
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from sawtooth_sdk.protobuf.batch_pb2 import BatchList
+
+
+class StubLedger(object):
+    """
+    In-process stand-in for the Sawtooth REST API, serving state from a
+    dict and marking every submitted batch with a fixed status.
+
+    Submissions are answered with the (status, code) pairs in
+    batch_errors, one per request, until it is empty. A code of None
+    answers without an error of the REST API, like a proxy would.
+
+    Every response is delayed by latency seconds.
+
+    Request bodies may be sent with chunked transfer encoding.
+    """
+
+    def __init__(self):
+        self.state = {}
+        self.batch_status = 'COMMITTED'
+        self.batch_statuses = {}
+        self.batches = []
+        self.batch_errors = []
+        self.block_num = 1
+        self.latency = 0
+        self.requests = []
+        self.chunked_requests = 0
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                stub.requests.append(('GET', self.path))
+                stub.handle(self, 'GET', None)
+
+            def do_POST(self):
+                if self.headers.get('Transfer-Encoding') == 'chunked':
+                    body = self.read_chunked()
+                    stub.chunked_requests += 1
+                else:
+                    body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                stub.requests.append(('POST', self.path))
+                stub.handle(self, 'POST', body)
+
+            def read_chunked(self):
+                body = bytearray()
+                while True:
+                    size = int(self.rfile.readline().split(b';')[0], 16)
+                    body += self.rfile.read(size)
+                    self.rfile.readline()
+                    if size == 0:
+                        return bytes(body)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def put_state(self, address, body: bytes):
+        self.state[address] = base64.b64encode(body).decode()
+
+    def get_batch_status(self, batch_id):
+        status = self.batch_statuses.get(batch_id, self.batch_status)
+        if isinstance(status, list):
+            return status.pop(0) if len(status) > 1 else status[0]
+        return status
+
+    def handle(self, handler, method, body):
+        url = urlparse(handler.path)
+        query = parse_qs(url.query)
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        if url.path == '/batches' and method == 'POST' and self.batch_errors:
+            status, code = self.batch_errors.pop(0)
+            if code is None:
+                self.respond(handler, status, {'message': 'Service unavailable'})
+            else:
+                self.respond(handler, status, {'error': {'code': code, 'title': 'Error', 'message': f'Error {code}'}})
+
+        elif url.path == '/batches' and method == 'POST':
+            batch_ids = [b.header_signature for b in BatchList.FromString(body).batches]
+            self.batches.extend(batch_ids)
+            self.respond(handler, 202, {'link': f'{self.url}/batch_statuses?id={",".join(batch_ids)}'})
+
+        elif url.path == '/blocks':
+            self.respond(handler, 200, {
+                'data': [{'header': {'block_num': str(self.block_num)}, 'header_signature': f'block-{self.block_num}'}],
+                'head': f'block-{self.block_num}',
+                'link': handler.path,
+            })
+
+        elif url.path == '/batch_statuses':
+            if method == 'POST':
+                batch_ids = json.loads(body)
+            else:
+                batch_ids = query['id'][0].split(',')
+            self.respond(handler, 200, {
+                'data': [{'id': i, 'status': self.get_batch_status(i), 'invalid_transactions': []} for i in batch_ids],
+                'link': handler.path,
+            })
+
+        elif url.path == '/state':
+            prefix = query.get('address', [''])[0]
+            limit = int(query.get('limit', ['1000'])[0])
+            addresses = sorted(a for a in self.state if a.startswith(prefix))
+            if 'start' in query:
+                addresses = [a for a in addresses if a >= query['start'][0]]
+            paging = {'limit': limit, 'start': query.get('start', [None])[0]}
+            if len(addresses) > limit:
+                paging['next_position'] = addresses[limit]
+                paging['next'] = f'{self.url}/state?address={prefix}&limit={limit}&start={addresses[limit]}'
+            self.respond(handler, 200, {
+                'data': [{'address': a, 'data': self.state[a]} for a in addresses[:limit]],
+                'head': 'head',
+                'link': handler.path,
+                'paging': paging,
+            })
+
+        elif url.path.startswith('/state/'):
+            address = url.path[len('/state/'):]
+            if address in self.state:
+                head = query.get('head', ['head'])[0]
+                self.respond(handler, 200, {'data': self.state[address], 'head': head, 'link': handler.path})
+            else:
+                self.respond(handler, 404, {'error': {'code': 75, 'title': 'State Not Found', 'message': 'Not found'}})
+
+        else:
+            self.respond(handler, 404, {'error': {'code': 404, 'title': 'Not Found', 'message': 'Not found'}})
+
+    def respond(self, handler, status, obj):
+        content = json.dumps(obj).encode()
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', str(len(content)))
+        handler.end_headers()
+        handler.wfile.write(content)
@@ -0,0 +1,154 @@
+
+import threading
+import zmq
+
+from sawtooth_sdk.protobuf.validator_pb2 import Message
+from sawtooth_sdk.protobuf.block_pb2 import Block, BlockHeader
+from sawtooth_sdk.protobuf.client_block_pb2 import ClientBlockListResponse
+from sawtooth_sdk.protobuf.client_batch_submit_pb2 import (
+    ClientBatchSubmitRequest,
+    ClientBatchSubmitResponse,
+    ClientBatchStatusRequest,
+    ClientBatchStatusResponse,
+    ClientBatchStatus,
+)
+from sawtooth_sdk.protobuf.client_event_pb2 import (
+    ClientEventsSubscribeResponse,
+    ClientEventsUnsubscribeResponse,
+)
+from sawtooth_sdk.protobuf.client_state_pb2 import (
+    ClientStateGetRequest,
+    ClientStateGetResponse,
+    ClientStateListRequest,
+    ClientStateListResponse,
+)
+
+
+class StubValidator(object):
+    """
+    In-process stand-in for a validators ZMQ client endpoint, serving
+    state from a dict and marking every submitted batch as COMMITTED.
+    Batches listed in pending are reported as PENDING instead.
+    """
+
+    def __init__(self):
+        self.state = {}
+        self.batches = []
+        self.pending = set()
+        self.requests = []
+        self.submit_status = ClientBatchSubmitResponse.OK
+        self.state_root = 'state-root'
+        self.block_num = 1
+        self.subscribers = set()
+        self._outgoing = []
+        self._outgoing_lock = threading.Lock()
+
+        self._context = zmq.Context()
+        self._socket = self._context.socket(zmq.ROUTER)
+        port = self._socket.bind_to_random_port('tcp://127.0.0.1')
+        self.url = f'tcp://127.0.0.1:{port}'
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stop.set()
+        self._thread.join()
+        self._socket.close(linger=0)
+        self._context.term()
+
+    def publish(self, message_type, content: bytes):
+        """
+        Sends an unsolicited message to every subscribed client.
+        """
+        message = Message(message_type=message_type, correlation_id='', content=content)
+        with self._outgoing_lock:
+            self._outgoing.extend((identity, message) for identity in self.subscribers)
+
+    def _run(self):
+        while not self._stop.is_set():
+            with self._outgoing_lock:
+                outgoing, self._outgoing = self._outgoing, []
+            for identity, message in outgoing:
+                self._socket.send_multipart([identity, message.SerializeToString()])
+
+            if not self._socket.poll(10):
+                continue
+
+            identity, frame = self._socket.recv_multipart()
+            message = Message.FromString(frame)
+            self.requests.append(message.message_type)
+
+            if message.message_type == Message.CLIENT_EVENTS_SUBSCRIBE_REQUEST:
+                self.subscribers.add(identity)
+            elif message.message_type == Message.CLIENT_EVENTS_UNSUBSCRIBE_REQUEST:
+                self.subscribers.discard(identity)
+
+            response_type, response = self.handle(message)
+            if response_type is not None:
+                self._socket.send_multipart([identity, Message(
+                    message_type=response_type,
+                    correlation_id=message.correlation_id,
+                    content=response.SerializeToString(),
+                ).SerializeToString()])
+
+    def handle(self, message):
+        if message.message_type == Message.CLIENT_BATCH_SUBMIT_REQUEST:
+            request = ClientBatchSubmitRequest.FromString(message.content)
+            if self.submit_status == ClientBatchSubmitResponse.OK:
+                self.batches.extend(b.header_signature for b in request.batches)
+            return Message.CLIENT_BATCH_SUBMIT_RESPONSE, ClientBatchSubmitResponse(status=self.submit_status)
+
+        if message.message_type == Message.CLIENT_BATCH_STATUS_REQUEST:
+            request = ClientBatchStatusRequest.FromString(message.content)
+            return Message.CLIENT_BATCH_STATUS_RESPONSE, ClientBatchStatusResponse(
+                status=ClientBatchStatusResponse.OK,
+                batch_statuses=[
+                    ClientBatchStatus(
+                        batch_id=i,
+                        status=ClientBatchStatus.PENDING if i in self.pending
+                        else ClientBatchStatus.COMMITTED if i in self.batches
+                        else ClientBatchStatus.UNKNOWN,
+                    )
+                    for i in request.batch_ids
+                ],
+            )
+
+        if message.message_type == Message.CLIENT_STATE_GET_REQUEST:
+            request = ClientStateGetRequest.FromString(message.content)
+            if request.address not in self.state:
+                return Message.CLIENT_STATE_GET_RESPONSE, ClientStateGetResponse(status=ClientStateGetResponse.NO_RESOURCE)
+            return Message.CLIENT_STATE_GET_RESPONSE, ClientStateGetResponse(
+                status=ClientStateGetResponse.OK,
+                value=self.state[request.address],
+                state_root=self.state_root,
+            )
+
+        if message.message_type == Message.CLIENT_STATE_LIST_REQUEST:
+            request = ClientStateListRequest.FromString(message.content)
+            return Message.CLIENT_STATE_LIST_RESPONSE, ClientStateListResponse(
+                status=ClientStateListResponse.OK,
+                entries=[
+                    ClientStateListResponse.Entry(address=a, data=d)
+                    for a, d in sorted(self.state.items()) if a.startswith(request.address)
+                ],
+                state_root=self.state_root,
+            )
+
+        if message.message_type == Message.CLIENT_BLOCK_LIST_REQUEST:
+            header = BlockHeader(block_num=self.block_num, state_root_hash=self.state_root)
+            return Message.CLIENT_BLOCK_LIST_RESPONSE, ClientBlockListResponse(
+                status=ClientBlockListResponse.OK,
+                blocks=[Block(header=header.SerializeToString(), header_signature=f'block-{self.block_num}')],
+            )
+
+        if message.message_type == Message.CLIENT_EVENTS_SUBSCRIBE_REQUEST:
+            return Message.CLIENT_EVENTS_SUBSCRIBE_RESPONSE, ClientEventsSubscribeResponse(status=ClientEventsSubscribeResponse.OK)
+
+        if message.message_type == Message.CLIENT_EVENTS_UNSUBSCRIBE_REQUEST:
+            return Message.CLIENT_EVENTS_UNSUBSCRIBE_RESPONSE, ClientEventsUnsubscribeResponse(status=ClientEventsUnsubscribeResponse.OK)
+
+        return None, None
@@ -0,0 +1,61 @@
+
+import asyncio
+import unittest
+import pytest
+
+from bip32utils import BIP32Key
+
+from src.origin_ledger_sdk import AsyncLedger, BatchStatus, LedgerException, generate_address, AddressPrefix
+
+from .stub_ledger import StubLedger
+from .test_ledger_connector import MEASUREMENT_BODY, build_batch
+
+
+class TestAsyncLedgerConnector(unittest.TestCase):
+
+    @pytest.mark.unittest
+    def test_execute_batch_and_get_status(self):
+        batch = build_batch()
+
+        async def run(url):
+            async with AsyncLedger(url) as ledger:
+                handle = await ledger.execute_batch(batch)
+                return await ledger.get_batch_status(handle)
+
+        with StubLedger() as stub:
+            status = asyncio.run(run(stub.url))
+
+        self.assertEqual(status.status, BatchStatus.COMMITTED)
+        self.assertEqual(status.id, stub.batches[0])
+
+    @pytest.mark.unittest
+    def test_proxy_errors_are_raised_with_their_status(self):
+        async def run(url):
+            async with AsyncLedger(url) as ledger:
+                return await ledger.execute_batch(build_batch())
+
+        with StubLedger() as stub:
+            stub.batch_errors = [(503, None)]
+
+            with self.assertRaises(LedgerException) as context:
+                asyncio.run(run(stub.url))
+
+        self.assertEqual(context.exception.status_code, 503)
+
+    @pytest.mark.unittest
+    def test_concurrent_state_reads(self):
+        master_key = BIP32Key.fromEntropy("bfdgafgaertaehtaha43514r<aefag".encode())
+        addresses = [generate_address(AddressPrefix.MEASUREMENT, master_key.ChildKey(i).PublicKey()) for i in range(10)]
+
+        async def run(url):
+            async with AsyncLedger(url, max_concurrency=3) as ledger:
+                return await asyncio.gather(*[ledger.get_measurement(a) for a in addresses])
+
+        with StubLedger() as stub:
+            for address in addresses:
+                stub.put_state(address, MEASUREMENT_BODY)
+
+            measurements = asyncio.run(run(stub.url))
+
+        self.assertEqual([m.address for m in measurements], addresses)
+        self.assertTrue(all(m.amount == 100 for m in measurements))
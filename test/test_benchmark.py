@@ -0,0 +1,48 @@
+
+import os
+import tempfile
+import unittest
+import pytest
+
+from benchmark.harness import BenchmarkResult, measure, percentile, save_results, load_results, compare_results
+
+
+def result(name, ops_per_sec):
+    return BenchmarkResult(name=name, ops=1, iterations=1, ops_per_sec=ops_per_sec,
+                           p50_ms=1, p99_ms=1, peak_memory_bytes=0)
+
+
+class TestBenchmarkHarness(unittest.TestCase):
+
+    @pytest.mark.unittest
+    def test_percentile(self):
+        values = list(range(1, 101))
+
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([5], 99), 5)
+
+    @pytest.mark.unittest
+    def test_measure_only_times_run(self):
+        setups = []
+
+        benchmark = measure('noop', setup=lambda: setups.append(1), run=lambda _: [0] * 1000,
+                            ops=10, min_time=0, min_iterations=5)
+
+        self.assertEqual(benchmark.iterations, 5)
+        self.assertEqual(len(setups), 7)
+        self.assertGreater(benchmark.ops_per_sec, 0)
+        self.assertGreater(benchmark.peak_memory_bytes, 0)
+        self.assertLessEqual(benchmark.p50_ms, benchmark.p99_ms)
+
+    @pytest.mark.unittest
+    def test_results_are_compared_with_baseline(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'baseline.json')
+            save_results(path, [result('a', 100), result('b', 100)])
+            baseline = load_results(path)
+
+        regressions = compare_results(baseline, [result('a', 85), result('b', 75), result('c', 1)], tolerance=0.2)
+
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith('b:'))
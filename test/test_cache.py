@@ -0,0 +1,131 @@
+
+import unittest
+import pytest
+
+from bip32utils import BIP32Key
+
+from src.origin_ledger_sdk import Ledger, StateCache, generate_address, AddressPrefix
+
+from .stub_ledger import StubLedger
+from .test_ledger_connector import MEASUREMENT_BODY, build_batch
+
+
+class TestStateCache(unittest.TestCase):
+
+    @pytest.mark.unittest
+    def test_reads_are_served_from_cache(self):
+        key = BIP32Key.fromEntropy("bfdgafgaertaehtaha43514r<aefag".encode())
+        address = generate_address(AddressPrefix.MEASUREMENT, key.PublicKey())
+        cache = StateCache()
+
+        with StubLedger() as stub, Ledger(stub.url, cache=cache) as ledger:
+            stub.put_state(address, MEASUREMENT_BODY)
+
+            measurement_1 = ledger.get_measurement(address)
+            measurement_2 = ledger.get_measurement(address)
+            measurement_3 = ledger.get_measurement(address, head='head')
+
+        self.assertIs(measurement_1, measurement_2)
+        self.assertIs(measurement_1, measurement_3)
+        self.assertEqual(len(stub.requests), 1)
+        self.assertEqual(cache.hits, 2)
+        self.assertEqual(cache.misses, 1)
+        self.assertGreater(cache.memory_usage(), 0)
+
+    @pytest.mark.unittest
+    def test_pinned_reads_are_kept_per_head(self):
+        key = BIP32Key.fromEntropy("bfdgafgaertaehtaha43514r<aefag".encode())
+        address = generate_address(AddressPrefix.MEASUREMENT, key.PublicKey())
+        cache = StateCache()
+
+        with StubLedger() as stub, Ledger(stub.url, cache=cache) as ledger:
+            stub.put_state(address, MEASUREMENT_BODY)
+
+            ledger.get_measurement(address, head='h1')
+            ledger.get_measurement(address, head='h1')
+            ledger.get_measurement(address, head='h2')
+            ledger.get_measurement(address)
+
+        self.assertEqual([path for _, path in stub.requests], [
+            f'/state/{address}?head=h1',
+            f'/state/{address}?head=h2',
+            f'/state/{address}',
+        ])
+
+    @pytest.mark.unittest
+    def test_submitted_outputs_are_invalidated(self):
+        key = BIP32Key.fromEntropy("bfdgafgaertaehtaha43514r<aefag".encode())
+        address = generate_address(AddressPrefix.MEASUREMENT, key.PublicKey())
+        cache = StateCache()
+
+        with StubLedger() as stub, Ledger(stub.url, cache=cache) as ledger:
+            stub.put_state(address, MEASUREMENT_BODY)
+
+            ledger.get_measurement(address)
+            ledger.execute_batch(build_batch())
+            ledger.get_measurement(address)
+
+        self.assertEqual(cache.hits, 0)
+        self.assertEqual(cache.misses, 2)
+
+    @pytest.mark.unittest
+    def test_outputs_are_not_cached_until_committed(self):
+        key = BIP32Key.fromEntropy("bfdgafgaertaehtaha43514r<aefag".encode())
+        address = generate_address(AddressPrefix.MEASUREMENT, key.PublicKey())
+        cache = StateCache()
+
+        with StubLedger() as stub, Ledger(stub.url, cache=cache) as ledger:
+            stub.put_state(address, MEASUREMENT_BODY)
+            stub.batch_status = 'PENDING'
+
+            handle = ledger.execute_batch(build_batch())
+
+            # Read before the batch is committed, ie. the state before it
+            ledger.get_measurement(address)
+            ledger.get_measurement(address)
+            ledger.get_batch_status(handle)
+
+            stub.batch_status = 'COMMITTED'
+            ledger.get_batch_status(handle)
+            ledger.get_measurement(address)
+            ledger.get_measurement(address)
+
+        self.assertEqual(cache.misses, 3)
+        self.assertEqual(cache.hits, 1)
+
+    @pytest.mark.unittest
+    def test_batches_are_tracked_until_finalized(self):
+        cache = StateCache(max_entries=1)
+        cache.submitted('batch-1', ['a'])
+        cache.put('a', None, 1)
+        self.assertIsNone(cache.get('a'))
+
+        cache.finalized('batch-1')
+        cache.put('a', None, 1)
+        self.assertEqual(cache.get('a'), 1)
+
+        # The oldest batch is forgotten beyond max_entries
+        cache.submitted('batch-2', ['b'])
+        cache.submitted('batch-3', ['c'])
+        cache.put('b', None, 2)
+        self.assertEqual(cache.get('b'), 2)
+
+    @pytest.mark.unittest
+    def test_current_state_expires(self):
+        cache = StateCache(ttl=0)
+        cache.put('address', 'head', object())
+
+        self.assertIsNone(cache.get('address'))
+        self.assertIsNotNone(cache.get('address', 'head'))
+
+    @pytest.mark.unittest
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = StateCache(max_entries=2)
+        cache.put('a', None, 1)
+        cache.put('b', None, 2)
+        cache.get('a')
+        cache.put('c', None, 3)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
@@ -0,0 +1,169 @@
+
+import unittest
+import pytest
+
+from datetime import datetime, timezone
+from bip32utils import BIP32Key
+from sawtooth_sdk.protobuf.transaction_pb2 import TransactionHeader
+
+from src.origin_ledger_sdk import (
+    Ledger,
+    Batch,
+    ConflictError,
+    PublishMeasurementRequest,
+    IssueGGORequest,
+    TransferGGORequest,
+    SplitGGORequest,
+    SplitGGOPart,
+    RetireGGORequest,
+    RetireGGOPart,
+    MeasurementType,
+    generate_address,
+    AddressPrefix,
+)
+from src.origin_ledger_sdk.requests import AbstractRequest
+from src.origin_ledger_sdk.requests.helpers import get_signer
+
+from .stub_ledger import StubLedger
+
+
+MASTER_KEY = BIP32Key.fromEntropy("bfdgafgaertaehtaha43514r<aefag".encode())
+
+
+def key(i):
+    return MASTER_KEY.ChildKey(i)
+
+
+def ggo(i):
+    return generate_address(AddressPrefix.GGO, key(i).PublicKey())
+
+
+def transfer(source, destination):
+    return TransferGGORequest(source_private_key=key(source).PrivateKey(), source_address=ggo(source), destination_address=ggo(destination))
+
+
+def split(source, *destinations):
+    return SplitGGORequest(
+        source_private_key=key(source).PrivateKey(),
+        source_address=ggo(source),
+        parts=[SplitGGOPart(address=ggo(d), amount=10) for d in destinations],
+    )
+
+
+class TestConflicts(unittest.TestCase):
+
+    @pytest.mark.unittest
+    def test_addresses_match_signed_transactions(self):
+        requests = [
+            PublishMeasurementRequest(
+                address=generate_address(AddressPrefix.MEASUREMENT, key(1).PublicKey()),
+                begin=datetime(2020, 1, 1, tzinfo=timezone.utc),
+                end=datetime(2020, 1, 1, 1, tzinfo=timezone.utc),
+                sector='DK1',
+                type=MeasurementType.PRODUCTION,
+                amount=10,
+            ),
+            IssueGGORequest(
+                measurement_address=generate_address(AddressPrefix.MEASUREMENT, key(1).PublicKey()),
+                ggo_address=ggo(1),
+                tech_type='T010101',
+                fuel_type='F01010101',
+            ),
+            transfer(1, 2),
+            split(2, 3, 4),
+            RetireGGORequest(
+                settlement_address=generate_address(AddressPrefix.SETTLEMENT, key(5).PublicKey()),
+                measurement_address=generate_address(AddressPrefix.MEASUREMENT, key(5).PublicKey()),
+                measurement_private_key=key(5).PrivateKey(),
+                parts=[RetireGGOPart(address=ggo(i), private_key=key(i).PrivateKey()) for i in (3, 4)],
+            ),
+        ]
+
+        for request in requests:
+            headers = [TransactionHeader.FromString(t.header) for t in request.get_signed_transactions(get_signer(MASTER_KEY.PrivateKey()))]
+
+            self.assertEqual(set(request.get_inputs()), {a for h in headers for a in h.inputs}, type(request).__name__)
+            self.assertEqual(set(request.get_outputs()), {a for h in headers for a in h.outputs}, type(request).__name__)
+
+    @pytest.mark.unittest
+    def test_double_spends_are_found(self):
+        batch = Batch(MASTER_KEY.PrivateKey())
+        batch.add_request(transfer(1, 2))
+        batch.add_request(split(1, 3, 4))
+
+        conflicts = batch.find_conflicts()
+
+        self.assertEqual([(c.address, c.double_spend) for c in conflicts], [(ggo(1), True)])
+
+        with self.assertRaises(ConflictError):
+            batch.split_conflicts()
+
+    @pytest.mark.unittest
+    def test_declared_dependencies_are_not_conflicts(self):
+        first = transfer(1, 2)
+        second = split(2, 3, 4)
+        second.add_dependency(first)
+
+        batch = Batch(MASTER_KEY.PrivateKey())
+        batch.add_request(second)
+        batch.add_request(first)
+
+        self.assertEqual(batch.find_conflicts(), [])
+        self.assertEqual(len(batch.split_conflicts()), 1)
+
+    @pytest.mark.unittest
+    def test_conflicting_requests_are_split_into_ordered_batches(self):
+        first = transfer(1, 2)
+        second = split(2, 3, 4)
+        unrelated = transfer(5, 6)
+        third = transfer(3, 7)
+
+        batch = Batch(MASTER_KEY.PrivateKey())
+        for request in (first, second, unrelated, third):
+            batch.add_request(request)
+
+        conflicts = batch.find_conflicts()
+        batches = batch.split_conflicts()
+
+        self.assertEqual([(c.address, c.first, c.second) for c in conflicts], [(ggo(2), first, second), (ggo(3), second, third)])
+        self.assertEqual([b.requests for b in batches], [[first, unrelated], [second], [third]])
+        self.assertEqual(second.dependencies, [first])
+        self.assertEqual(third.dependencies, [second])
+        self.assertEqual([c for b in batches for c in b.find_conflicts()], [])
+
+        with StubLedger() as stub, Ledger(stub.url) as ledger:
+            ledger.execute_batches(list(reversed(batches)))
+
+        self.assertEqual(stub.batches, [b.get_signed_batch().header_signature for b in batches])
+
+    @pytest.mark.unittest
+    def test_signed_requests_can_not_be_split(self):
+        first = transfer(1, 2)
+        second = split(2, 3, 4)
+        second.get_signed_transactions(get_signer(MASTER_KEY.PrivateKey()))
+
+        batch = Batch(MASTER_KEY.PrivateKey())
+        batch.add_request(first)
+        batch.add_request(second)
+
+        with self.assertRaises(ValueError):
+            batch.split_conflicts()
+
+
+    @pytest.mark.unittest
+    def test_requests_without_addresses(self):
+        # Written before requests declared their inputs and outputs
+        with self.assertWarns(DeprecationWarning):
+            class LegacyRequest(AbstractRequest):
+                def get_signed_transactions(self, batch_signer):
+                    return [self.sign_transaction(
+                        batch_signer, batch_signer, b'{}', inputs=[], outputs=[],
+                        family_name='LegacyRequest', family_version='0.1')]
+
+        batch = Batch(signer_private_key=MASTER_KEY.PrivateKey())
+        batch.add_request(LegacyRequest())
+
+        self.assertEqual(len(batch.get_signed_batch().transactions), 1)
+
+        with self.assertRaisesRegex(ValueError, 'LegacyRequest does not declare'):
+            batch.find_conflicts()
@@ -0,0 +1,155 @@
+
+import unittest
+import pytest
+
+from bip32utils import BIP32Key
+from sawtooth_sdk.protobuf.batch_pb2 import BatchHeader
+from sawtooth_sdk.protobuf.transaction_pb2 import TransactionHeader
+
+from src.origin_ledger_sdk.requests.helpers import get_signer
+from src.origin_ledger_sdk import Ledger, Batch, SplitGGORequest, SplitGGOPart, TransferGGORequest, DependencyCycleError, generate_address, AddressPrefix
+
+from .stub_ledger import StubLedger
+
+
+class TestDependencies(unittest.TestCase):
+
+    def setUp(self):
+        self.master_key = BIP32Key.fromEntropy("bfdgafgaertaehtaha43514r<aefag".encode())
+        self.keys = [self.master_key.ChildKey(i) for i in range(4)]
+        self.addresses = [generate_address(AddressPrefix.GGO, k.PublicKey()) for k in self.keys]
+
+    def build_transfer(self, source, destination):
+        return TransferGGORequest(
+            source_private_key=self.keys[source].PrivateKey(),
+            source_address=self.addresses[source],
+            destination_address=self.addresses[destination],
+        )
+
+    def build_split(self):
+        return SplitGGORequest(
+            source_private_key=self.keys[0].PrivateKey(),
+            source_address=self.addresses[0],
+            parts=[
+                SplitGGOPart(address=self.addresses[1], amount=50),
+                SplitGGOPart(address=self.addresses[2], amount=50),
+            ]
+        )
+
+    @pytest.mark.unittest
+    def test_signed_transactions_are_memoized(self):
+        request = self.build_transfer(0, 1)
+        signer = get_signer(self.master_key.PrivateKey())
+
+        self.assertIs(request.get_signed_transactions(signer), request.get_signed_transactions(signer))
+
+    @pytest.mark.unittest
+    def test_dependencies_refer_to_the_most_recent_signing(self):
+        split = self.build_split()
+        signer_1 = get_signer(self.keys[1].PrivateKey())
+        signer_2 = get_signer(self.keys[2].PrivateKey())
+
+        transactions_1 = split.get_signed_transactions(signer_1)
+        transactions_2 = split.get_signed_transactions(signer_2)
+        self.assertEqual(split.get_header_signature(), transactions_2[-1].header_signature)
+
+        # Memoized, but still the most recent signing
+        split.get_signed_transactions(signer_1)
+        self.assertEqual(split.get_header_signature(), transactions_1[-1].header_signature)
+
+    @pytest.mark.unittest
+    def test_dependencies_are_per_instance(self):
+        split = self.build_split()
+        transfer_1 = self.build_transfer(1, 3)
+        transfer_2 = self.build_transfer(2, 3)
+
+        transfer_1.add_dependency(split)
+
+        self.assertEqual(transfer_1.dependencies, [split])
+        self.assertEqual(transfer_2.dependencies, [])
+
+    @pytest.mark.unittest
+    def test_dependencies_are_signed_first_within_a_batch(self):
+        split = self.build_split()
+        transfer = self.build_transfer(1, 3)
+        transfer.add_dependency(split)
+
+        batch = Batch(signer_private_key=self.master_key.PrivateKey())
+        batch.add_request(transfer)
+        batch.add_request(split)
+        signed_batch = batch.get_signed_batch()
+
+        split_id, transfer_id = BatchHeader.FromString(signed_batch.header).transaction_ids
+        transfer_header = TransactionHeader.FromString(signed_batch.transactions[1].header)
+
+        self.assertEqual(split_id, split.get_header_signature())
+        self.assertEqual(list(transfer_header.dependencies), [split_id])
+
+    @pytest.mark.unittest
+    def test_dependent_batches_are_sent_in_order(self):
+        split = self.build_split()
+        transfer = self.build_transfer(1, 3)
+        transfer.add_dependency(split)
+
+        transfer_batch = Batch(signer_private_key=self.keys[3].PrivateKey())
+        transfer_batch.add_request(transfer)
+        split_batch = Batch(signer_private_key=self.master_key.PrivateKey())
+        split_batch.add_request(split)
+
+        with StubLedger() as stub, Ledger(stub.url) as ledger:
+            ledger.execute_batches([transfer_batch, split_batch])
+
+        signed_split = split_batch.get_signed_batch()
+        signed_transfer = transfer_batch.get_signed_batch()
+        transfer_header = TransactionHeader.FromString(signed_transfer.transactions[0].header)
+
+        self.assertEqual(stub.batches, [signed_split.header_signature, signed_transfer.header_signature])
+        self.assertEqual(list(transfer_header.dependencies), [signed_split.transactions[0].header_signature])
+
+    @pytest.mark.unittest
+    def test_cyclic_dependencies_are_rejected(self):
+        transfer_1 = self.build_transfer(0, 1)
+        transfer_2 = self.build_transfer(1, 0)
+        transfer_1.add_dependency(transfer_2)
+        transfer_2.add_dependency(transfer_1)
+
+        batch = Batch(signer_private_key=self.master_key.PrivateKey())
+        batch.add_request(transfer_1)
+        batch.add_request(transfer_2)
+
+        with self.assertRaises(DependencyCycleError):
+            batch.get_signed_batch()
+
+    @pytest.mark.unittest
+    def test_dependencies_must_be_signed_first(self):
+        split = self.build_split()
+        transfer = self.build_transfer(1, 3)
+        transfer.add_dependency(split)
+
+        batch = Batch(signer_private_key=self.master_key.PrivateKey())
+        batch.add_request(transfer)
+
+        with self.assertRaises(ValueError):
+            batch.get_signed_batch()
+
+    @pytest.mark.unittest
+    def test_requests_implementing_get_signed_transactions(self):
+        with self.assertWarns(DeprecationWarning):
+            class LegacyTransferRequest(TransferGGORequest):
+                def get_signed_transactions(self, batch_signer):
+                    return TransferGGORequest.build_transactions(self, batch_signer)
+
+        request = LegacyTransferRequest(
+            source_private_key=self.keys[0].PrivateKey(),
+            source_address=self.addresses[0],
+            destination_address=self.addresses[1],
+        )
+        signer = get_signer(self.master_key.PrivateKey())
+        transactions = request.get_signed_transactions(signer)
+
+        self.assertIs(request.get_signed_transactions(signer), transactions)
+        self.assertEqual(request.get_header_signature(), transactions[-1].header_signature)
+        self.assertEqual(
+            [t.SerializeToString() for t in transactions],
+            [t.SerializeToString() for t in self.build_transfer(0, 1).get_signed_transactions(signer)],
+        )
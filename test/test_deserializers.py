@@ -0,0 +1,98 @@
+import unittest
+import pytest
+
+from datetime import datetime, timezone
+from marshmallow import ValidationError
+
+from src.origin_ledger_sdk.deserializers import get_deserializer
+from src.origin_ledger_sdk.ledger_connector import BatchStatusResponseHeader, StateListResponse
+from src.origin_ledger_sdk import Ledger, GGO, Measurement, Settlement, MeasurementType, BatchStatus
+
+from .stub_ledger import StubLedger
+from .test_ledger_connector import MEASUREMENT_BODY
+
+
+GGO_BODY = b'''{
+    "origin": "origin", "amount": 100, "begin": "2020-04-01T12:00:00Z", "end": "2020-04-01T13:00:00+00:00",
+    "sector": "DK1", "tech_type": "T010101", "fuel_type": "F01010101",
+    "next": {"action": "SPLIT", "addresses": ["a", "b"]},
+    "emissions": {"co2": {"value": 1.5, "unit": "g/Wh"}}
+}'''
+
+SETTLEMENT_BODY = b'{"measurement": "measurement", "parts": [{"ggo": "a", "amount": 60}, {"ggo": "b", "amount": 40}]}'
+
+BATCH_STATUSES_BODY = b'''{
+    "data": [
+        {"id": "1", "status": "COMMITTED", "invalid_transactions": []},
+        {"id": "2", "status": "INVALID", "invalid_transactions": [{"id": "t", "message": "Invalid"}]}
+    ],
+    "link": "link"
+}'''
+
+
+class TestDeserializers(unittest.TestCase):
+
+    def assertConforms(self, cls, content):
+        deserializer = get_deserializer(cls)
+        self.assertTrue(deserializer.compiled)
+        self.assertEqual(deserializer.loads(content), deserializer.loads(content, strict=True))
+
+    @pytest.mark.unittest
+    def test_measurement(self):
+        self.assertConforms(Measurement, MEASUREMENT_BODY)
+
+        measurement = get_deserializer(Measurement).loads(MEASUREMENT_BODY)
+        self.assertEqual(measurement.type, MeasurementType.PRODUCTION)
+        self.assertEqual(measurement.begin, datetime(2020, 4, 1, 12, tzinfo=timezone.utc))
+
+    @pytest.mark.unittest
+    def test_ggo(self):
+        self.assertConforms(GGO, GGO_BODY)
+
+    @pytest.mark.unittest
+    def test_settlement(self):
+        self.assertConforms(Settlement, SETTLEMENT_BODY)
+
+    @pytest.mark.unittest
+    def test_batch_statuses(self):
+        self.assertConforms(BatchStatusResponseHeader, BATCH_STATUSES_BODY)
+
+        header = get_deserializer(BatchStatusResponseHeader).loads(BATCH_STATUSES_BODY)
+        self.assertEqual([s.status for s in header.data], [BatchStatus.COMMITTED, BatchStatus.INVALID])
+        self.assertEqual(header.data[1].invalid_transactions[0].message, 'Invalid')
+
+    @pytest.mark.unittest
+    def test_state_list(self):
+        self.assertConforms(StateListResponse, b'{"data": [{"address": "a", "data": "ZGF0YQ=="}], "head": "head", '
+                                               b'"paging": {"limit": 1000, "start": null}}')
+
+    @pytest.mark.unittest
+    def test_invalid_data_raises_validation_error(self):
+        deserializer = get_deserializer(Measurement)
+
+        for content in (b'{"amount": 100}', b'{"amount": "many", "type": "PRODUCTION", "begin": "2020-04-01T12:00:00", '
+                                            b'"end": "2020-04-01T13:00:00", "sector": "DK1"}', b'[]'):
+            for strict in (False, True):
+                with self.assertRaises(ValidationError):
+                    deserializer.loads(content, strict)
+
+    @pytest.mark.unittest
+    def test_only_strict_mode_rejects_unknown_fields(self):
+        content = MEASUREMENT_BODY[:-1] + b', "unknown": 1}'
+        deserializer = get_deserializer(Measurement)
+
+        self.assertEqual(deserializer.loads(content).amount, 100)
+        with self.assertRaises(ValidationError):
+            deserializer.loads(content, strict=True)
+
+    @pytest.mark.unittest
+    def test_strict_ledger(self):
+        with StubLedger() as stub, Ledger(stub.url, strict=True) as ledger:
+            stub.put_state('address', MEASUREMENT_BODY[:-1] + b', "unknown": 1}')
+
+            with self.assertRaises(ValidationError):
+                ledger.get_measurement('address')
+
+            result = ledger.get_measurements(['address'])
+
+        self.assertIsInstance(result.errors['address'], ValidationError)
@@ -0,0 +1,162 @@
+
+import time
+import threading
+import unittest
+import pytest
+
+from bip32utils import BIP32Key
+from sawtooth_sdk.protobuf.validator_pb2 import Message
+from sawtooth_sdk.protobuf.events_pb2 import Event, EventList
+from sawtooth_sdk.protobuf.transaction_receipt_pb2 import StateChangeList, StateChange
+
+from src.origin_ledger_sdk import ZmqLedger, LedgerSubscriber, BatchStatus, StateCache, generate_address, AddressPrefix
+
+from .stub_validator import StubValidator
+from .test_ledger_connector import MEASUREMENT_BODY, build_batch
+
+
+def block_commit_event(block_id):
+    return Event(
+        event_type='sawtooth/block-commit',
+        attributes=[Event.Attribute(key='block_id', value=block_id)],
+    )
+
+
+def state_delta_event(*state_changes):
+    return Event(
+        event_type='sawtooth/state-delta',
+        data=StateChangeList(state_changes=state_changes).SerializeToString(),
+    )
+
+
+class TestLedgerSubscriber(unittest.TestCase):
+
+    @pytest.mark.unittest
+    def test_batch_futures_are_resolved_on_block_commit(self):
+        with StubValidator() as validator, ZmqLedger(validator.url, timeout=5) as ledger:
+            handle = ledger.execute_batch(build_batch())
+            validator.pending.add(validator.batches[0])
+
+            with LedgerSubscriber(ledger) as subscriber:
+                future, = subscriber.watch_batches([handle])
+
+                time.sleep(0.2)
+                self.assertFalse(future.done())
+
+                validator.pending.clear()
+                validator.publish(Message.CLIENT_EVENTS, EventList(events=[block_commit_event('block-1')]).SerializeToString())
+
+                status = future.result(timeout=5)
+
+        self.assertEqual(status.id, validator.batches[0])
+        self.assertEqual(status.status, BatchStatus.COMMITTED)
+
+    @pytest.mark.unittest
+    def test_state_changes_are_decoded(self):
+        key = BIP32Key.fromEntropy("bfdgafgaertaehtaha43514r<aefag".encode())
+        address = generate_address(AddressPrefix.MEASUREMENT, key.PublicKey())
+        cache = StateCache()
+        received = []
+
+        with StubValidator() as validator, ZmqLedger(validator.url, timeout=5, cache=cache) as ledger:
+            validator.state[address] = MEASUREMENT_BODY
+            ledger.get_measurement(address)
+
+            with LedgerSubscriber(ledger) as subscriber:
+                subscriber.add_callback(lambda *args: received.append(args))
+
+                validator.publish(Message.CLIENT_EVENTS, EventList(events=[
+                    block_commit_event('block-1'),
+                    state_delta_event(
+                        StateChange(address=address, value=MEASUREMENT_BODY, type=StateChange.SET),
+                        StateChange(address='ffffff' + address[6:], value=b'', type=StateChange.DELETE),
+                    ),
+                ]).SerializeToString())
+
+                for _ in range(50):
+                    if received:
+                        break
+                    time.sleep(0.1)
+
+        self.assertEqual(len(received), 1)
+        self.assertEqual(received[0][0], address)
+        self.assertEqual(received[0][1].amount, 100)
+        self.assertEqual(received[0][2], 'block-1')
+        self.assertIsNone(cache.get(address))
+
+    @pytest.mark.unittest
+    def test_block_commits_are_checked_together(self):
+        key = BIP32Key.fromEntropy("bfdgafgaertaehtaha43514r<aefag".encode())
+        address = generate_address(AddressPrefix.MEASUREMENT, key.PublicKey())
+        release = threading.Event()
+
+        with StubValidator() as validator, ZmqLedger(validator.url, timeout=5) as ledger:
+            handle = ledger.execute_batch(build_batch())
+            validator.pending.add(validator.batches[0])
+
+            with LedgerSubscriber(ledger) as subscriber:
+                future, = subscriber.watch_batches([handle])
+                subscriber.add_callback(lambda *args: release.wait(5))
+                time.sleep(0.2)
+                checks = validator.requests.count(Message.CLIENT_BATCH_STATUS_REQUEST)
+
+                # Blocks the subscriber while more blocks are committed
+                validator.publish(Message.CLIENT_EVENTS, EventList(events=[
+                    block_commit_event('block-1'),
+                    state_delta_event(StateChange(address=address, value=MEASUREMENT_BODY, type=StateChange.SET)),
+                ]).SerializeToString())
+
+                for i in range(2, 6):
+                    validator.publish(Message.CLIENT_EVENTS, EventList(events=[
+                        block_commit_event(f'block-{i}'),
+                    ]).SerializeToString())
+
+                time.sleep(0.2)
+                release.set()
+                time.sleep(0.5)
+
+                self.assertFalse(future.done())
+
+        self.assertEqual(validator.requests.count(Message.CLIENT_BATCH_STATUS_REQUEST), checks + 1)
+
+    @pytest.mark.unittest
+    def test_state_changes_which_can_not_be_decoded_are_skipped(self):
+        key = BIP32Key.fromEntropy("bfdgafgaertaehtaha43514r<aefag".encode())
+        corrupt = generate_address(AddressPrefix.MEASUREMENT, key.ChildKey(1).PublicKey())
+        address = generate_address(AddressPrefix.MEASUREMENT, key.PublicKey())
+        received = []
+
+        with StubValidator() as validator, ZmqLedger(validator.url, timeout=5) as ledger:
+            handle = ledger.execute_batch(build_batch())
+            validator.pending.add(validator.batches[0])
+
+            with LedgerSubscriber(ledger) as subscriber, self.assertLogs(level='ERROR') as logs:
+                subscriber.add_callback(lambda *args: received.append(args))
+                future, = subscriber.watch_batches([handle])
+
+                time.sleep(0.2)
+                validator.pending.clear()
+                validator.publish(Message.CLIENT_EVENTS, EventList(events=[
+                    block_commit_event('block-1'),
+                    state_delta_event(
+                        StateChange(address=corrupt, value=b'corrupt', type=StateChange.SET),
+                        StateChange(address=address, value=MEASUREMENT_BODY, type=StateChange.SET),
+                    ),
+                ]).SerializeToString())
+
+                status = future.result(timeout=5)
+
+        self.assertEqual(status.status, BatchStatus.COMMITTED)
+        self.assertEqual([args[0] for args in received], [address])
+        self.assertIn(f'Failed to decode state change of {corrupt}', logs.output[0])
+
+    @pytest.mark.unittest
+    def test_pending_futures_are_cancelled_on_stop(self):
+        with StubValidator() as validator, ZmqLedger(validator.url, timeout=5) as ledger:
+            handle = ledger.execute_batch(build_batch())
+            validator.pending.add(validator.batches[0])
+
+            with LedgerSubscriber(ledger) as subscriber:
+                future, = subscriber.watch_batches([handle])
+
+        self.assertTrue(future.cancelled())
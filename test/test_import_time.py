@@ -0,0 +1,67 @@
+import os
+import sys
+import json
+import unittest
+import subprocess
+import pytest
+
+from src import origin_ledger_sdk
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Seconds importing the package may take. Importing it eagerly took
+# around half a second, importing it lazily takes a couple of milliseconds.
+IMPORT_BUDGET = 0.1
+
+HEAVY_MODULES = ('sawtooth_sdk', 'sawtooth_signing', 'marshmallow', 'marshmallow_dataclass', 'requests', 'aiohttp', 'zmq')
+
+IMPORT_SCRIPT = '''
+import sys, time, json
+begin = time.perf_counter()
+import src.origin_ledger_sdk
+elapsed = time.perf_counter() - begin
+print(json.dumps({'elapsed': elapsed, 'modules': sorted(m.split('.')[0] for m in sys.modules)}))
+'''
+
+
+def import_in_new_process() -> dict:
+    output = subprocess.run(
+        [sys.executable, '-c', IMPORT_SCRIPT],
+        cwd=ROOT,
+        check=True,
+        stdout=subprocess.PIPE,
+    ).stdout
+    return json.loads(output)
+
+
+class TestImportTime(unittest.TestCase):
+
+    @pytest.mark.unittest
+    def test_import_is_within_budget(self):
+        # The fastest of a few runs, as the first may have to read files from disk
+        results = [import_in_new_process() for _ in range(3)]
+        elapsed = min(result['elapsed'] for result in results)
+
+        self.assertLess(elapsed, IMPORT_BUDGET)
+
+    @pytest.mark.unittest
+    def test_import_does_not_load_dependencies(self):
+        modules = import_in_new_process()['modules']
+
+        for module in HEAVY_MODULES:
+            self.assertNotIn(module, modules)
+
+    @pytest.mark.unittest
+    def test_names_are_imported_on_first_use(self):
+        from src.origin_ledger_sdk import Ledger
+        from src.origin_ledger_sdk.ledger_connector import Ledger as ConnectorLedger
+
+        self.assertIs(Ledger, ConnectorLedger)
+        self.assertIn('MultiLedger', dir(origin_ledger_sdk))
+
+        for name in origin_ledger_sdk.__all__:
+            self.assertIsNotNone(getattr(origin_ledger_sdk, name))
+
+        with self.assertRaises(AttributeError):
+            origin_ledger_sdk.DoesNotExist
@@ -0,0 +1,147 @@
+
+import io
+import os
+import json
+import tempfile
+import tracemalloc
+import unittest
+import pytest
+
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from bip32utils import BIP32Key
+
+from src.origin_ledger_sdk import Ledger, MeasurementType, generate_address, AddressPrefix
+from src.origin_ledger_sdk.ingest import IngestPipeline, read_measurements
+from src.origin_ledger_sdk.__main__ import main
+
+from .stub_ledger import StubLedger
+
+
+KEY = BIP32Key.fromEntropy("bfdgafgaertaehtaha43514r<aefag".encode())
+ADDRESS = generate_address(AddressPrefix.MEASUREMENT, KEY.PublicKey())
+
+
+def build_rows(count):
+    for i in range(count):
+        begin = datetime(2020, 1, 1, tzinfo=timezone.utc) + timedelta(hours=i)
+        yield {
+            'address': ADDRESS,
+            'begin': begin.isoformat(),
+            'end': (begin + timedelta(hours=1)).isoformat(),
+            'sector': 'DK1',
+            'type': 'PRODUCTION',
+            'amount': i,
+        }
+
+
+def build_jsonl(count):
+    return io.StringIO(''.join(json.dumps(row) + '\n' for row in build_rows(count)))
+
+
+class TestIngest(unittest.TestCase):
+
+    @pytest.mark.unittest
+    def test_read_jsonl_and_csv(self):
+        csv = io.StringIO('address,begin,end,sector,type,amount\n'
+                          f'{ADDRESS},2020-01-01T00:00:00+00:00,2020-01-01T01:00:00+00:00,DK1,CONSUMPTION,42\n')
+
+        from_jsonl = list(read_measurements(build_jsonl(2), 'jsonl'))
+        from_csv = list(read_measurements(csv, 'csv'))
+
+        self.assertEqual([m.amount for m in from_jsonl], [0, 1])
+        self.assertEqual(from_csv[0].type, MeasurementType.CONSUMPTION)
+        self.assertEqual(from_csv[0].amount, 42)
+        self.assertEqual(from_csv[0].begin, datetime(2020, 1, 1, tzinfo=timezone.utc))
+
+    @pytest.mark.unittest
+    def test_read_utc_designator(self):
+        row = next(build_rows(1))
+        row['begin'] = '2020-01-01T00:00:00Z'
+        row['end'] = '2020-01-01T01:00:00Z'
+
+        measurement, = read_measurements(io.StringIO(json.dumps(row)))
+
+        self.assertEqual(measurement.begin, datetime(2020, 1, 1, tzinfo=timezone.utc))
+        self.assertEqual(measurement.end, datetime(2020, 1, 1, 1, tzinfo=timezone.utc))
+
+    @pytest.mark.unittest
+    def test_invalid_dates_are_reported_with_their_number(self):
+        row = next(build_rows(1))
+        row['begin'] = 'yesterday'
+
+        with self.assertRaisesRegex(ValueError, 'row 1'):
+            list(read_measurements(io.StringIO(json.dumps(row))))
+
+    @pytest.mark.unittest
+    def test_invalid_rows_are_reported_with_their_number(self):
+        rows = io.StringIO(build_jsonl(1).getvalue() + '{"address": "abc"}\n')
+
+        with self.assertRaisesRegex(ValueError, 'row 2'):
+            list(read_measurements(rows))
+
+    @pytest.mark.unittest
+    def test_pipeline_submits_every_measurement(self):
+        progress = []
+
+        with StubLedger() as stub, Ledger(stub.url) as ledger:
+            pipeline = IngestPipeline(ledger, KEY.PrivateKey(), max_batch_transactions=10,
+                                      max_list_batches=2, progress=progress.append)
+            result = pipeline.run(read_measurements(build_jsonl(95)))
+
+        self.assertEqual(result.transactions, 95)
+        self.assertEqual(result.batches, 10)
+        self.assertEqual(len(stub.batches), 10)
+        self.assertEqual(len(progress), 5)
+
+    @pytest.mark.unittest
+    def test_pipeline_stops_on_errors(self):
+        with StubLedger() as stub, Ledger(stub.url) as ledger:
+            stub.batch_errors = [(400, 30)]
+            pipeline = IngestPipeline(ledger, KEY.PrivateKey(), max_batch_transactions=10, max_list_batches=1)
+
+            with self.assertRaises(Exception):
+                pipeline.run(read_measurements(build_jsonl(1000)))
+
+        self.assertLess(len(stub.batches), 100)
+
+    @pytest.mark.unittest
+    def test_memory_does_not_grow_with_input(self):
+        def peak_memory(count):
+            with StubLedger() as stub, Ledger(stub.url) as ledger:
+                # The stub keeps every request and batch id, which is not memory of the pipeline
+                stub.requests = deque(maxlen=1)
+                stub.batches = deque(maxlen=1)
+
+                pipeline = IngestPipeline(ledger, KEY.PrivateKey(), max_batch_transactions=10,
+                                          max_list_batches=2, max_pending=2)
+                requests = read_measurements(json.dumps(row) for row in build_rows(count))
+
+                tracemalloc.start()
+                try:
+                    pipeline.run(requests)
+                    return tracemalloc.get_traced_memory()[1]
+                finally:
+                    tracemalloc.stop()
+
+        # Imports and caches filled on first use are not part of the pipeline
+        peak_memory(200)
+
+        self.assertLess(peak_memory(2000), peak_memory(200) * 1.5)
+
+    @pytest.mark.unittest
+    def test_command_line(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'measurements.jsonl')
+            key_path = os.path.join(directory, 'key.hex')
+
+            with open(path, 'w') as f:
+                f.write(build_jsonl(30).getvalue())
+            with open(key_path, 'w') as f:
+                f.write(KEY.PrivateKey().hex())
+
+            with StubLedger() as stub:
+                code = main(['ingest', path, '--url', stub.url, '--key-file', key_path, '--batch-size', '10', '--quiet'])
+
+        self.assertEqual(code, 0)
+        self.assertEqual(len(stub.batches), 3)
@@ -0,0 +1,73 @@
+
+import unittest
+import pytest
+
+from src.origin_ledger_sdk import Ledger, LedgerException, InMemoryCollector, register_collector, unregister_collector
+from src.origin_ledger_sdk.instrumentation import span, _noop_span
+
+from .stub_ledger import StubLedger
+from .test_ledger_connector import build_batch
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        self.collector = InMemoryCollector()
+        register_collector(self.collector)
+
+    def tearDown(self):
+        unregister_collector(self.collector)
+
+    @pytest.mark.unittest
+    def test_signing_phases_are_timed(self):
+        build_batch().get_signed_batch()
+
+        for name in ('batch_sign_transactions_seconds', 'batch_sign_seconds', 'request_serialize_seconds',
+                     'transaction_header_seconds', 'transaction_sign_seconds'):
+            self.assertEqual(self.collector.count(name), 1, name)
+
+        self.assertEqual(self.collector.count('batch_transactions'), 1)
+        self.assertEqual(self.collector.total('batch_transactions'), 1)
+
+    @pytest.mark.unittest
+    def test_ledger_requests_are_timed_and_counted(self):
+        with StubLedger() as stub, Ledger(stub.url) as ledger:
+            handle = ledger.execute_batch(build_batch())
+            ledger.get_batch_status(handle)
+
+            with self.assertRaises(LedgerException):
+                ledger.get_measurement('0' * 70)
+
+        for operation in ('send_batches', 'get_batch_status', 'get_state'):
+            self.assertEqual(self.collector.count('ledger_request_seconds', operation=operation), 1)
+            self.assertEqual(self.collector.count('ledger_decode_seconds', operation=operation), 1)
+
+        self.assertEqual(self.collector.count('ledger_serialize_seconds'), 1)
+        self.assertGreater(self.collector.counter('ledger_sent_bytes_total'), 0)
+        self.assertGreater(self.collector.counter('ledger_received_bytes_total'), 0)
+        self.assertEqual(self.collector.counter('ledger_errors_total', code='75'), 1)
+
+    @pytest.mark.unittest
+    def test_prometheus_export(self):
+        collector = InMemoryCollector(buckets={'test_seconds': (0.1, 1)})
+        collector.observe('test_seconds', 0.05, {'operation': 'a'})
+        collector.observe('test_seconds', 0.5, {'operation': 'a'})
+        collector.increment('errors_total', 2, {'code': '31'})
+
+        self.assertEqual(collector.quantile('test_seconds', 0.5, operation='a'), 0.1)
+        self.assertEqual(collector.to_prometheus(namespace='sdk'), '\n'.join([
+            '# TYPE sdk_test_seconds histogram',
+            'sdk_test_seconds_bucket{operation="a",le="0.1"} 1',
+            'sdk_test_seconds_bucket{operation="a",le="1"} 2',
+            'sdk_test_seconds_bucket{operation="a",le="+Inf"} 2',
+            'sdk_test_seconds_sum{operation="a"} 0.55',
+            'sdk_test_seconds_count{operation="a"} 2',
+            '# TYPE sdk_errors_total counter',
+            'sdk_errors_total{code="31"} 2',
+        ]) + '\n')
+
+    @pytest.mark.unittest
+    def test_spans_are_noop_without_collectors(self):
+        unregister_collector(self.collector)
+
+        self.assertIs(span('test_seconds'), _noop_span)
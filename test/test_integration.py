@@ -13,23 +13,15 @@ from src.origin_ledger_sdk import Ledger, Batch, BatchStatus, MeasurementType, P
 class TestIntegration(unittest.TestCase):
 
     def wait_for_commit(self, ledger, handle):
-        i = 0
-        while True:
-            status = ledger.get_batch_status(handle).status
-            
-            if status == BatchStatus.COMMITTED:
-                break
+        for batch_status in ledger.wait_for_batches([handle], timeout=30):
+            status = batch_status.status
 
             if status == BatchStatus.INVALID:
                 raise Exception("INVALID")
 
-            i += 1
-
-            if i > 30:
+            if status != BatchStatus.COMMITTED:
                 raise Exception("TIMEOUT")
 
-            time.sleep(1)
-
         self.assertEqual(status, BatchStatus.COMMITTED)
 
     @pytest.mark.integrationtest
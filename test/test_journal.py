@@ -0,0 +1,128 @@
+
+import os
+import tempfile
+import unittest
+import pytest
+
+from datetime import datetime, timezone
+from bip32utils import BIP32Key
+
+from src.origin_ledger_sdk import Ledger, Batch, PublishMeasurementRequest, MeasurementType, generate_address, AddressPrefix
+from src.origin_ledger_sdk.journal import SubmissionJournal, BatchState, JournalError
+
+from .stub_ledger import StubLedger
+
+
+def build_signed_batches(count):
+    key = BIP32Key.fromEntropy("bfdgafgaertaehtaha43514r<aefag".encode())
+
+    for i in range(count):
+        batch = Batch(signer_private_key=key.PrivateKey())
+        batch.add_request(PublishMeasurementRequest(
+            address=generate_address(AddressPrefix.MEASUREMENT, key.PublicKey()),
+            begin=datetime(2020, 4, 1, 12, tzinfo=timezone.utc),
+            end=datetime(2020, 4, 1, 13, tzinfo=timezone.utc),
+            sector='DK1',
+            type=MeasurementType.PRODUCTION,
+            amount=i
+        ))
+        yield batch.get_signed_batch()
+
+
+class TestSubmissionJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'journal')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    @pytest.mark.unittest
+    def test_batches_survive_reopening(self):
+        batches = list(build_signed_batches(3))
+
+        with StubLedger() as stub, Ledger(stub.url) as ledger, SubmissionJournal(self.path) as journal:
+            journal.submit(ledger, batches[:2])
+            journal.record_signed(batches[2:])
+            journal.record_statuses(ledger.wait_for_batches([batches[0].header_signature]))
+
+        with SubmissionJournal(self.path) as journal:
+            self.assertEqual(len(journal), 3)
+            self.assertEqual(journal.state(batches[0].header_signature), BatchState.COMMITTED)
+            self.assertEqual(journal.state(batches[1].header_signature), BatchState.SUBMITTED)
+            self.assertEqual(journal.state(batches[2].header_signature), BatchState.SIGNED)
+            self.assertEqual(journal.get_batch(batches[2].header_signature), batches[2])
+            self.assertEqual(journal.pending(), [b.header_signature for b in batches[1:]])
+
+    @pytest.mark.unittest
+    def test_torn_records_are_discarded(self):
+        batches = list(build_signed_batches(2))
+
+        with SubmissionJournal(self.path) as journal:
+            journal.record_signed(batches[:1])
+
+        size = os.path.getsize(self.path)
+        with open(self.path, 'ab') as f:
+            f.write(b'\x40\x00\x00\x00\x00\x00\x00\x00\x01')
+
+        with SubmissionJournal(self.path) as journal:
+            self.assertEqual(len(journal), 1)
+            self.assertEqual(os.path.getsize(self.path), size)
+            journal.record_signed(batches[1:])
+
+        with SubmissionJournal(self.path) as journal:
+            self.assertEqual(journal.get_batch(batches[1].header_signature), batches[1])
+
+    @pytest.mark.unittest
+    def test_resume_resends_unknown_batches_without_signing(self):
+        batches = list(build_signed_batches(3))
+        committed, pending, unknown = (b.header_signature for b in batches)
+
+        with SubmissionJournal(self.path) as journal:
+            journal.record_signed(batches)
+            journal.record_state([committed, pending], BatchState.SUBMITTED)
+
+        with StubLedger() as stub, Ledger(stub.url) as ledger, SubmissionJournal(self.path) as journal:
+            stub.batch_statuses = {committed: 'COMMITTED', pending: 'PENDING', unknown: 'UNKNOWN'}
+
+            resent = journal.resume(ledger)
+
+            self.assertEqual(resent, [unknown])
+            self.assertEqual(stub.batches, [unknown])
+            self.assertEqual(journal.state(committed), BatchState.COMMITTED)
+            self.assertEqual(journal.state(pending), BatchState.SUBMITTED)
+            self.assertEqual(journal.state(unknown), BatchState.SUBMITTED)
+
+    @pytest.mark.unittest
+    def test_compact_keeps_pending_batches(self):
+        batches = list(build_signed_batches(3))
+
+        with SubmissionJournal(self.path) as journal:
+            journal.record_signed(batches)
+            journal.record_state([batches[0].header_signature], BatchState.COMMITTED)
+            journal.record_state([batches[1].header_signature], BatchState.SUBMITTED)
+            size = os.path.getsize(self.path)
+
+            journal.compact()
+
+            self.assertLess(os.path.getsize(self.path), size)
+            self.assertEqual(journal.get_batch(batches[2].header_signature), batches[2])
+            journal.record_state([batches[2].header_signature], BatchState.SUBMITTED)
+
+            # The status of a compacted batch may still arrive
+            journal.record_state([batches[0].header_signature], BatchState.COMMITTED)
+            self.assertNotIn(batches[0].header_signature, journal)
+
+        with SubmissionJournal(self.path) as journal:
+            self.assertEqual(journal.pending(), [b.header_signature for b in batches[1:]])
+            self.assertEqual(journal.state(batches[2].header_signature), BatchState.SUBMITTED)
+            self.assertEqual(journal.get_batch(batches[1].header_signature), batches[1])
+
+    @pytest.mark.unittest
+    def test_other_files_are_rejected(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'not a journal')
+
+        with self.assertRaises(JournalError):
+            SubmissionJournal(self.path)
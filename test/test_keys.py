@@ -0,0 +1,79 @@
+import os
+import unittest
+import pytest
+
+from bip32utils import BIP32Key
+
+from src.origin_ledger_sdk import KeyDeriver, ExtendedKey, AddressPrefix, generate_address
+from src.origin_ledger_sdk.keys import HARDENED
+
+
+ENTROPY = "this_will_be_user_one_who_has_the_production_device".encode()
+
+
+class TestKeyDeriver(unittest.TestCase):
+
+    @pytest.mark.unittest
+    def test_keys_are_the_same_as_bip32utils(self):
+        bip32_key = BIP32Key.fromEntropy(ENTROPY)
+        key = ExtendedKey.from_entropy(ENTROPY)
+
+        self.assertEqual(key.private_key, bip32_key.PrivateKey())
+        self.assertEqual(key.public_key, bip32_key.PublicKey())
+
+        for path in ([1, 42, 26429040], [0, HARDENED + 5, 3]):
+            bip32_child, child = bip32_key, key
+            for index in path:
+                bip32_child, child = bip32_child.ChildKey(index), child.child(index)
+
+            self.assertEqual(child.private_key, bip32_child.PrivateKey())
+            self.assertEqual(child.public_key, bip32_child.PublicKey())
+            self.assertEqual(child.chain_code, bip32_child.ChainCode())
+
+    @pytest.mark.unittest
+    def test_derive_returns_keys_and_addresses(self):
+        bip32_key = BIP32Key.fromEntropy(ENTROPY).ChildKey(1).ChildKey(42).ChildKey(26429040)
+        deriver = KeyDeriver(ExtendedKey.from_bip32(BIP32Key.fromEntropy(ENTROPY)))
+
+        key = deriver.derive([1, 42, 26429040], prefixes=[AddressPrefix.MEASUREMENT, AddressPrefix.GGO])
+
+        self.assertEqual(key.index, 26429040)
+        self.assertEqual(key.private_key, bip32_key.PrivateKey())
+        self.assertEqual(key.address(AddressPrefix.MEASUREMENT), generate_address(AddressPrefix.MEASUREMENT, bip32_key.PublicKey()))
+        self.assertEqual(key.address(AddressPrefix.GGO), generate_address(AddressPrefix.GGO, bip32_key.PublicKey()))
+        self.assertEqual(key.address(AddressPrefix.SETTLEMENT), generate_address(AddressPrefix.SETTLEMENT, bip32_key.PublicKey()))
+
+    @pytest.mark.unittest
+    def test_keys_along_the_path_are_cached(self):
+        deriver = KeyDeriver(ExtendedKey.from_entropy(ENTROPY), max_keys=3)
+
+        deriver.derive([1, 42, 0])
+        deriver.derive([1, 42, 1])
+        deriver.derive([1, 42, 1])
+
+        self.assertEqual((deriver.hits, deriver.misses), (1, 2))
+        self.assertEqual(len(deriver), 3)
+
+        deriver.derive([1, 43, 0])
+        self.assertEqual(len(deriver), 3)
+
+    @pytest.mark.unittest
+    def test_derive_range(self):
+        bip32_parent = BIP32Key.fromEntropy(ENTROPY).ChildKey(1).ChildKey(42)
+        expected = [bip32_parent.ChildKey(i).PrivateKey() for i in range(100, 120)]
+
+        with KeyDeriver(ExtendedKey.from_entropy(ENTROPY)) as deriver:
+            keys = deriver.derive_range([1, 42], 100, 120)
+
+        with KeyDeriver(ExtendedKey.from_entropy(ENTROPY), max_workers=2, threshold=0, chunk_size=3) as deriver:
+            pooled_keys = deriver.derive_range([1, 42], 100, 120)
+
+        # Chunks are sized by the number of workers
+        with KeyDeriver(ExtendedKey.from_entropy(ENTROPY), threshold=0) as deriver:
+            chunked_keys = deriver.derive_range([1, 42], 100, 120)
+
+        self.assertEqual([key.private_key for key in keys], expected)
+        self.assertEqual([key.index for key in keys], list(range(100, 120)))
+        self.assertEqual(pooled_keys, keys)
+        self.assertEqual(chunked_keys, keys)
+        self.assertEqual(deriver.max_workers, os.cpu_count() or 1)
@@ -0,0 +1,162 @@
+
+import gc
+import unittest
+import pytest
+
+from datetime import datetime, timezone
+from bip32utils import BIP32Key
+
+from src.origin_ledger_sdk.ledger_connector import get_batch_ids
+from src.origin_ledger_sdk import Ledger, Batch, BatchStatus, PublishMeasurementRequest, MeasurementType, generate_address, AddressPrefix
+
+from .stub_ledger import StubLedger
+
+
+MEASUREMENT_BODY = b'{"amount": 100, "type": "PRODUCTION", "begin": "2020-04-01T12:00:00+00:00", "end": "2020-04-01T13:00:00+00:00", "sector": "DK1"}'
+
+
+def build_batch():
+    key = BIP32Key.fromEntropy("bfdgafgaertaehtaha43514r<aefag".encode())
+
+    batch = Batch(signer_private_key=key.PrivateKey())
+    batch.add_request(PublishMeasurementRequest(
+        address=generate_address(AddressPrefix.MEASUREMENT, key.PublicKey()),
+        begin=datetime(2020, 4, 1, 12, tzinfo=timezone.utc),
+        end=datetime(2020, 4, 1, 13, tzinfo=timezone.utc),
+        sector='DK1',
+        type=MeasurementType.PRODUCTION,
+        amount=100
+    ))
+
+    return batch
+
+
+class TestLedgerConnector(unittest.TestCase):
+
+    @pytest.mark.unittest
+    def test_execute_batch_and_get_status(self):
+        with StubLedger() as stub, Ledger(stub.url) as ledger:
+            handle = ledger.execute_batch(build_batch())
+            status = ledger.get_batch_status(handle)
+
+            self.assertEqual(status.status, BatchStatus.COMMITTED)
+            self.assertEqual(status.id, stub.batches[0])
+
+    @pytest.mark.unittest
+    def test_connections_are_reused(self):
+        key = BIP32Key.fromEntropy("bfdgafgaertaehtaha43514r<aefag".encode())
+        address = generate_address(AddressPrefix.MEASUREMENT, key.PublicKey())
+
+        with StubLedger() as stub, Ledger(stub.url) as ledger:
+            stub.put_state(address, MEASUREMENT_BODY)
+
+            for _ in range(5):
+                measurement = ledger.get_measurement(address)
+
+            stats = ledger.connection_stats()
+
+        self.assertEqual(measurement.amount, 100)
+        self.assertEqual(measurement.address, address)
+        self.assertEqual(stats.requests, 5)
+        self.assertEqual(stats.connections, 1)
+        self.assertEqual(stats.reused, 4)
+
+    @pytest.mark.unittest
+    def test_sessions_of_ended_threads_are_dropped(self):
+        key = BIP32Key.fromEntropy("bfdgafgaertaehtaha43514r<aefag".encode())
+        addresses = [generate_address(AddressPrefix.MEASUREMENT, key.ChildKey(i).PublicKey()) for i in range(4)]
+
+        with StubLedger() as stub, Ledger(stub.url, max_workers=2, list_threshold=None) as ledger:
+            for address in addresses:
+                stub.put_state(address, MEASUREMENT_BODY)
+
+            # Every bulk read uses new threads
+            for _ in range(20):
+                ledger.get_measurements(addresses)
+
+            gc.collect()
+            self.assertLessEqual(len(ledger._transport._sessions), 2)
+
+    @pytest.mark.unittest
+    def test_bulk_read_reports_missing_addresses(self):
+        master_key = BIP32Key.fromEntropy("bfdgafgaertaehtaha43514r<aefag".encode())
+        addresses = [generate_address(AddressPrefix.MEASUREMENT, master_key.ChildKey(i).PublicKey()) for i in range(10)]
+
+        with StubLedger() as stub, Ledger(stub.url, max_workers=4) as ledger:
+            for address in addresses[:8]:
+                stub.put_state(address, MEASUREMENT_BODY)
+
+            result = ledger.get_measurements(addresses)
+
+        self.assertEqual(set(result), set(addresses[:8]))
+        self.assertEqual(set(result.errors), set(addresses[8:]))
+        self.assertEqual(result.errors[addresses[9]].code, 75)
+        self.assertEqual(result[addresses[0]].address, addresses[0])
+
+    @pytest.mark.unittest
+    def test_bulk_read_reports_corrupt_state(self):
+        master_key = BIP32Key.fromEntropy("bfdgafgaertaehtaha43514r<aefag".encode())
+        addresses = [generate_address(AddressPrefix.MEASUREMENT, master_key.ChildKey(i).PublicKey()) for i in range(10)]
+
+        # Listing a prefix fails for all of its addresses if one is not valid base64
+        for list_threshold in (None, 5):
+            with StubLedger() as stub, Ledger(stub.url, prefix_length=6, list_threshold=list_threshold) as ledger:
+                for address in addresses[:8]:
+                    stub.put_state(address, MEASUREMENT_BODY)
+                stub.state[addresses[8]] = 'not base64!'
+                stub.put_state(addresses[9], b'not json')
+
+                result = ledger.get_measurements(addresses)
+
+            # Every address is either read or reported
+            self.assertEqual(set(result) | set(result.errors), set(addresses))
+            self.assertTrue(set(addresses[8:]) <= set(result.errors))
+
+        self.assertEqual(set(result.errors), set(addresses))
+
+    @pytest.mark.unittest
+    def test_bulk_read_lists_shared_prefixes(self):
+        master_key = BIP32Key.fromEntropy("bfdgafgaertaehtaha43514r<aefag".encode())
+        addresses = [generate_address(AddressPrefix.MEASUREMENT, master_key.ChildKey(i).PublicKey()) for i in range(10)]
+
+        with StubLedger() as stub, Ledger(stub.url, prefix_length=6, list_threshold=5) as ledger:
+            for address in addresses[:9]:
+                stub.put_state(address, MEASUREMENT_BODY)
+            stub.put_state(generate_address(AddressPrefix.MEASUREMENT, master_key.ChildKey(99).PublicKey()), MEASUREMENT_BODY)
+
+            result = ledger.get_measurements(addresses)
+
+        self.assertEqual(set(result), set(addresses[:9]))
+        self.assertEqual(set(result.errors), {addresses[9]})
+        self.assertTrue(all(path.startswith('/state?') for _, path in stub.requests))
+
+    @pytest.mark.unittest
+    def test_wait_for_batches(self):
+        with StubLedger() as stub, Ledger(stub.url) as ledger:
+            stub.batch_statuses = {
+                'a': ['PENDING', 'COMMITTED'],
+                'b': 'INVALID',
+                'c': ['PENDING', 'PENDING', 'COMMITTED'],
+            }
+
+            statuses = list(ledger.wait_for_batches(['a', 'b', 'c'], timeout=10, poll_wait=1))
+
+            status_requests = [path for _, path in stub.requests]
+
+        self.assertEqual([s.id for s in statuses], ['b', 'a', 'c'])
+        self.assertEqual([s.status for s in statuses], [BatchStatus.INVALID, BatchStatus.COMMITTED, BatchStatus.COMMITTED])
+        self.assertEqual(status_requests, ['/batch_statuses?wait=1'] * 3)
+
+    @pytest.mark.unittest
+    def test_wait_for_batches_yields_pending_batches_on_timeout(self):
+        with StubLedger() as stub, Ledger(stub.url) as ledger:
+            stub.batch_status = 'PENDING'
+
+            statuses = list(ledger.wait_for_batches([f'{stub.url}/batch_statuses?id=a,b'], timeout=0.5, poll_wait=1))
+
+        self.assertEqual([(s.id, s.status) for s in statuses], [('a', BatchStatus.PENDING), ('b', BatchStatus.PENDING)])
+
+    @pytest.mark.unittest
+    def test_get_batch_ids(self):
+        self.assertEqual(get_batch_ids('http://ledger/batch_statuses?id=a,b'), ['a', 'b'])
+        self.assertEqual(get_batch_ids('a'), ['a'])
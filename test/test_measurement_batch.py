@@ -0,0 +1,136 @@
+import unittest
+import pytest
+
+from datetime import datetime, timedelta, timezone, tzinfo
+from bip32utils import BIP32Key
+from sawtooth_sdk.protobuf.transaction_pb2 import TransactionHeader
+
+from src.origin_ledger_sdk import Batch, MeasurementBatch, PublishMeasurementRequest, MeasurementType, generate_address, AddressPrefix
+from src.origin_ledger_sdk.requests.helpers import get_signer
+
+
+KEY = BIP32Key.fromEntropy("bfdgafgaertaehtaha43514r<aefag".encode())
+SIGNER = get_signer(KEY.PrivateKey())
+
+
+def build_measurements(count, begin=datetime(2020, 1, 1, tzinfo=timezone.utc)):
+    return [
+        PublishMeasurementRequest(
+            address=generate_address(AddressPrefix.MEASUREMENT, KEY.ChildKey(i % 3).PublicKey()),
+            begin=begin + timedelta(hours=i),
+            end=begin + timedelta(hours=i + 1),
+            sector='DK1' if i % 2 else 'DK2',
+            type=MeasurementType.PRODUCTION if i % 3 else MeasurementType.CONSUMPTION,
+            amount=i * 100,
+        ) for i in range(count)
+    ]
+
+
+class UTC(tzinfo):
+    """
+    UTC as another object than timezone.utc, like pytz.utc.
+    """
+
+    def utcoffset(self, dt):
+        return timedelta(0)
+
+    def dst(self, dt):
+        return timedelta(0)
+
+    def tzname(self, dt):
+        return 'UTC'
+
+
+def serialize(transactions):
+    return [transaction.SerializeToString() for transaction in transactions]
+
+
+class TestMeasurementBatch(unittest.TestCase):
+
+    def assertSignsLike(self, measurement_batch, measurements):
+        expected = [t for m in measurements for t in m.get_signed_transactions(SIGNER)]
+        self.assertEqual(serialize(measurement_batch.get_signed_transactions(SIGNER)), serialize(expected))
+
+    @pytest.mark.unittest
+    def test_transactions_are_identical_to_single_requests(self):
+        measurements = build_measurements(24)
+        measurement_batch = MeasurementBatch(measurements)
+
+        self.assertEqual(len(measurement_batch), 24)
+        self.assertEqual(list(measurement_batch), measurements)
+        self.assertSignsLike(measurement_batch, measurements)
+
+    @pytest.mark.unittest
+    def test_other_timezones(self):
+        for begin in (datetime(2020, 1, 1), datetime(2020, 1, 1, tzinfo=timezone(timedelta(hours=1)))):
+            measurements = build_measurements(5, begin)
+            measurement_batch = MeasurementBatch(measurements)
+
+            self.assertEqual(measurement_batch[-1], measurements[-1])
+            self.assertSignsLike(measurement_batch, measurements)
+
+    @pytest.mark.unittest
+    def test_timezones_can_not_be_mixed(self):
+        measurement_batch = MeasurementBatch(build_measurements(1))
+
+        with self.assertRaises(ValueError):
+            measurement_batch.append(**vars(build_measurements(1, datetime(2020, 1, 1))[0]))
+
+    @pytest.mark.unittest
+    def test_equal_timezones_can_be_mixed(self):
+        measurements = build_measurements(2) + build_measurements(2, datetime(2020, 2, 1, tzinfo=UTC()))
+        other_offset = build_measurements(1, datetime(2020, 1, 1, tzinfo=timezone(timedelta(hours=1))))
+
+        self.assertSignsLike(MeasurementBatch(measurements), measurements)
+
+        with self.assertRaisesRegex(ValueError, 'timezone'):
+            MeasurementBatch(measurements + other_offset)
+
+    @pytest.mark.unittest
+    def test_hourly(self):
+        address = generate_address(AddressPrefix.MEASUREMENT, KEY.PublicKey())
+        begin = datetime(2020, 1, 1, tzinfo=timezone.utc)
+        amounts = list(range(8784))
+
+        measurement_batch = MeasurementBatch.hourly(address, begin, amounts, 'DK1', MeasurementType.PRODUCTION)
+        measurements = [
+            PublishMeasurementRequest(address, begin + timedelta(hours=i), begin + timedelta(hours=i + 1),
+                                      'DK1', MeasurementType.PRODUCTION, amount)
+            for i, amount in enumerate(amounts[:48])
+        ]
+
+        self.assertEqual(len(measurement_batch), 8784)
+        self.assertEqual(measurement_batch.nbytes, 8784 * 61)
+        self.assertEqual(measurement_batch[8783].end, datetime(2021, 1, 1, tzinfo=timezone.utc))
+        self.assertSignsLike(measurement_batch.split(48)[0], measurements)
+
+    @pytest.mark.unittest
+    def test_added_to_batch_with_dependencies(self):
+        first = build_measurements(1)[0]
+        measurement_batch = MeasurementBatch(build_measurements(10))
+        measurement_batch.add_dependency(first)
+
+        batch = Batch(KEY.PrivateKey())
+        batch.add_request(measurement_batch)
+        batch.add_request(first)
+        signed_batch = batch.get_signed_batch()
+
+        dependency = first.get_header_signature()
+        headers = [TransactionHeader.FromString(t.header) for t in signed_batch.transactions]
+
+        self.assertEqual(len(signed_batch.transactions), 11)
+        self.assertEqual(signed_batch.transactions[0].header_signature, dependency)
+        self.assertTrue(all(list(h.dependencies) == [dependency] for h in headers[1:]))
+
+        parts = measurement_batch.split(4)
+        self.assertEqual([len(part) for part in parts], [4, 4, 2])
+        self.assertEqual(parts[1][0], measurement_batch[4])
+        self.assertTrue(all(part.dependencies == [first] for part in parts))
+
+    @pytest.mark.unittest
+    def test_signed_batches_can_not_be_changed(self):
+        measurement_batch = MeasurementBatch(build_measurements(2))
+        measurement_batch.get_signed_transactions(SIGNER)
+
+        with self.assertRaises(ValueError):
+            measurement_batch.append(**vars(build_measurements(1)[0]))
@@ -0,0 +1,164 @@
+import time
+import threading
+import unittest
+import pytest
+
+from bip32utils import BIP32Key
+
+from src.origin_ledger_sdk import MultiLedger, BatchStatus, InMemoryCollector, register_collector, unregister_collector, generate_address, AddressPrefix
+
+from .stub_ledger import StubLedger
+from .test_ledger_connector import build_batch, MEASUREMENT_BODY
+
+
+ADDRESS = generate_address(AddressPrefix.MEASUREMENT, BIP32Key.fromEntropy("bfdgafgaertaehtaha43514r<aefag".encode()).PublicKey())
+
+
+def requests_to(stub, path):
+    return [p for method, p in stub.requests if p.startswith(path)]
+
+
+class TestMultiLedger(unittest.TestCase):
+
+    def setUp(self):
+        self.collector = InMemoryCollector()
+        register_collector(self.collector)
+
+    def tearDown(self):
+        unregister_collector(self.collector)
+
+    @pytest.mark.unittest
+    def test_reads_go_to_the_fastest_node(self):
+        with StubLedger() as slow, StubLedger() as fast:
+            slow.latency = 0.05
+            slow.put_state(ADDRESS, MEASUREMENT_BODY)
+            fast.put_state(ADDRESS, MEASUREMENT_BODY)
+
+            with MultiLedger([slow.url, fast.url], probe_interval=None) as ledger:
+                ledger.probe()
+                for _ in range(3):
+                    measurement = ledger.get_measurement(ADDRESS)
+                nodes = ledger.nodes()
+
+        self.assertEqual(measurement.amount, 100)
+        self.assertEqual(requests_to(slow, '/state'), [])
+        self.assertEqual(len(requests_to(fast, '/state')), 3)
+        self.assertGreater(nodes[0].latency, nodes[1].latency)
+        self.assertEqual(self.collector.counter('ledger_routed_total', node=fast.url, operation='get_state'), 3)
+
+    @pytest.mark.unittest
+    def test_submissions_fail_over_when_a_node_is_busy(self):
+        batch = build_batch()
+
+        with StubLedger() as first, StubLedger() as second:
+            first.batch_errors = [(503, 15)]
+
+            with MultiLedger([first.url, second.url], probe_interval=None) as ledger:
+                handle = ledger.execute_batch(batch)
+                status = ledger.get_batch_status(handle)
+                nodes = ledger.nodes()
+
+        self.assertEqual(first.batches, [])
+        self.assertEqual(second.batches, [batch.get_signed_batch().header_signature])
+        self.assertEqual(status.status, BatchStatus.COMMITTED)
+        self.assertEqual(nodes[0].failures, 1)
+        self.assertEqual(nodes[0].circuit, 'closed')
+        self.assertEqual(self.collector.counter('ledger_failover_total', node=first.url, operation='send_batches'), 1)
+
+    @pytest.mark.unittest
+    def test_circuit_opens_when_a_node_is_down(self):
+        with StubLedger() as down:
+            pass
+
+        with StubLedger() as up:
+            up.put_state(ADDRESS, MEASUREMENT_BODY)
+
+            with MultiLedger([down.url, up.url], probe_interval=None, failure_threshold=1) as ledger:
+                for _ in range(4):
+                    ledger.get_measurement(ADDRESS)
+                nodes = ledger.nodes()
+
+        self.assertEqual(len(requests_to(up, '/state')), 4)
+        self.assertEqual(nodes[0].circuit, 'open')
+        self.assertEqual(nodes[0].failures, 1)
+        self.assertEqual(nodes[1].circuit, 'closed')
+        self.assertEqual(self.collector.counter('ledger_failover_total', node=down.url, operation='get_state'), 1)
+        self.assertEqual(self.collector.counter('ledger_circuit_open_total', node=down.url), 1)
+
+    @pytest.mark.unittest
+    def test_half_open_circuit_closes_after_a_success(self):
+        with StubLedger() as stub:
+            stub.latency = 0.05
+
+            with MultiLedger([stub.url], probe_interval=None, failure_threshold=1,
+                             slow_threshold=0.03, reset_timeout=0) as ledger:
+                ledger.probe()
+                opened = ledger.nodes()[0]
+
+                stub.latency = 0
+                ledger.probe()
+                closed = ledger.nodes()[0]
+
+        self.assertEqual(opened.failures, 1)
+        self.assertEqual(opened.circuit, 'half_open')
+        self.assertEqual(closed.failures, 0)
+        self.assertEqual(closed.circuit, 'closed')
+
+    @pytest.mark.unittest
+    def test_half_open_circuit_lets_a_single_request_through(self):
+        with StubLedger() as recovering, StubLedger() as lagging:
+            recovering.block_num = 20
+            lagging.block_num = 5
+            recovering.put_state(ADDRESS, MEASUREMENT_BODY)
+            lagging.put_state(ADDRESS, MEASUREMENT_BODY)
+            recovering.latency = 0.05
+
+            with MultiLedger([recovering.url, lagging.url], probe_interval=None, failure_threshold=1,
+                             slow_threshold=0.03, reset_timeout=0, max_lag=10) as ledger:
+                ledger.probe()
+                self.assertEqual(ledger.nodes()[0].circuit, 'half_open')
+
+                recovering.latency = 0.2
+                threads = [threading.Thread(target=ledger.get_measurement, args=(ADDRESS,)) for _ in range(3)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+
+        self.assertEqual(len(requests_to(recovering, '/state')), 1)
+        self.assertEqual(len(requests_to(lagging, '/state')), 2)
+
+    @pytest.mark.unittest
+    def test_lagging_nodes_are_unhealthy(self):
+        with StubLedger() as lagging, StubLedger() as current:
+            lagging.block_num = 5
+            current.block_num = 20
+            lagging.put_state(ADDRESS, MEASUREMENT_BODY)
+            current.put_state(ADDRESS, MEASUREMENT_BODY)
+            current.latency = 0.02
+
+            with MultiLedger([lagging.url, current.url], probe_interval=None, max_lag=10) as ledger:
+                ledger.probe()
+                ledger.get_measurement(ADDRESS)
+                nodes = ledger.nodes()
+
+        self.assertFalse(nodes[0].healthy)
+        self.assertTrue(nodes[1].healthy)
+        self.assertEqual(nodes[0].block_num, 5)
+        self.assertEqual(requests_to(lagging, '/state'), [])
+        self.assertEqual(len(requests_to(current, '/state')), 1)
+
+    @pytest.mark.unittest
+    def test_background_probing(self):
+        with StubLedger() as stub:
+            stub.block_num = 7
+
+            with MultiLedger([stub.url], probe_interval=0.01) as ledger:
+                for _ in range(100):
+                    if ledger.nodes()[0].block_num == 7:
+                        break
+                    time.sleep(0.01)
+                node = ledger.nodes()[0]
+
+        self.assertEqual(node.block_num, 7)
+        self.assertTrue(node.healthy)
@@ -0,0 +1,149 @@
+
+import unittest
+import pytest
+
+from datetime import datetime, timedelta
+from bip32utils import BIP32Key
+from sawtooth_sdk.protobuf.transaction_pb2 import TransactionHeader
+
+from src.origin_ledger_sdk import Batch, ParallelSigner, PublishMeasurementRequest, MeasurementBatch, MeasurementType, generate_address, AddressPrefix
+from src.origin_ledger_sdk.requests import AbstractRequest
+
+
+MASTER_KEY = BIP32Key.fromEntropy("bfdgafgaertaehtaha43514r<aefag".encode())
+
+
+class RecordingSigner(ParallelSigner):
+    """
+    Records the requests sent to the worker processes.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sent = []
+
+    def _detach(self, chunk, signatures):
+        detached = super()._detach(chunk, signatures)
+        self.sent.append(detached)
+        return detached
+
+
+class TestParallelSigner(unittest.TestCase):
+
+    def build_batch(self, count, master_key=MASTER_KEY):
+        batch = Batch(signer_private_key=master_key.PrivateKey())
+
+        for i in range(count):
+            begin = datetime(2020, 1, 1) + timedelta(hours=i)
+            batch.add_request(PublishMeasurementRequest(
+                address=generate_address(AddressPrefix.MEASUREMENT, master_key.ChildKey(i).PublicKey()),
+                begin=begin,
+                end=begin + timedelta(hours=1),
+                sector='DK1',
+                type=MeasurementType.PRODUCTION,
+                amount=i
+            ))
+
+        return batch
+
+    @pytest.mark.unittest
+    def test_parallel_signing_is_identical_to_serial(self):
+        serial_batch = self.build_batch(20)
+        parallel_batch = self.build_batch(20)
+
+        # Each request depends on the one before it, across chunks
+        for batch in (serial_batch, parallel_batch):
+            for request, dependency in zip(batch.requests[1:], batch.requests):
+                request.add_dependency(dependency)
+
+        serial = serial_batch.get_signed_batch()
+
+        with ParallelSigner(max_workers=2, threshold=0, chunk_size=3) as parallel_signer:
+            parallel = parallel_batch.get_signed_batch(parallel_signer)
+
+        self.assertEqual(serial.SerializeToString(), parallel.SerializeToString())
+
+    @pytest.mark.unittest
+    def test_dependencies_of_earlier_chunks_are_sent_as_signatures(self):
+        batch = self.build_batch(20)
+
+        for request, dependency in zip(batch.requests[1:], batch.requests):
+            request.add_dependency(dependency)
+
+        with RecordingSigner(max_workers=2, threshold=0, chunk_size=3) as parallel_signer:
+            signed_batch = batch.get_signed_batch(parallel_signer)
+
+        signatures = [t.header_signature for t in signed_batch.transactions]
+
+        # Every request is signed once, and only refers to the requests of its own chunk
+        self.assertEqual(sum(len(chunk) for chunk in parallel_signer.sent), 20)
+
+        for i, chunk in enumerate(parallel_signer.sent[1:], 1):
+            dependency = chunk[0].dependencies[0]
+            self.assertNotIsInstance(dependency, AbstractRequest)
+            self.assertEqual(dependency.get_header_signature(), signatures[i * 3 - 1])
+
+            for request, dependency in zip(chunk[1:], chunk):
+                self.assertIs(request.dependencies[0], dependency)
+
+    @pytest.mark.unittest
+    def test_measurement_batches_are_split_across_workers(self):
+        serial_batch = Batch(signer_private_key=MASTER_KEY.PrivateKey())
+        parallel_batch = Batch(signer_private_key=MASTER_KEY.PrivateKey())
+
+        for batch in (serial_batch, parallel_batch):
+            before, after = self.build_batch(2).requests
+            measurements = MeasurementBatch(self.build_batch(10).requests)
+            measurements.add_dependency(before)
+            after.add_dependency(measurements)
+
+            for request in (before, measurements, after):
+                batch.add_request(request)
+
+        serial = serial_batch.get_signed_batch()
+
+        with RecordingSigner(max_workers=2, threshold=0, chunk_size=4) as parallel_signer:
+            parallel = parallel_batch.get_signed_batch(parallel_signer)
+
+        self.assertEqual(serial.SerializeToString(), parallel.SerializeToString())
+        self.assertEqual([[r.get_transaction_count() for r in chunk] for chunk in parallel_signer.sent],
+                         [[1, 4], [4], [2, 1]])
+        self.assertEqual(parallel_batch.requests[1].get_header_signature(), parallel.transactions[-2].header_signature)
+
+    @pytest.mark.unittest
+    def test_signed_transactions_are_memoized(self):
+        batch = self.build_batch(6)
+
+        with ParallelSigner(max_workers=2, threshold=0, chunk_size=2) as parallel_signer:
+            signed_batch = batch.get_signed_batch(parallel_signer)
+
+        # Signed serially by another batch signer
+        dependent_batch = self.build_batch(1, MASTER_KEY.ChildKey(1))
+        dependent_batch.requests[0].add_dependency(batch.requests[-1])
+        dependent = dependent_batch.get_signed_batch()
+
+        self.assertTrue(all('_signed_transactions' in r.__dict__ for r in batch.requests))
+        self.assertEqual(
+            list(TransactionHeader.FromString(dependent.transactions[0].header).dependencies),
+            [signed_batch.transactions[-1].header_signature],
+        )
+
+    @pytest.mark.unittest
+    def test_threshold_counts_transactions(self):
+        batch = Batch(signer_private_key=MASTER_KEY.PrivateKey())
+        batch.add_request(MeasurementBatch(self.build_batch(20).requests))
+
+        with ParallelSigner(max_workers=1, threshold=10) as parallel_signer:
+            parallel = batch.get_signed_batch(parallel_signer)
+            self.assertIsNotNone(parallel_signer._executor)
+
+        self.assertEqual(len(parallel.transactions), 20)
+
+    @pytest.mark.unittest
+    def test_small_batches_are_signed_serially(self):
+        batch = self.build_batch(2)
+        parallel_signer = ParallelSigner(threshold=10)
+
+        batch.get_signed_batch(parallel_signer)
+
+        self.assertIsNone(parallel_signer._executor)
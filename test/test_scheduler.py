@@ -0,0 +1,126 @@
+
+import unittest
+import pytest
+
+from src.origin_ledger_sdk import Ledger, LedgerException, LedgerConnectionError, BatchStatus, SubmissionScheduler, AimdController
+from src.origin_ledger_sdk.scheduler import is_transient
+
+from .stub_ledger import StubLedger
+from .test_ledger_connector import build_batch
+
+
+class TestSubmissionScheduler(unittest.TestCase):
+
+    @pytest.mark.unittest
+    def test_rejected_batches_are_resent_without_signing_again(self):
+        batch = build_batch()
+        signed_batch = batch.get_signed_batch()
+
+        with StubLedger() as stub, Ledger(stub.url) as ledger:
+            stub.batch_errors = [(429, 31), (503, 15)]
+
+            with SubmissionScheduler(ledger, retry_delay=0.01) as scheduler:
+                future = scheduler.submit(signed_batch)
+                status = future.result(timeout=10)
+
+            posts = [path for method, path in stub.requests if path == '/batches']
+
+        self.assertEqual(status.status, BatchStatus.COMMITTED)
+        self.assertEqual(status.id, signed_batch.header_signature)
+        self.assertEqual(stub.batches, [signed_batch.header_signature])
+        self.assertEqual(len(posts), 3)
+        self.assertEqual(scheduler.rejections, 2)
+
+    @pytest.mark.unittest
+    def test_permanent_errors_fail_the_batch(self):
+        with StubLedger() as stub, Ledger(stub.url) as ledger:
+            stub.batch_errors = [(400, 30)]
+
+            with SubmissionScheduler(ledger, retry_delay=0.01) as scheduler:
+                future = scheduler.submit(build_batch())
+
+                with self.assertRaises(LedgerException) as context:
+                    future.result(timeout=10)
+
+        self.assertEqual(context.exception.code, 30)
+        self.assertEqual(context.exception.status_code, 400)
+        self.assertEqual(stub.batches, [])
+
+    @pytest.mark.unittest
+    def test_batches_fail_when_retries_are_exhausted(self):
+        with StubLedger() as stub, Ledger(stub.url) as ledger:
+            stub.batch_errors = [(429, 31)] * 3
+
+            with SubmissionScheduler(ledger, max_retries=1, retry_delay=0.01) as scheduler:
+                future = scheduler.submit(build_batch())
+
+                with self.assertRaises(LedgerException):
+                    future.result(timeout=10)
+
+        self.assertEqual(stub.batch_errors, [(429, 31)])
+
+    @pytest.mark.unittest
+    def test_proxy_errors_are_resent(self):
+        with StubLedger() as stub, Ledger(stub.url) as ledger:
+            stub.batch_errors = [(503, None)]
+
+            with SubmissionScheduler(ledger, retry_delay=0.01) as scheduler:
+                status = scheduler.submit(build_batch()).result(timeout=10)
+
+        self.assertEqual(status.status, BatchStatus.COMMITTED)
+        self.assertEqual(scheduler.rejections, 1)
+        self.assertEqual(len(stub.batches), 1)
+
+    @pytest.mark.unittest
+    def test_invalid_batches_do_not_increase_limit(self):
+        with StubLedger() as stub, Ledger(stub.url) as ledger:
+            stub.batch_status = 'INVALID'
+            controller = AimdController(initial_limit=4)
+
+            with SubmissionScheduler(ledger, controller=controller) as scheduler:
+                status = scheduler.submit(build_batch()).result(timeout=10)
+
+        self.assertEqual(status.status, BatchStatus.INVALID)
+        self.assertEqual(controller.limit, 4)
+
+    @pytest.mark.unittest
+    def test_transient_errors(self):
+        self.assertTrue(is_transient(LedgerConnectionError()))
+        self.assertTrue(is_transient(LedgerException('Queue full', 31)))
+        self.assertTrue(is_transient(LedgerException('Unavailable', status_code=503)))
+        self.assertFalse(is_transient(LedgerException('Invalid batch', 30, 400)))
+        self.assertFalse(is_transient(ValueError()))
+
+
+class TestAimdController(unittest.TestCase):
+
+    @pytest.mark.unittest
+    def test_limit_increases_by_one_per_window(self):
+        controller = AimdController(initial_limit=4)
+
+        for _ in range(4):
+            controller.on_commit(controller.sent(), latency=1)
+
+        self.assertAlmostEqual(controller.limit, 5, delta=0.1)
+
+    @pytest.mark.unittest
+    def test_limit_decreases_once_per_window(self):
+        controller = AimdController(initial_limit=8)
+        sequences = [controller.sent() for _ in range(8)]
+
+        for sequence in sequences:
+            controller.on_congestion(sequence)
+
+        self.assertEqual(controller.limit, 4)
+
+        controller.on_congestion(controller.sent())
+
+        self.assertEqual(controller.limit, 2)
+
+    @pytest.mark.unittest
+    def test_slow_commits_decrease_limit(self):
+        controller = AimdController(initial_limit=8, latency_target=2)
+
+        controller.on_commit(controller.sent(), latency=3)
+
+        self.assertEqual(controller.limit, 4)
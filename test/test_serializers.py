@@ -0,0 +1,84 @@
+
+import unittest
+import pytest
+
+from datetime import datetime, timezone
+
+from src.origin_ledger_sdk.requests.serializers import get_serializer, to_bytes
+from src.origin_ledger_sdk.requests.publish_measurement_request import measurement_schema
+from src.origin_ledger_sdk.requests.issue_ggo_request import issue_ggo_schema
+from src.origin_ledger_sdk.requests.transfer_ggo_request import transfer_ggo_schema
+from src.origin_ledger_sdk.requests.split_ggo_request import split_ggo_schema
+from src.origin_ledger_sdk.requests.retire_ggo_request import retire_ggo_schema, settlment_schema
+from src.origin_ledger_sdk.ledger_dto import requests as ledger_requests
+from src.origin_ledger_sdk.ledger_dto import MeasurementType
+
+
+class TestSerializers(unittest.TestCase):
+
+    def assertConforms(self, schema, obj):
+        self.assertTrue(get_serializer(schema).compiled)
+        self.assertEqual(to_bytes(schema, obj), to_bytes(schema, obj, compiled=False))
+
+    @pytest.mark.unittest
+    def test_publish_measurement_request(self):
+        self.assertConforms(measurement_schema, ledger_requests.PublishMeasurementRequest(
+            begin=datetime(2020, 4, 1, 12, tzinfo=timezone.utc),
+            end=datetime(2020, 4, 1, 13, tzinfo=timezone.utc),
+            sector='DK1',
+            type=MeasurementType.PRODUCTION,
+            amount=1244
+        ))
+
+        self.assertConforms(measurement_schema, ledger_requests.PublishMeasurementRequest(
+            begin=datetime(2020, 4, 1, 12),
+            end=datetime(2020, 4, 1, 13),
+            sector='DK2',
+            type=MeasurementType.CONSUMPTION,
+            amount=0
+        ))
+
+    @pytest.mark.unittest
+    def test_issue_ggo_request(self):
+        request = ledger_requests.IssueGGORequest(
+            origin='a' * 70,
+            destination='b' * 70,
+            tech_type='T020001',
+            fuel_type='F01050100',
+        )
+        self.assertConforms(issue_ggo_schema, request)
+
+        request.emissions = {'co2': {'value': 1.5, 'unit': 'g/Wh'}, 'ch4': {'value': 2, 'unit': 'æøå'}}
+        self.assertConforms(issue_ggo_schema, request)
+
+    @pytest.mark.unittest
+    def test_transfer_ggo_request(self):
+        self.assertConforms(transfer_ggo_schema, ledger_requests.TransferGGORequest(
+            origin='a' * 70,
+            destination='b' * 70,
+        ))
+
+    @pytest.mark.unittest
+    def test_split_ggo_request(self):
+        self.assertConforms(split_ggo_schema, ledger_requests.SplitGGORequest(
+            origin='a' * 70,
+            parts=[
+                ledger_requests.SplitGGOPart(address='b' * 70, amount=10),
+                ledger_requests.SplitGGOPart(address='c' * 70, amount=20),
+            ]
+        ))
+
+    @pytest.mark.unittest
+    def test_retire_ggo_request(self):
+        self.assertConforms(retire_ggo_schema, ledger_requests.RetireGGORequest(
+            origin='a' * 70,
+            settlement_address='b' * 70,
+        ))
+
+    @pytest.mark.unittest
+    def test_settlement_request(self):
+        self.assertConforms(settlment_schema, ledger_requests.SettlementRequest(
+            settlement_address='a' * 70,
+            measurement_address='b' * 70,
+            ggo_addresses=['c' * 70, 'd' * 70],
+        ))
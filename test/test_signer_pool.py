@@ -0,0 +1,53 @@
+
+import unittest
+import pytest
+
+from bip32utils import BIP32Key
+
+from src.origin_ledger_sdk.requests.helpers import SignerPool
+
+
+class TestSignerPool(unittest.TestCase):
+
+    @pytest.mark.unittest
+    def test_signer_is_reused_for_same_key(self):
+        key = BIP32Key.fromEntropy("bfdgafgaertaehtaha43514r<aefag".encode())
+        pool = SignerPool()
+
+        signer_1 = pool.get(key.PrivateKey())
+        signer_2 = pool.get(key.PrivateKey())
+
+        self.assertIs(signer_1, signer_2)
+        self.assertEqual(pool.hits, 1)
+        self.assertEqual(pool.misses, 1)
+        self.assertEqual(signer_1.public_key_hex, signer_1.get_public_key().as_hex())
+
+    @pytest.mark.unittest
+    def test_least_recently_used_signer_is_evicted(self):
+        master_key = BIP32Key.fromEntropy("bfdgafgaertaehtaha43514r<aefag".encode())
+        key_1 = master_key.ChildKey(1).PrivateKey()
+        key_2 = master_key.ChildKey(2).PrivateKey()
+        key_3 = master_key.ChildKey(3).PrivateKey()
+        pool = SignerPool(max_size=2)
+
+        pool.get(key_1)
+        pool.get(key_2)
+        pool.get(key_1)
+        pool.get(key_3)
+
+        self.assertEqual(len(pool), 2)
+
+        pool.get(key_1)
+        self.assertEqual(pool.hits, 2)
+
+        pool.get(key_2)
+        self.assertEqual(pool.misses, 4)
+
+    @pytest.mark.unittest
+    def test_private_keys_are_not_stored_as_keys(self):
+        key = BIP32Key.fromEntropy("bfdgafgaertaehtaha43514r<aefag".encode())
+        pool = SignerPool()
+
+        pool.get(key.PrivateKey())
+
+        self.assertNotIn(key.PrivateKey(), pool._signers)
@@ -0,0 +1,148 @@
+import os
+import tempfile
+import threading
+import unittest
+import pytest
+
+from datetime import datetime, timezone
+from bip32utils import BIP32Key
+
+from src.origin_ledger_sdk import Ledger, Batch, BatchSpool, SpoolError, LedgerException, PublishMeasurementRequest, MeasurementType, generate_address, AddressPrefix
+
+from .stub_ledger import StubLedger
+
+
+def build_batches(count):
+    key = BIP32Key.fromEntropy("bfdgafgaertaehtaha43514r<aefag".encode())
+    batches = []
+
+    for i in range(count):
+        batch = Batch(signer_private_key=key.PrivateKey())
+        batch.add_request(PublishMeasurementRequest(
+            address=generate_address(AddressPrefix.MEASUREMENT, key.PublicKey()),
+            begin=datetime(2020, 4, 1, 12, tzinfo=timezone.utc),
+            end=datetime(2020, 4, 1, 13, tzinfo=timezone.utc),
+            sector='DK1',
+            type=MeasurementType.PRODUCTION,
+            amount=i
+        ))
+        batches.append(batch)
+
+    return batches
+
+
+class TestBatchSpool(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'spool')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def segments(self):
+        return sorted(name for name in os.listdir(self.path) if name.endswith('.segment'))
+
+    @pytest.mark.unittest
+    def test_send_spooled_batches(self):
+        batches = build_batches(10)
+
+        with BatchSpool(self.path) as spool:
+            batch_ids = spool.add(batches[:5])
+            batch_ids += spool.add_signed(batch.get_signed_batch() for batch in batches[5:])
+
+        self.assertEqual(batch_ids, [batch.get_signed_batch().header_signature for batch in batches])
+
+        with StubLedger() as stub, Ledger(stub.url) as ledger, BatchSpool(self.path) as spool:
+            self.assertEqual(len(spool), 10)
+
+            handles = ledger.send_spooled(spool, max_batches=4)
+
+            self.assertEqual(len(handles), 3)
+            self.assertEqual(stub.chunked_requests, 0)
+            self.assertEqual(stub.batches, batch_ids)
+            self.assertEqual(len(spool), 0)
+            self.assertEqual(ledger.send_spooled(spool), [])
+
+        self.assertEqual(self.segments(), [])
+
+    @pytest.mark.unittest
+    def test_segments(self):
+        batches = build_batches(6)
+
+        with BatchSpool(self.path, segment_size=1) as spool:
+            batch_ids = spool.add(batches[:3])
+            self.assertEqual(len(self.segments()), 3)
+
+            with StubLedger() as stub, Ledger(stub.url) as ledger:
+                ledger.send_spooled(spool, max_batches=10)
+                self.assertEqual(stub.batches, batch_ids)
+                self.assertEqual(len(stub.requests), 3)
+
+            # The segment being written is kept
+            self.assertEqual(len(self.segments()), 1)
+
+            batch_ids = spool.add(batches[3:])
+
+        with StubLedger() as stub, Ledger(stub.url) as ledger, BatchSpool(self.path) as spool:
+            self.assertEqual(len(spool), 3)
+            ledger.send_spooled(spool, max_batches=10)
+            self.assertEqual(stub.batches, batch_ids)
+
+    @pytest.mark.unittest
+    def test_failed_requests_are_sent_again(self):
+        with StubLedger() as stub, Ledger(stub.url) as ledger, BatchSpool(self.path) as spool:
+            batch_ids = spool.add(build_batches(4))
+            stub.batch_errors = [(503, 31)]
+
+            with self.assertRaises(LedgerException):
+                ledger.send_spooled(spool, max_batches=2)
+
+            self.assertEqual(len(spool), 4)
+            self.assertEqual(len(ledger.send_spooled(spool, max_batches=2)), 2)
+            self.assertEqual(stub.batches, batch_ids)
+
+    @pytest.mark.unittest
+    def test_batches_can_be_added_while_sending(self):
+        batches = build_batches(4)
+
+        with StubLedger() as stub, Ledger(stub.url) as ledger, BatchSpool(self.path) as spool:
+            batch_ids = spool.add(batches[:2])
+            added = []
+
+            def send(batch_list, ids):
+                thread = threading.Thread(target=lambda: added.extend(spool.add(batches[len(added) + 2:][:1])))
+                thread.start()
+                thread.join(timeout=5)
+                self.assertFalse(thread.is_alive(), 'Adding waited for the batches to be sent')
+                return ledger._send_batch_list(batch_list, ids)
+
+            self.assertEqual(len(spool.drain(send, max_batches=1)), 2)
+            self.assertEqual(stub.batches, batch_ids)
+            self.assertEqual(len(spool), 2)
+
+            ledger.send_spooled(spool)
+            self.assertEqual(stub.batches, batch_ids + added)
+
+    @pytest.mark.unittest
+    def test_torn_batch_is_discarded(self):
+        with BatchSpool(self.path) as spool:
+            batch_ids = spool.add(build_batches(2))
+
+        with open(os.path.join(self.path, self.segments()[-1]), 'ab') as f:
+            f.write(b'\x0a\xff\x01torn')
+
+        with StubLedger() as stub, Ledger(stub.url) as ledger, BatchSpool(self.path) as spool:
+            self.assertEqual(len(spool), 2)
+            batch_ids += spool.add(build_batches(3)[2:])
+            ledger.send_spooled(spool)
+            self.assertEqual(stub.batches, batch_ids)
+
+    @pytest.mark.unittest
+    def test_not_a_spool(self):
+        os.makedirs(self.path)
+        with open(os.path.join(self.path, '0000000001.segment'), 'wb') as f:
+            f.write(b'something else')
+
+        with self.assertRaises(SpoolError):
+            BatchSpool(self.path)
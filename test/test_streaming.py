@@ -0,0 +1,118 @@
+import io
+import unittest
+import pytest
+
+from datetime import datetime, timezone
+from bip32utils import BIP32Key
+from sawtooth_sdk.protobuf.batch_pb2 import BatchList
+from sawtooth_sdk.protobuf.transaction_pb2 import TransactionHeader
+
+from src.origin_ledger_sdk import Ledger, Batch, BatchListEncoder, BatchStatus, MeasurementBatch, MeasurementType, SplitGGORequest, SplitGGOPart, TransferGGORequest, DependencyCycleError, generate_address, AddressPrefix
+
+from .stub_ledger import StubLedger
+
+
+class TestBatchListEncoder(unittest.TestCase):
+
+    def setUp(self):
+        self.master_key = BIP32Key.fromEntropy("bfdgafgaertaehtaha43514r<aefag".encode())
+        self.keys = [self.master_key.ChildKey(i) for i in range(4)]
+        self.addresses = [generate_address(AddressPrefix.GGO, k.PublicKey()) for k in self.keys]
+
+    def build_batches(self):
+        split = SplitGGORequest(
+            source_private_key=self.keys[0].PrivateKey(),
+            source_address=self.addresses[0],
+            parts=[
+                SplitGGOPart(address=self.addresses[1], amount=50),
+                SplitGGOPart(address=self.addresses[2], amount=50),
+            ]
+        )
+        transfer = TransferGGORequest(
+            source_private_key=self.keys[1].PrivateKey(),
+            source_address=self.addresses[1],
+            destination_address=self.addresses[3],
+        )
+        transfer.add_dependency(split)
+
+        measurements = MeasurementBatch.hourly(
+            address=generate_address(AddressPrefix.MEASUREMENT, self.master_key.PublicKey()),
+            begin=datetime(2020, 1, 1, tzinfo=timezone.utc),
+            amounts=list(range(200)),
+            sector='DK1',
+            type=MeasurementType.PRODUCTION,
+        )
+
+        first = Batch(self.master_key.PrivateKey())
+        first.add_request(measurements)
+        first.add_request(split)
+
+        second = Batch(self.master_key.PrivateKey())
+        second.add_request(transfer)
+
+        return [first, second], measurements, split
+
+    @pytest.mark.unittest
+    def test_encodes_same_bytes_as_batch_list(self):
+        batches, measurements, split = self.build_batches()
+        chunks = list(BatchListEncoder(chunk_size=1000, spool_size=10000).encode(batches))
+
+        # Transactions are not kept, only the header signatures
+        self.assertNotIn('_signed_transactions', measurements.__dict__)
+        self.assertIn('_header_signature', split.__dict__)
+
+        expected = BatchList(batches=[batch.get_signed_batch() for batch in batches]).SerializeToString()
+
+        self.assertEqual(b''.join(chunks), expected)
+        self.assertTrue(all(len(chunk) <= 1000 for chunk in chunks))
+
+    @pytest.mark.unittest
+    def test_dependencies_between_batches_with_different_signers(self):
+        batches, _, split = self.build_batches()
+        transfer_batch = Batch(self.keys[3].PrivateKey())
+        transfer_batch.add_request(batches[1].requests[0])
+
+        with StubLedger() as stub, Ledger(stub.url) as ledger:
+            ledger.stream_batches([transfer_batch, batches[0]])
+
+        file = io.BytesIO()
+        BatchListEncoder().write([batches[0], transfer_batch], file)
+        split_batch, transfer = BatchList.FromString(file.getvalue()).batches
+
+        dependency = TransactionHeader.FromString(transfer.transactions[0].header).dependencies
+        self.assertEqual(list(dependency), [split_batch.transactions[-1].header_signature])
+        self.assertEqual(stub.batches, [split_batch.header_signature, transfer.header_signature])
+
+    @pytest.mark.unittest
+    def test_write_to_file(self):
+        batches, _, _ = self.build_batches()
+        file = io.BytesIO()
+
+        batch_ids = BatchListEncoder().write(batches, file)
+        batch_list = BatchList.FromString(file.getvalue())
+
+        self.assertEqual(batch_ids, [batch.header_signature for batch in batch_list.batches])
+        self.assertEqual([len(batch.transactions) for batch in batch_list.batches], [201, 1])
+
+    @pytest.mark.unittest
+    def test_stream_batches(self):
+        batches, _, _ = self.build_batches()
+
+        with StubLedger() as stub, Ledger(stub.url) as ledger:
+            handle = ledger.stream_batches(list(reversed(batches)), BatchListEncoder(chunk_size=4096))
+            statuses = list(ledger.wait_for_batches([handle]))
+
+            self.assertEqual(stub.chunked_requests, 1)
+            self.assertEqual(len(stub.batches), 2)
+            self.assertEqual([s.id for s in statuses], stub.batches)
+            self.assertTrue(all(s.status == BatchStatus.COMMITTED for s in statuses))
+
+    @pytest.mark.unittest
+    def test_signing_errors_are_raised(self):
+        batches, _, split = self.build_batches()
+        split.add_dependency(batches[0].requests[0])
+        batches[0].requests[0].add_dependency(split)
+
+        with StubLedger() as stub, Ledger(stub.url) as ledger:
+            with self.assertRaises(DependencyCycleError):
+                ledger.stream_batches(batches[:1])
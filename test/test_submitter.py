@@ -0,0 +1,92 @@
+
+import unittest
+import pytest
+
+from datetime import datetime, timedelta
+from bip32utils import BIP32Key
+
+from src.origin_ledger_sdk import Ledger, MultiLedger, BatchSubmitter, PublishMeasurementRequest, RetireGGORequest, RetireGGOPart, MeasurementType, generate_address, AddressPrefix
+
+from .stub_ledger import StubLedger
+
+
+class TestBatchSubmitter(unittest.TestCase):
+
+    def build_requests(self, count):
+        master_key = BIP32Key.fromEntropy("bfdgafgaertaehtaha43514r<aefag".encode())
+
+        for i in range(count):
+            begin = datetime(2020, 1, 1) + timedelta(hours=i)
+            yield PublishMeasurementRequest(
+                address=generate_address(AddressPrefix.MEASUREMENT, master_key.ChildKey(i).PublicKey()),
+                begin=begin,
+                end=begin + timedelta(hours=1),
+                sector='DK1',
+                type=MeasurementType.PRODUCTION,
+                amount=i
+            )
+
+    def build_retire_request(self, parts):
+        master_key = BIP32Key.fromEntropy("bfdgafgaertaehtaha43514r<aefag".encode())
+        measurement_key = master_key.ChildKey(1000)
+
+        return RetireGGORequest(
+            settlement_address=generate_address(AddressPrefix.SETTLEMENT, measurement_key.PublicKey()),
+            measurement_address=generate_address(AddressPrefix.MEASUREMENT, measurement_key.PublicKey()),
+            measurement_private_key=measurement_key.PrivateKey(),
+            parts=[
+                RetireGGOPart(
+                    address=generate_address(AddressPrefix.GGO, master_key.ChildKey(2000 + i).PublicKey()),
+                    private_key=master_key.ChildKey(2000 + i).PrivateKey()
+                ) for i in range(parts)
+            ]
+        )
+
+    @pytest.mark.unittest
+    def test_requests_are_chunked_into_batches_and_lists(self):
+        master_key = BIP32Key.fromEntropy("bfdgafgaertaehtaha43514r<aefag".encode())
+
+        with StubLedger() as stub, Ledger(stub.url) as ledger:
+            submitter = BatchSubmitter(ledger, master_key.PrivateKey(), max_batch_transactions=4, max_list_batches=2)
+            submitted = list(submitter.submit(self.build_requests(10)))
+
+            posts = [path for method, path in stub.requests if method == 'POST']
+
+        self.assertEqual([b.transaction_count for b in submitted], [4, 4, 2])
+        self.assertEqual([b.batch_id for b in submitted], stub.batches)
+        self.assertEqual(posts, ['/batches', '/batches'])
+
+    @pytest.mark.unittest
+    def test_links_point_at_the_node_which_accepted_the_batches(self):
+        master_key = BIP32Key.fromEntropy("bfdgafgaertaehtaha43514r<aefag".encode())
+
+        with StubLedger() as first, StubLedger() as second:
+            first.batch_errors = [(503, 15)]
+
+            with MultiLedger([first.url, second.url], probe_interval=None) as ledger:
+                submitter = BatchSubmitter(ledger, master_key.PrivateKey(), max_batch_transactions=2)
+                submitted = list(submitter.submit(self.build_requests(4)))
+                statuses = [ledger.get_batch_status(b.link) for b in submitted]
+
+        self.assertEqual([b.batch_id for b in submitted], second.batches)
+        self.assertEqual([b.link for b in submitted], [f'{second.url}/batch_statuses?id={i}' for i in second.batches])
+        self.assertEqual([s.id for s in statuses], second.batches)
+
+    @pytest.mark.unittest
+    def test_multi_transaction_requests_are_not_split(self):
+        master_key = BIP32Key.fromEntropy("bfdgafgaertaehtaha43514r<aefag".encode())
+        requests = list(self.build_requests(2)) + [self.build_retire_request(2)]
+
+        with StubLedger() as stub, Ledger(stub.url) as ledger:
+            submitter = BatchSubmitter(ledger, master_key.PrivateKey(), max_batch_transactions=4)
+            submitted = list(submitter.submit(requests))
+
+        self.assertEqual([b.transaction_count for b in submitted], [2, 3])
+
+    @pytest.mark.unittest
+    def test_request_larger_than_a_batch_is_rejected(self):
+        master_key = BIP32Key.fromEntropy("bfdgafgaertaehtaha43514r<aefag".encode())
+        submitter = BatchSubmitter(None, master_key.PrivateKey(), max_batch_transactions=2)
+
+        with self.assertRaises(ValueError):
+            list(submitter.submit([self.build_retire_request(2)]))
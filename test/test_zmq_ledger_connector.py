@@ -0,0 +1,84 @@
+
+import unittest
+import pytest
+
+from bip32utils import BIP32Key
+from sawtooth_sdk.protobuf.validator_pb2 import Message
+from sawtooth_sdk.protobuf.client_batch_submit_pb2 import ClientBatchSubmitResponse
+
+from src.origin_ledger_sdk import ZmqLedger, StateCache, BatchStatus, LedgerException, generate_address, AddressPrefix
+
+from .stub_validator import StubValidator
+from .test_ledger_connector import MEASUREMENT_BODY, build_batch
+
+
+class TestZmqLedgerConnector(unittest.TestCase):
+
+    @pytest.mark.unittest
+    def test_execute_batch_and_get_status(self):
+        with StubValidator() as validator, ZmqLedger(validator.url, timeout=5) as ledger:
+            handle = ledger.execute_batch(build_batch())
+            status = ledger.get_batch_status(handle)
+            statuses = list(ledger.wait_for_batches([handle], timeout=5))
+
+        self.assertEqual(status.status, BatchStatus.COMMITTED)
+        self.assertEqual(status.id, validator.batches[0])
+        self.assertEqual([s.status for s in statuses], [BatchStatus.COMMITTED])
+
+    @pytest.mark.unittest
+    def test_rejected_submission_raises(self):
+        with StubValidator() as validator, ZmqLedger(validator.url, timeout=5) as ledger:
+            validator.submit_status = ClientBatchSubmitResponse.QUEUE_FULL
+
+            with self.assertRaises(LedgerException) as context:
+                ledger.execute_batch(build_batch())
+
+        self.assertEqual(context.exception.code, 31)
+
+    @pytest.mark.unittest
+    def test_state_reads(self):
+        master_key = BIP32Key.fromEntropy("bfdgafgaertaehtaha43514r<aefag".encode())
+        addresses = [generate_address(AddressPrefix.MEASUREMENT, master_key.ChildKey(i).PublicKey()) for i in range(10)]
+
+        with StubValidator() as validator, ZmqLedger(validator.url, timeout=5, prefix_length=6, list_threshold=5) as ledger:
+            for address in addresses[:9]:
+                validator.state[address] = MEASUREMENT_BODY
+
+            measurement = ledger.get_measurement(addresses[0])
+            measurements = ledger.get_measurements(addresses)
+
+            with self.assertRaises(LedgerException) as context:
+                ledger.get_measurement(addresses[9])
+
+        self.assertEqual(measurement.amount, 100)
+        self.assertEqual(measurement.address, addresses[0])
+        self.assertEqual(set(measurements), set(addresses[:9]))
+        self.assertEqual(set(measurements.errors), {addresses[9]})
+        self.assertEqual(context.exception.code, 75)
+        self.assertIn(Message.CLIENT_STATE_LIST_REQUEST, validator.requests)
+
+    @pytest.mark.unittest
+    def test_stream_batches_and_head_block_num(self):
+        with StubValidator() as validator, ZmqLedger(validator.url, timeout=5) as ledger:
+            validator.block_num = 42
+            handle = ledger.stream_batches([build_batch()])
+            status = ledger.get_batch_status(handle)
+
+            self.assertEqual(ledger.get_head_block_num(), 42)
+
+        self.assertEqual(status.status, BatchStatus.COMMITTED)
+        self.assertEqual(status.id, validator.batches[0])
+        self.assertIsNone(ledger._transport)
+
+    @pytest.mark.unittest
+    def test_state_roots_are_not_cached_as_heads(self):
+        master_key = BIP32Key.fromEntropy("bfdgafgaertaehtaha43514r<aefag".encode())
+        address = generate_address(AddressPrefix.MEASUREMENT, master_key.PublicKey())
+        cache = StateCache()
+
+        with StubValidator() as validator, ZmqLedger(validator.url, timeout=5, cache=cache) as ledger:
+            validator.state[address] = MEASUREMENT_BODY
+            ledger.get_measurement(address)
+
+        self.assertIsNotNone(cache.get(address))
+        self.assertIsNone(cache.get(address, validator.state_root))